@@ -0,0 +1,146 @@
+"""Car spec search columns, triggers and indexes
+
+Revision ID: 5a0d3e8f71c6
+Revises: e4a7c2b95f10
+Create Date: 2026-10-17 12:02:44.130857
+
+car_specs.search_text (trigram) and car_specs.search_vector (weighted
+tsvector) hold the spec's brand, model, submodel and generation names
+plus its own name, engine and fuel type. A BEFORE trigger on car_specs
+fills them; renames or re-parenting higher up the hierarchy null
+search_text on the affected specs, which re-fires that trigger.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0d3e8f71c6'
+down_revision: Union[str, Sequence[str], None] = 'e4a7c2b95f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CAR_SPECS_SEARCH_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_refresh() RETURNS trigger AS $$
+DECLARE
+    brand_name text;
+    model_name text;
+    submodel_name text;
+    generation_name text;
+BEGIN
+    SELECT b.name, m.name, sm.name, g.name
+      INTO brand_name, model_name, submodel_name, generation_name
+      FROM generations g
+      JOIN submodels sm ON sm.id = g.submodel_id
+      JOIN models m ON m.id = sm.model_id
+      JOIN brands b ON b.id = m.brand_id
+     WHERE g.id = NEW.generation_id;
+
+    NEW.search_text := lower(concat_ws(' ',
+        brand_name, model_name, submodel_name, generation_name,
+        NEW.name, NEW.engine, NEW.fuel_type));
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', concat_ws(' ', brand_name, model_name)), 'A') ||
+        setweight(to_tsvector('simple', concat_ws(' ', submodel_name, generation_name)), 'B') ||
+        setweight(to_tsvector('simple', concat_ws(' ', NEW.name, NEW.engine, NEW.fuel_type)), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PARENT_CHANGED_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_parent_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'generations' THEN
+        UPDATE car_specs SET search_text = NULL WHERE generation_id = NEW.id;
+    ELSIF TG_TABLE_NAME = 'submodels' THEN
+        UPDATE car_specs SET search_text = NULL
+         WHERE generation_id IN (SELECT id FROM generations WHERE submodel_id = NEW.id);
+    ELSIF TG_TABLE_NAME = 'models' THEN
+        UPDATE car_specs SET search_text = NULL
+         WHERE generation_id IN (
+             SELECT g.id FROM generations g
+               JOIN submodels sm ON sm.id = g.submodel_id
+              WHERE sm.model_id = NEW.id);
+    ELSIF TG_TABLE_NAME = 'brands' THEN
+        UPDATE car_specs SET search_text = NULL
+         WHERE generation_id IN (
+             SELECT g.id FROM generations g
+               JOIN submodels sm ON sm.id = g.submodel_id
+               JOIN models m ON m.id = sm.model_id
+              WHERE m.brand_id = NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# table -> columns whose change affects descendant specs
+PARENT_TRIGGERS = [
+    ('brands', 'name'),
+    ('models', 'name, brand_id'),
+    ('submodels', 'name, model_id'),
+    ('generations', 'name, submodel_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('car_specs', sa.Column('search_text', sa.Text(), nullable=True))
+    op.add_column('car_specs', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(CAR_SPECS_SEARCH_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER car_specs_search_refresh '
+        'BEFORE INSERT OR UPDATE OF generation_id, name, engine, fuel_type, search_text ON car_specs '
+        'FOR EACH ROW EXECUTE FUNCTION car_specs_search_refresh()'
+    )
+    op.execute(PARENT_CHANGED_FUNCTION)
+    for table, columns in PARENT_TRIGGERS:
+        op.execute(
+            f'CREATE TRIGGER {table}_search_parent_changed '
+            f'AFTER UPDATE OF {columns} ON {table} '
+            f'FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) '
+            f'EXECUTE FUNCTION car_specs_search_parent_changed()'
+        )
+
+    # Backfill existing rows through the trigger.
+    op.execute('UPDATE car_specs SET search_text = NULL')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_car_specs_search_text_trgm', 'car_specs', ['search_text'],
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_car_specs_search_vector', 'car_specs', ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_car_specs_search_vector', table_name='car_specs',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_car_specs_search_text_trgm', table_name='car_specs',
+                      postgresql_concurrently=True, if_exists=True)
+
+    for table, _ in reversed(PARENT_TRIGGERS):
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_search_parent_changed ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS car_specs_search_parent_changed()')
+    op.execute('DROP TRIGGER IF EXISTS car_specs_search_refresh ON car_specs')
+    op.execute('DROP FUNCTION IF EXISTS car_specs_search_refresh()')
+    op.drop_column('car_specs', 'search_vector')
+    op.drop_column('car_specs', 'search_text')
@@ -0,0 +1,44 @@
+"""Unique (user_id, car_spec_id) on user_cars
+
+Revision ID: 78697df32e78
+Revises: c2e85f14a7d3
+Create Date: 2026-10-17 18:39:16.303694
+
+Garage adds become INSERT ... ON CONFLICT DO NOTHING, which needs a
+unique key. Duplicates already stored are deleted first, keeping the
+oldest row of each pair. The table is locked against writes for the
+dedupe and the index build so no new duplicate can slip in between.
+The unique index leads with user_id, so ix_user_cars_user_id from
+b71e0c4d9a58 is dropped as redundant.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '78697df32e78'
+down_revision: Union[str, Sequence[str], None] = 'c2e85f14a7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('LOCK TABLE user_cars IN SHARE ROW EXCLUSIVE MODE')
+    op.execute(
+        'DELETE FROM user_cars a USING user_cars b '
+        'WHERE a.user_id = b.user_id AND a.car_spec_id = b.car_spec_id AND a.id > b.id'
+    )
+    op.create_index(
+        'uq_user_cars_user_id_car_spec_id', 'user_cars', ['user_id', 'car_spec_id'], unique=True
+    )
+    op.drop_index('ix_user_cars_user_id', table_name='user_cars', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_user_cars_user_id', 'user_cars', ['user_id'], if_not_exists=True)
+    op.drop_index('uq_user_cars_user_id_car_spec_id', table_name='user_cars')
@@ -0,0 +1,50 @@
+"""Add id to the default-ordering indexes of generations and specs
+
+Revision ID: 83ec01c9408a
+Revises: 78697df32e78
+Create Date: 2026-10-17 21:12:40.518304
+
+Keyset pages order by the sort columns plus id as a tiebreaker. With id
+missing from the index, Postgres seeks to the cursor's year but then
+sorts every row sharing it, so deep cursor pages over a generation with
+many specs cost as much as a whole year's rows. The wider indexes serve
+every lookup the old ones did and replace them; built CONCURRENTLY like
+those in b71e0c4d9a58.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '83ec01c9408a'
+down_revision: Union[str, Sequence[str], None] = '78697df32e78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, old index, old columns, new index, new columns)
+INDEXES = [
+    ('generations', 'ix_generations_submodel_id_year_start', ['submodel_id', 'year_start'],
+     'ix_generations_submodel_id_year_start_id', ['submodel_id', 'year_start', 'id']),
+    ('car_specs', 'ix_car_specs_generation_id_year', ['generation_id', 'year'],
+     'ix_car_specs_generation_id_year_id', ['generation_id', 'year', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, old, _, new, columns in INDEXES:
+            op.create_index(new, table, columns, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(old, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, old, columns, new, _ in reversed(INDEXES):
+            op.create_index(old, table, columns, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(new, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,71 @@
+"""Unique natural keys for catalog tables
+
+Revision ID: 8d2f64a1c3e9
+Revises: 3c9e51f0b7a2
+Create Date: 2026-10-17 10:03:27.904116
+
+Bulk catalog import upserts with INSERT ... ON CONFLICT, which needs a
+unique key per parent. Rows already duplicated under the same parent are
+merged into the oldest one first, top-down: children of a duplicate are
+moved to the row kept (which may in turn make them duplicates, merged at
+the next level) and garage entries follow their spec. The merge is not
+undone by the downgrade.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f64a1c3e9'
+down_revision: Union[str, Sequence[str], None] = '3c9e51f0b7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, natural key under the parent, child table, child foreign key)
+_MERGES = (
+    ('models', ('brand_id', 'name'), 'submodels', 'model_id'),
+    ('submodels', ('model_id', 'name'), 'generations', 'submodel_id'),
+    ('generations', ('submodel_id', 'name'), 'car_specs', 'generation_id'),
+    ('car_specs', ('generation_id', 'name', 'year'), 'user_cars', 'car_spec_id'),
+)
+
+
+def _merge_duplicates(table: str, key: Sequence[str], child: str, child_fk: str) -> None:
+    """Move the children of rows sharing `key` to the oldest of them and delete the rest."""
+    # Rows with a NULL key column never conflict, as under the constraint.
+    not_null = ' AND '.join(f'{column} IS NOT NULL' for column in key)
+    op.execute(
+        f'UPDATE {child} c SET {child_fk} = d.keep_id FROM ('
+        f'SELECT id, min(id) OVER (PARTITION BY {", ".join(key)}) AS keep_id'
+        f' FROM {table} WHERE {not_null}'
+        f') d WHERE c.{child_fk} = d.id AND d.id <> d.keep_id'
+    )
+    same_key = ' AND '.join(f't.{column} = k.{column}' for column in key)
+    op.execute(f'DELETE FROM {table} t USING {table} k WHERE {same_key} AND t.id > k.id')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        'LOCK TABLE models, submodels, generations, car_specs, user_cars IN SHARE ROW EXCLUSIVE MODE'
+    )
+    for merge in _MERGES:
+        _merge_duplicates(*merge)
+    op.create_unique_constraint('uq_models_brand_id_name', 'models', ['brand_id', 'name'])
+    op.create_unique_constraint('uq_submodels_model_id_name', 'submodels', ['model_id', 'name'])
+    op.create_unique_constraint('uq_generations_submodel_id_name', 'generations', ['submodel_id', 'name'])
+    op.create_unique_constraint(
+        'uq_car_specs_generation_id_name_year', 'car_specs', ['generation_id', 'name', 'year']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_car_specs_generation_id_name_year', 'car_specs', type_='unique')
+    op.drop_constraint('uq_generations_submodel_id_name', 'generations', type_='unique')
+    op.drop_constraint('uq_submodels_model_id_name', 'submodels', type_='unique')
+    op.drop_constraint('uq_models_brand_id_name', 'models', type_='unique')
@@ -0,0 +1,56 @@
+"""FK and default-ordering indexes for catalog lookups
+
+Revision ID: b71e0c4d9a58
+Revises: 8d2f64a1c3e9
+Create Date: 2026-10-17 10:48:55.217390
+
+models(brand_id, name), submodels(model_id, name) and
+generations(submodel_id, name) are already served by the unique
+constraints from 8d2f64a1c3e9. The indexes here cover the remaining
+parent lookups and their default orderings. They are built CONCURRENTLY
+so the tables stay writable; that cannot run inside a transaction, hence
+the autocommit blocks.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e0c4d9a58'
+down_revision: Union[str, Sequence[str], None] = '8d2f64a1c3e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_generations_submodel_id_year_start', 'generations', ['submodel_id', 'year_start']),
+    ('ix_car_specs_generation_id_year', 'car_specs', ['generation_id', 'year']),
+    ('ix_user_cars_user_id', 'user_cars', ['user_id']),
+    ('ix_user_cars_car_spec_id', 'user_cars', ['car_spec_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
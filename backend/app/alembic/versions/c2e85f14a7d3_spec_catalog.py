@@ -0,0 +1,168 @@
+"""Denormalized spec_catalog read table
+
+Revision ID: c2e85f14a7d3
+Revises: 5a0d3e8f71c6
+Create Date: 2026-10-17 15:41:09.527316
+
+spec_catalog holds one row per car spec with the ids and names of its
+generation, submodel, model and brand, so a spec with its full path is a
+primary-key lookup. Rows are built by spec_catalog_refresh() only:
+statement-level triggers on car_specs pass it the inserted or changed
+specs (one set-based statement per bulk import batch), row triggers on
+the parent tables pass it the specs under a renamed or re-parented row.
+Deleting a spec removes its row through the foreign key.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e85f14a7d3'
+down_revision: Union[str, Sequence[str], None] = '5a0d3e8f71c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SPEC_COLUMNS = 'generation_id, name, engine, horsepower, torque, fuel_type, year, created_by'
+
+REFRESH_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION spec_catalog_refresh(spec_ids integer[]) RETURNS void AS $$
+    INSERT INTO spec_catalog (
+        id, {SPEC_COLUMNS},
+        generation_name, submodel_id, submodel_name, model_id, model_name, brand_id, brand_name
+    )
+    SELECT s.id, s.generation_id, s.name, s.engine, s.horsepower, s.torque, s.fuel_type,
+           s.year, s.created_by,
+           g.name, sm.id, sm.name, m.id, m.name, b.id, b.name
+      FROM car_specs s
+      JOIN generations g ON g.id = s.generation_id
+      JOIN submodels sm ON sm.id = g.submodel_id
+      JOIN models m ON m.id = sm.model_id
+      JOIN brands b ON b.id = m.brand_id
+     WHERE s.id = ANY(spec_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        generation_id = EXCLUDED.generation_id,
+        name = EXCLUDED.name,
+        engine = EXCLUDED.engine,
+        horsepower = EXCLUDED.horsepower,
+        torque = EXCLUDED.torque,
+        fuel_type = EXCLUDED.fuel_type,
+        year = EXCLUDED.year,
+        created_by = EXCLUDED.created_by,
+        generation_name = EXCLUDED.generation_name,
+        submodel_id = EXCLUDED.submodel_id,
+        submodel_name = EXCLUDED.submodel_name,
+        model_id = EXCLUDED.model_id,
+        model_name = EXCLUDED.model_name,
+        brand_id = EXCLUDED.brand_id,
+        brand_name = EXCLUDED.brand_name;
+$$ LANGUAGE sql;
+"""
+
+# Transition tables cannot be combined with UPDATE OF <columns>, so the
+# update trigger sees every update and skips rows whose copied columns
+# did not change (e.g. the search_text refreshes).
+SPECS_CHANGED_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION spec_catalog_specs_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM spec_catalog_refresh(ARRAY(SELECT id FROM new_rows));
+    ELSE
+        PERFORM spec_catalog_refresh(ARRAY(
+            SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+             WHERE (n.{SPEC_COLUMNS.replace(', ', ', n.')})
+                   IS DISTINCT FROM (o.{SPEC_COLUMNS.replace(', ', ', o.')})
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PARENT_CHANGED_FUNCTION = """
+CREATE OR REPLACE FUNCTION spec_catalog_parent_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'generations' THEN
+        PERFORM spec_catalog_refresh(ARRAY(SELECT id FROM spec_catalog WHERE generation_id = NEW.id));
+    ELSIF TG_TABLE_NAME = 'submodels' THEN
+        PERFORM spec_catalog_refresh(ARRAY(SELECT id FROM spec_catalog WHERE submodel_id = NEW.id));
+    ELSIF TG_TABLE_NAME = 'models' THEN
+        PERFORM spec_catalog_refresh(ARRAY(SELECT id FROM spec_catalog WHERE model_id = NEW.id));
+    ELSIF TG_TABLE_NAME = 'brands' THEN
+        PERFORM spec_catalog_refresh(ARRAY(SELECT id FROM spec_catalog WHERE brand_id = NEW.id));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# table -> columns copied into (or locating) descendant spec_catalog rows
+PARENT_TRIGGERS = [
+    ('brands', 'name'),
+    ('models', 'name, brand_id'),
+    ('submodels', 'name, model_id'),
+    ('generations', 'name, submodel_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'spec_catalog',
+        sa.Column('id', sa.Integer(), sa.ForeignKey('car_specs.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('generation_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('engine', sa.String(length=100), nullable=False),
+        sa.Column('horsepower', sa.Integer(), nullable=False),
+        sa.Column('torque', sa.Integer(), nullable=False),
+        sa.Column('fuel_type', sa.String(length=50), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('generation_name', sa.String(length=100), nullable=False),
+        sa.Column('submodel_id', sa.Integer(), nullable=False),
+        sa.Column('submodel_name', sa.String(length=100), nullable=False),
+        sa.Column('model_id', sa.Integer(), nullable=False),
+        sa.Column('model_name', sa.String(length=100), nullable=False),
+        sa.Column('brand_id', sa.Integer(), nullable=False),
+        sa.Column('brand_name', sa.String(length=100), nullable=False),
+    )
+    for column in ('generation_id', 'submodel_id', 'model_id', 'brand_id'):
+        op.create_index(f'ix_spec_catalog_{column}', 'spec_catalog', [column])
+
+    op.execute(REFRESH_FUNCTION)
+    op.execute(SPECS_CHANGED_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER spec_catalog_specs_inserted '
+        'AFTER INSERT ON car_specs REFERENCING NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION spec_catalog_specs_changed()'
+    )
+    op.execute(
+        'CREATE TRIGGER spec_catalog_specs_updated '
+        'AFTER UPDATE ON car_specs REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION spec_catalog_specs_changed()'
+    )
+    op.execute(PARENT_CHANGED_FUNCTION)
+    for table, columns in PARENT_TRIGGERS:
+        op.execute(
+            f'CREATE TRIGGER {table}_spec_catalog_parent_changed '
+            f'AFTER UPDATE OF {columns} ON {table} '
+            f'FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) '
+            f'EXECUTE FUNCTION spec_catalog_parent_changed()'
+        )
+
+    op.execute('SELECT spec_catalog_refresh(ARRAY(SELECT id FROM car_specs))')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in reversed(PARENT_TRIGGERS):
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_spec_catalog_parent_changed ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS spec_catalog_parent_changed()')
+    op.execute('DROP TRIGGER IF EXISTS spec_catalog_specs_updated ON car_specs')
+    op.execute('DROP TRIGGER IF EXISTS spec_catalog_specs_inserted ON car_specs')
+    op.execute('DROP FUNCTION IF EXISTS spec_catalog_specs_changed()')
+    op.execute('DROP FUNCTION IF EXISTS spec_catalog_refresh(integer[])')
+    op.drop_table('spec_catalog')
@@ -0,0 +1,223 @@
+"""Fill car spec search columns per statement instead of per row
+
+Revision ID: d4f81b2c6e07
+Revises: 83ec01c9408a
+Create Date: 2026-10-17 23:05:12.734190
+
+The BEFORE ... FOR EACH ROW trigger from 5a0d3e8f71c6 joined four tables
+for every inserted spec, so a bulk import paid that lookup once per row.
+The search columns are now computed by car_spec_search_text() and
+car_spec_search_vector(), from the names along the spec's path:
+
+- the catalog import writes them in its spec upsert, joining each batch
+  to its generations' hierarchy in the same statement;
+- for any other write, statement-level triggers (like spec_catalog's in
+  c2e85f14a7d3) pass car_specs_search_refresh() the inserted rows that
+  arrived without them and the updated rows whose name, engine, fuel
+  type or generation changed, for one set-based UPDATE;
+- renames and re-parenting higher up refresh the specs underneath.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f81b2c6e07'
+down_revision: Union[str, Sequence[str], None] = '83ec01c9408a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_spec_search_text(
+    brand text, model text, submodel text, generation text, name text, engine text, fuel_type text
+) RETURNS text AS $$
+    SELECT lower(concat_ws(' ', brand, model, submodel, generation, name, engine, fuel_type));
+$$ LANGUAGE sql STABLE;
+"""
+
+SEARCH_VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_spec_search_vector(
+    brand text, model text, submodel text, generation text, name text, engine text, fuel_type text
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', concat_ws(' ', brand, model)), 'A') ||
+           setweight(to_tsvector('simple', concat_ws(' ', submodel, generation)), 'B') ||
+           setweight(to_tsvector('simple', concat_ws(' ', name, engine, fuel_type)), 'C');
+$$ LANGUAGE sql STABLE;
+"""
+
+# LEFT JOINs keep a spec without a generation searchable by its own
+# columns, as the row trigger did.
+REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_refresh(spec_ids integer[]) RETURNS void AS $$
+    UPDATE car_specs s
+       SET search_text = car_spec_search_text(
+               b.name, m.name, sm.name, g.name, n.name, n.engine, n.fuel_type),
+           search_vector = car_spec_search_vector(
+               b.name, m.name, sm.name, g.name, n.name, n.engine, n.fuel_type)
+      FROM car_specs n
+      LEFT JOIN generations g ON g.id = n.generation_id
+      LEFT JOIN submodels sm ON sm.id = g.submodel_id
+      LEFT JOIN models m ON m.id = sm.model_id
+      LEFT JOIN brands b ON b.id = m.brand_id
+     WHERE n.id = ANY(spec_ids) AND s.id = n.id;
+$$ LANGUAGE sql;
+"""
+
+# Rows written with their search columns (the import's upsert) are left
+# alone. The refresh's own UPDATE changes none of the compared columns,
+# so the update trigger it fires finds nothing to do and recursion stops.
+SPECS_CHANGED_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_specs_changed() RETURNS trigger AS $$
+DECLARE
+    spec_ids integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        spec_ids := ARRAY(SELECT id FROM new_rows WHERE search_text IS NULL);
+    ELSE
+        spec_ids := ARRAY(
+            SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+             WHERE (n.generation_id, n.name, n.engine, n.fuel_type)
+                   IS DISTINCT FROM (o.generation_id, o.name, o.engine, o.fuel_type)
+               AND n.search_text IS NOT DISTINCT FROM o.search_text
+        );
+    END IF;
+    IF cardinality(spec_ids) > 0 THEN
+        PERFORM car_specs_search_refresh(spec_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PARENT_CHANGED_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_parent_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'generations' THEN
+        PERFORM car_specs_search_refresh(ARRAY(
+            SELECT id FROM car_specs WHERE generation_id = NEW.id));
+    ELSIF TG_TABLE_NAME = 'submodels' THEN
+        PERFORM car_specs_search_refresh(ARRAY(
+            SELECT s.id FROM car_specs s
+              JOIN generations g ON g.id = s.generation_id
+             WHERE g.submodel_id = NEW.id));
+    ELSIF TG_TABLE_NAME = 'models' THEN
+        PERFORM car_specs_search_refresh(ARRAY(
+            SELECT s.id FROM car_specs s
+              JOIN generations g ON g.id = s.generation_id
+              JOIN submodels sm ON sm.id = g.submodel_id
+             WHERE sm.model_id = NEW.id));
+    ELSIF TG_TABLE_NAME = 'brands' THEN
+        PERFORM car_specs_search_refresh(ARRAY(
+            SELECT s.id FROM car_specs s
+              JOIN generations g ON g.id = s.generation_id
+              JOIN submodels sm ON sm.id = g.submodel_id
+              JOIN models m ON m.id = sm.model_id
+             WHERE m.brand_id = NEW.id));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# The 5a0d3e8f71c6 functions, restored on downgrade.
+ROW_REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_refresh() RETURNS trigger AS $$
+DECLARE
+    brand_name text;
+    model_name text;
+    submodel_name text;
+    generation_name text;
+BEGIN
+    SELECT b.name, m.name, sm.name, g.name
+      INTO brand_name, model_name, submodel_name, generation_name
+      FROM generations g
+      JOIN submodels sm ON sm.id = g.submodel_id
+      JOIN models m ON m.id = sm.model_id
+      JOIN brands b ON b.id = m.brand_id
+     WHERE g.id = NEW.generation_id;
+
+    NEW.search_text := lower(concat_ws(' ',
+        brand_name, model_name, submodel_name, generation_name,
+        NEW.name, NEW.engine, NEW.fuel_type));
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', concat_ws(' ', brand_name, model_name)), 'A') ||
+        setweight(to_tsvector('simple', concat_ws(' ', submodel_name, generation_name)), 'B') ||
+        setweight(to_tsvector('simple', concat_ws(' ', NEW.name, NEW.engine, NEW.fuel_type)), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+NULLING_PARENT_CHANGED_FUNCTION = """
+CREATE OR REPLACE FUNCTION car_specs_search_parent_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'generations' THEN
+        UPDATE car_specs SET search_text = NULL WHERE generation_id = NEW.id;
+    ELSIF TG_TABLE_NAME = 'submodels' THEN
+        UPDATE car_specs SET search_text = NULL
+         WHERE generation_id IN (SELECT id FROM generations WHERE submodel_id = NEW.id);
+    ELSIF TG_TABLE_NAME = 'models' THEN
+        UPDATE car_specs SET search_text = NULL
+         WHERE generation_id IN (
+             SELECT g.id FROM generations g
+               JOIN submodels sm ON sm.id = g.submodel_id
+              WHERE sm.model_id = NEW.id);
+    ELSIF TG_TABLE_NAME = 'brands' THEN
+        UPDATE car_specs SET search_text = NULL
+         WHERE generation_id IN (
+             SELECT g.id FROM generations g
+               JOIN submodels sm ON sm.id = g.submodel_id
+               JOIN models m ON m.id = sm.model_id
+              WHERE m.brand_id = NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS car_specs_search_refresh ON car_specs')
+    op.execute('DROP FUNCTION IF EXISTS car_specs_search_refresh()')
+
+    op.execute(SEARCH_TEXT_FUNCTION)
+    op.execute(SEARCH_VECTOR_FUNCTION)
+    op.execute(REFRESH_FUNCTION)
+    op.execute(SPECS_CHANGED_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER car_specs_search_specs_inserted '
+        'AFTER INSERT ON car_specs REFERENCING NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION car_specs_search_specs_changed()'
+    )
+    op.execute(
+        'CREATE TRIGGER car_specs_search_specs_updated '
+        'AFTER UPDATE ON car_specs REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION car_specs_search_specs_changed()'
+    )
+    # The parent row triggers keep calling this name; only the body changes.
+    op.execute(PARENT_CHANGED_FUNCTION)
+
+    op.execute('SELECT car_specs_search_refresh(ARRAY(SELECT id FROM car_specs WHERE search_text IS NULL))')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(NULLING_PARENT_CHANGED_FUNCTION)
+    op.execute('DROP TRIGGER IF EXISTS car_specs_search_specs_updated ON car_specs')
+    op.execute('DROP TRIGGER IF EXISTS car_specs_search_specs_inserted ON car_specs')
+    op.execute('DROP FUNCTION IF EXISTS car_specs_search_specs_changed()')
+    op.execute('DROP FUNCTION IF EXISTS car_specs_search_refresh(integer[])')
+    op.execute('DROP FUNCTION IF EXISTS car_spec_search_vector(text, text, text, text, text, text, text)')
+    op.execute('DROP FUNCTION IF EXISTS car_spec_search_text(text, text, text, text, text, text, text)')
+
+    op.execute(ROW_REFRESH_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER car_specs_search_refresh '
+        'BEFORE INSERT OR UPDATE OF generation_id, name, engine, fuel_type, search_text ON car_specs '
+        'FOR EACH ROW EXECUTE FUNCTION car_specs_search_refresh()'
+    )
@@ -6,6 +6,7 @@ from .submodel import router as submodel_router
 from .generation import router as generation_router
 from .spec import router as spec_router
 from .user_car import router as user_car_router
+from .catalog import router as catalog_router
 
 
 car_routers: list[APIRouter] = [
@@ -15,6 +16,7 @@ car_routers: list[APIRouter] = [
     generation_router,
     spec_router,
     user_car_router,
+    catalog_router,
 ]
 
 __all__ = ["car_routers"]
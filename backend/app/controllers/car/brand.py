@@ -1,11 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request, Response, status
 
-from app.controllers.car.utils import serialize_paginated
-from app.core.deps import get_db, require_permissions
-from app.models.rbac import User
+from app.controllers.car.utils import cache_headers, catalog_etag, etag_matches, not_modified
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
 from app.schemas.car import BrandCreate, BrandRead, BrandUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.services.car import BrandService
@@ -14,7 +15,11 @@ from app.services.car import BrandService
 router = APIRouter(prefix="/brands", tags=["Brands"])
 
 
-def get_brand_service(db: AsyncSession = Depends(get_db)) -> BrandService:
+def get_brand_service(db: SessionDep) -> BrandService:
+    return BrandService(db)
+
+
+def get_brand_read_service(db: ReadSessionDep) -> BrandService:
     return BrandService(db)
 
 
@@ -23,9 +28,10 @@ def get_brand_service(db: AsyncSession = Depends(get_db)) -> BrandService:
     response_model=BrandRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_brand(
     data: BrandCreate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}))],
     service: BrandService = Depends(get_brand_service),
 ):
     brand = await service.create(data, current_user)
@@ -37,12 +43,18 @@ async def create_brand(
     response_model=PaginatedResponse[BrandRead],
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(5)
 async def list_brands(
+    request: Request,
     params: PaginationParams = Depends(),
-    service: BrandService = Depends(get_brand_service),
+    service: BrandService = Depends(get_brand_read_service),
 ):
-    result = await service.list(params.page, params.per_page, params.sort_by, params.filters)
-    return serialize_paginated(result, BrandRead)
+    etag = catalog_etag("brands", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = await service.list(params.page, params.per_page, params.sort_by, params.filters, params.cursor, params.count, select_fields(BrandRead, params.fields))
+    return serialize_paginated(result, BrandRead, cache_headers(etag))
 
 
 @router.get(
@@ -50,11 +62,19 @@ async def list_brands(
     response_model=BrandRead,
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(4)
 async def get_brand(
+    request: Request,
+    response: Response,
     brand_id: int,
-    service: BrandService = Depends(get_brand_service),
+    service: BrandService = Depends(get_brand_read_service),
 ):
+    etag = catalog_etag("brands", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     brand = await service.get(brand_id)
+    response.headers.update(cache_headers(etag))
     return BrandRead.model_validate(brand)
 
 
@@ -62,9 +82,10 @@ async def get_brand(
     "/{brand_id}",
     status_code=status.HTTP_200_OK,
 )
+@query_budget(3)
 async def delete_brand(
     brand_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
     service: BrandService = Depends(get_brand_service),
 ):
     return await service.delete(current_user, brand_id)
@@ -74,10 +95,11 @@ async def delete_brand(
     "/{brand_id}",
     response_model=BrandRead,
 )
+@query_budget(3)
 async def update_brand(
     brand_id: int,
     data: BrandUpdate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
     service: BrandService = Depends(get_brand_service),
 ):
     brand = await service.update(current_user, brand_id, data)
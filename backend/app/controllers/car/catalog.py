@@ -0,0 +1,153 @@
+import json
+from typing import Annotated, AsyncIterator, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.controllers.car.utils import cache_headers, catalog_etag, etag_matches, not_modified
+from app.core.config import settings
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
+from app.schemas.car import CatalogImportError, CatalogImportResult, CatalogTree
+from app.services.car import CatalogService
+
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+
+def get_catalog_service(db: SessionDep) -> CatalogService:
+    return CatalogService(db)
+
+
+def get_catalog_read_service(db: ReadSessionDep) -> CatalogService:
+    return CatalogService(db)
+
+
+@router.get(
+    "/tree",
+    response_model=CatalogTree,
+    dependencies=[Depends(require_permissions({"cars:read"}))],
+)
+@query_budget(4)
+async def get_catalog_tree(
+    request: Request,
+    include_specs: bool = False,
+    service: CatalogService = Depends(get_catalog_read_service),
+):
+    """
+    The whole brand -> model -> submodel -> generation hierarchy, optionally
+    with specs. Served with an ETag derived from the catalog version.
+    """
+    version = await service.get_version()
+    etag = catalog_etag("catalog", version, "-specs" if include_specs else "")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    body = await service.get_tree_json(version, include_specs)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
+
+
+@router.post("/import", response_model=CatalogImportResult)
+async def import_catalog(
+    request: Request,
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}))],
+    batch_size: int = Query(settings.CATALOG_IMPORT_BATCH_SIZE, ge=1, le=10000),
+    service: CatalogService = Depends(get_catalog_service),
+):
+    """
+    Upsert nested brands with their models, submodels, generations and specs.
+
+    The body is either a JSON array of brands or, with an
+    `application/x-ndjson` content type, one brand object per line.
+    Invalid brands are reported in `errors` and skipped.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        items, errors = await _read_ndjson(request.stream())
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(400, "Body must be a JSON array of brands")
+        if not isinstance(body, list):
+            raise HTTPException(400, "Body must be a JSON array of brands")
+        items, errors = list(enumerate(body)), []
+
+    return await service.import_catalog(items, current_user, batch_size, errors)
+
+
+@router.get(
+    "/export/specs",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_permissions({"cars:read"}))],
+)
+@query_budget(4)
+async def export_specs(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "ndjson",
+    sort_by: Optional[str] = None,
+    filters: Optional[str] = None,
+    generation_id: Optional[int] = None,
+    include_hierarchy: bool = False,
+    service: CatalogService = Depends(get_catalog_read_service),
+):
+    """
+    Stream every matching car spec as CSV or NDJSON.
+
+    Rows are read through a server-side cursor, so memory stays flat however
+    large the export. `filters`/`sort_by` use the same grammar as list
+    endpoints; `include_hierarchy` adds generation/submodel/model/brand ids
+    and names to each row.
+    """
+    etag = catalog_etag("catalog", await service.get_version(), f"-{format}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    chunks = service.export_specs(format, sort_by, filters, generation_id, include_hierarchy)
+    if format == "csv":
+        return StreamingResponse(
+            chunks,
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="car_specs.csv"', **cache_headers(etag)},
+        )
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=cache_headers(etag))
+
+
+async def _read_ndjson(
+    chunks: AsyncIterator[bytes],
+) -> Tuple[List[Tuple[int, object]], List[CatalogImportError]]:
+    """
+    Decode an NDJSON stream line by line; line numbers start at 1.
+
+    Every decoded brand is kept in memory: the import upserts the whole
+    tree level by level, so it needs all of them before the first statement.
+    """
+    items: List[Tuple[int, object]] = []
+    errors: List[CatalogImportError] = []
+    line_no = 0
+    buffer = bytearray()
+
+    def decode(line: bytes):
+        if not line.strip():
+            return
+        try:
+            items.append((line_no, json.loads(line)))
+        except ValueError as e:
+            errors.append(CatalogImportError(index=line_no, detail=f"Invalid JSON: {e}"))
+
+    async for chunk in chunks:
+        # Only the new chunk is searched, so a long line stays linear to read.
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            buffer += chunk
+            continue
+        buffer += chunk[:end]
+        for line in buffer.split(b"\n"):
+            line_no += 1
+            decode(line)
+        buffer = bytearray(chunk[end + 1:])
+    if buffer:
+        line_no += 1
+        decode(buffer)
+
+    return items, errors
@@ -1,11 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request, Response, status
 
-from app.controllers.car.utils import serialize_paginated
-from app.core.deps import get_db, require_permissions
-from app.models.rbac import User
+from app.controllers.car.utils import cache_headers, catalog_etag, etag_matches, not_modified
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
 from app.schemas.car import GenerationCreate, GenerationRead, GenerationUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.services.car import GenerationService
@@ -14,7 +15,11 @@ from app.services.car import GenerationService
 router = APIRouter(prefix="/submodels/{submodel_id}/generations", tags=["Generations"])
 
 
-def get_generation_service(db: AsyncSession = Depends(get_db)) -> GenerationService:
+def get_generation_service(db: SessionDep) -> GenerationService:
+    return GenerationService(db)
+
+
+def get_generation_read_service(db: ReadSessionDep) -> GenerationService:
     return GenerationService(db)
 
 
@@ -23,10 +28,11 @@ def get_generation_service(db: AsyncSession = Depends(get_db)) -> GenerationServ
     response_model=GenerationRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_generation(
     submodel_id: int,
     data: GenerationCreate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}))],
     service: GenerationService = Depends(get_generation_service),
 ):
     generation = await service.create(submodel_id, data, current_user)
@@ -38,19 +44,28 @@ async def create_generation(
     response_model=PaginatedResponse[GenerationRead],
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(6)
 async def list_generations(
+    request: Request,
     submodel_id: int,
     params: PaginationParams = Depends(),
-    service: GenerationService = Depends(get_generation_service),
+    service: GenerationService = Depends(get_generation_read_service),
 ):
+    etag = catalog_etag("generations", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     result = await service.list_by_submodel(
         submodel_id,
         params.page,
         params.per_page,
         params.sort_by,
         params.filters,
+        params.cursor,
+        params.count,
+        select_fields(GenerationRead, params.fields),
     )
-    return serialize_paginated(result, GenerationRead)
+    return serialize_paginated(result, GenerationRead, cache_headers(etag))
 
 
 @router.get(
@@ -58,12 +73,20 @@ async def list_generations(
     response_model=GenerationRead,
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(4)
 async def get_generation(
+    request: Request,
+    response: Response,
     submodel_id: int,
     generation_id: int,
-    service: GenerationService = Depends(get_generation_service),
+    service: GenerationService = Depends(get_generation_read_service),
 ):
+    etag = catalog_etag("generations", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     generation = await service.get(submodel_id, generation_id)
+    response.headers.update(cache_headers(etag))
     return GenerationRead.model_validate(generation)
 
 
@@ -71,10 +94,11 @@ async def get_generation(
     "/{generation_id}",
     status_code=status.HTTP_200_OK,
 )
+@query_budget(3)
 async def delete_generation(
     submodel_id: int,
     generation_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
     service: GenerationService = Depends(get_generation_service),
 ):
     return await service.delete(current_user, submodel_id, generation_id)
@@ -84,11 +108,12 @@ async def delete_generation(
     "/{generation_id}",
     response_model=GenerationRead,
 )
+@query_budget(3)
 async def update_generation(
     submodel_id: int,
     generation_id: int,
     data: GenerationUpdate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
     service: GenerationService = Depends(get_generation_service),
 ):
     generation = await service.update(current_user, submodel_id, generation_id, data)
@@ -1,11 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request, Response, status
 
-from app.controllers.car.utils import serialize_paginated
-from app.core.deps import get_db, require_permissions
-from app.models.rbac import User
+from app.controllers.car.utils import cache_headers, catalog_etag, etag_matches, not_modified
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
 from app.schemas.car import ModelCreate, ModelRead, ModelUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.services.car import ModelService
@@ -14,7 +15,11 @@ from app.services.car import ModelService
 router = APIRouter(prefix="/brands/{brand_id}/models", tags=["Models"])
 
 
-def get_model_service(db: AsyncSession = Depends(get_db)) -> ModelService:
+def get_model_service(db: SessionDep) -> ModelService:
+    return ModelService(db)
+
+
+def get_model_read_service(db: ReadSessionDep) -> ModelService:
     return ModelService(db)
 
 
@@ -23,10 +28,11 @@ def get_model_service(db: AsyncSession = Depends(get_db)) -> ModelService:
     response_model=ModelRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_model(
     brand_id: int,
     data: ModelCreate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}))],
     service: ModelService = Depends(get_model_service),
 ):
     model = await service.create(brand_id, data, current_user)
@@ -38,13 +44,19 @@ async def create_model(
     response_model=PaginatedResponse[ModelRead],
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(6)
 async def list_models(
+    request: Request,
     brand_id: int,
     params: PaginationParams = Depends(),
-    service: ModelService = Depends(get_model_service),
+    service: ModelService = Depends(get_model_read_service),
 ):
-    result = await service.list_by_brand(brand_id, params.page, params.per_page, params.sort_by, params.filters)
-    return serialize_paginated(result, ModelRead)
+    etag = catalog_etag("models", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = await service.list_by_brand(brand_id, params.page, params.per_page, params.sort_by, params.filters, params.cursor, params.count, select_fields(ModelRead, params.fields))
+    return serialize_paginated(result, ModelRead, cache_headers(etag))
 
 
 @router.get(
@@ -52,12 +64,20 @@ async def list_models(
     response_model=ModelRead,
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(4)
 async def get_model(
+    request: Request,
+    response: Response,
     brand_id: int,
     model_id: int,
-    service: ModelService = Depends(get_model_service),
+    service: ModelService = Depends(get_model_read_service),
 ):
+    etag = catalog_etag("models", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     model = await service.get(brand_id, model_id)
+    response.headers.update(cache_headers(etag))
     return ModelRead.model_validate(model)
 
 
@@ -65,10 +85,11 @@ async def get_model(
     "/{model_id}",
     status_code=status.HTTP_200_OK,
 )
+@query_budget(3)
 async def delete_model(
     brand_id: int,
     model_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
     service: ModelService = Depends(get_model_service),
 ):
     return await service.delete(current_user, brand_id, model_id)
@@ -78,11 +99,12 @@ async def delete_model(
     "/{model_id}",
     response_model=ModelRead,
 )
+@query_budget(3)
 async def update_model(
     brand_id: int,
     model_id: int,
     data: ModelUpdate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
     service: ModelService = Depends(get_model_service),
 ):
     model = await service.update(current_user, brand_id, model_id, data)
@@ -1,12 +1,13 @@
-from typing import Annotated
+from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 
-from app.controllers.car.utils import serialize_paginated
-from app.core.deps import get_db, require_permissions
-from app.models.rbac import User
-from app.schemas.car import CarSpecCreate, CarSpecRead, CarSpecUpdate
+from app.controllers.car.utils import cache_headers, catalog_etag, etag_matches, not_modified
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
+from app.schemas.car import CarSpecCreate, CarSpecDetail, CarSpecRead, CarSpecSearchResult, CarSpecUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.services.car import CarSpecService
 
@@ -14,7 +15,11 @@ from app.services.car import CarSpecService
 router = APIRouter(tags=["Car Specifications"])
 
 
-def get_spec_service(db: AsyncSession = Depends(get_db)) -> CarSpecService:
+def get_spec_service(db: SessionDep) -> CarSpecService:
+    return CarSpecService(db)
+
+
+def get_spec_read_service(db: ReadSessionDep) -> CarSpecService:
     return CarSpecService(db)
 
 
@@ -23,10 +28,11 @@ def get_spec_service(db: AsyncSession = Depends(get_db)) -> CarSpecService:
     response_model=CarSpecRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_car_spec(
     generation_id: int,
     data: CarSpecCreate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}))],
     service: CarSpecService = Depends(get_spec_service),
 ):
     spec = await service.create(generation_id, data, current_user)
@@ -37,12 +43,18 @@ async def create_car_spec(
     "/generations/{generation_id}/specs",
     response_model=PaginatedResponse[CarSpecRead],
 )
+@query_budget(6)
 async def list_car_specs(
+    request: Request,
     generation_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:read"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:read"}))],
     params: PaginationParams = Depends(),
-    service: CarSpecService = Depends(get_spec_service),
+    service: CarSpecService = Depends(get_spec_read_service),
 ):
+    etag = catalog_etag("car_specs", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     result = await service.list_by_generation(
         current_user,
         generation_id,
@@ -50,28 +62,61 @@ async def list_car_specs(
         params.per_page,
         params.sort_by,
         params.filters,
+        params.cursor,
+        params.count,
+        select_fields(CarSpecRead, params.fields),
     )
-    return serialize_paginated(result, CarSpecRead)
+    return serialize_paginated(result, CarSpecRead, cache_headers(etag))
+
+
+# Declared before /specs/{spec_id} so "search" is not parsed as an id.
+@router.get("/specs/search", response_model=List[CarSpecSearchResult])
+@query_budget(4)
+async def search_car_specs(
+    request: Request,
+    response: Response,
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:read"}))],
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    service: CarSpecService = Depends(get_spec_read_service),
+):
+    etag = catalog_etag("catalog", await service.get_catalog_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rows = await service.search(current_user, q, limit)
+    response.headers.update(cache_headers(etag))
+    return [CarSpecSearchResult.model_validate(row) for row in rows]
 
 
-@router.get("/specs/{spec_id}", response_model=CarSpecRead)
+@router.get("/specs/{spec_id}", response_model=CarSpecDetail)
+@query_budget(4)
 async def get_car_spec(
+    request: Request,
+    response: Response,
     spec_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:read"}))],
-    service: CarSpecService = Depends(get_spec_service),
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:read"}))],
+    service: CarSpecService = Depends(get_spec_read_service),
 ):
+    # Carries parent names, so any catalog write can change it.
+    etag = catalog_etag("catalog", await service.get_catalog_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     spec = await service.get(current_user, spec_id)
-    return CarSpecRead.model_validate(spec)
+    response.headers.update(cache_headers(etag))
+    return CarSpecDetail.model_validate(spec)
 
 
 @router.delete(
     "/generations/{generation_id}/specs/{spec_id}",
     status_code=status.HTTP_200_OK,
 )
+@query_budget(3)
 async def delete_car_spec(
     generation_id: int,
     spec_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
     service: CarSpecService = Depends(get_spec_service),
 ):
     return await service.delete(current_user, generation_id, spec_id)
@@ -81,11 +126,12 @@ async def delete_car_spec(
     "/generations/{generation_id}/specs/{spec_id}",
     response_model=CarSpecRead,
 )
+@query_budget(3)
 async def update_car_spec(
     generation_id: int,
     spec_id: int,
     data: CarSpecUpdate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
     service: CarSpecService = Depends(get_spec_service),
 ):
     spec = await service.update(current_user, generation_id, spec_id, data)
@@ -1,11 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request, Response, status
 
-from app.controllers.car.utils import serialize_paginated
-from app.core.deps import get_db, require_permissions
-from app.models.rbac import User
+from app.controllers.car.utils import cache_headers, catalog_etag, etag_matches, not_modified
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
 from app.schemas.car import SubmodelCreate, SubmodelRead, SubmodelUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.services.car import SubmodelService
@@ -14,7 +15,11 @@ from app.services.car import SubmodelService
 router = APIRouter(prefix="/models/{model_id}/submodels", tags=["Submodels"])
 
 
-def get_submodel_service(db: AsyncSession = Depends(get_db)) -> SubmodelService:
+def get_submodel_service(db: SessionDep) -> SubmodelService:
+    return SubmodelService(db)
+
+
+def get_submodel_read_service(db: ReadSessionDep) -> SubmodelService:
     return SubmodelService(db)
 
 
@@ -23,10 +28,11 @@ def get_submodel_service(db: AsyncSession = Depends(get_db)) -> SubmodelService:
     response_model=SubmodelRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_submodel(
     model_id: int,
     data: SubmodelCreate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}))],
     service: SubmodelService = Depends(get_submodel_service),
 ):
     submodel = await service.create(model_id, data, current_user)
@@ -38,13 +44,19 @@ async def create_submodel(
     response_model=PaginatedResponse[SubmodelRead],
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(6)
 async def list_submodels(
+    request: Request,
     model_id: int,
     params: PaginationParams = Depends(),
-    service: SubmodelService = Depends(get_submodel_service),
+    service: SubmodelService = Depends(get_submodel_read_service),
 ):
-    result = await service.list_by_model(model_id, params.page, params.per_page, params.sort_by, params.filters)
-    return serialize_paginated(result, SubmodelRead)
+    etag = catalog_etag("submodels", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = await service.list_by_model(model_id, params.page, params.per_page, params.sort_by, params.filters, params.cursor, params.count, select_fields(SubmodelRead, params.fields))
+    return serialize_paginated(result, SubmodelRead, cache_headers(etag))
 
 
 @router.get(
@@ -52,12 +64,20 @@ async def list_submodels(
     response_model=SubmodelRead,
     dependencies=[Depends(require_permissions({"cars:read"}))],
 )
+@query_budget(4)
 async def get_submodel(
+    request: Request,
+    response: Response,
     model_id: int,
     submodel_id: int,
-    service: SubmodelService = Depends(get_submodel_service),
+    service: SubmodelService = Depends(get_submodel_read_service),
 ):
+    etag = catalog_etag("submodels", await service.get_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     submodel = await service.get(model_id, submodel_id)
+    response.headers.update(cache_headers(etag))
     return SubmodelRead.model_validate(submodel)
 
 
@@ -65,10 +85,11 @@ async def get_submodel(
     "/{submodel_id}",
     status_code=status.HTTP_200_OK,
 )
+@query_budget(3)
 async def delete_submodel(
     model_id: int,
     submodel_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:delete"}, {"cars:delete_own"}))],
     service: SubmodelService = Depends(get_submodel_service),
 ):
     return await service.delete(current_user, model_id, submodel_id)
@@ -78,11 +99,12 @@ async def delete_submodel(
     "/{submodel_id}",
     response_model=SubmodelRead,
 )
+@query_budget(3)
 async def update_submodel(
     model_id: int,
     submodel_id: int,
     data: SubmodelUpdate,
-    current_user: Annotated[User, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"cars:write"}, {"cars:update_own"}))],
     service: SubmodelService = Depends(get_submodel_service),
 ):
     submodel = await service.update(current_user, model_id, submodel_id, data)
@@ -1,12 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Response, status
 
-from app.controllers.car.utils import serialize_paginated
-from app.core.deps import get_db, require_permissions
-from app.models.rbac import User
-from app.schemas.car import CarSpecRead, UserCarsRead
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import ReadSessionDep, SessionDep, require_permissions
+from app.core.principal import Principal
+from app.core.query_stats import query_budget
+from app.schemas.car import CarSpecDetail, UserCarsChange, UserCarsChangeResult, UserCarsRead
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.services.car import UserCarService
 
@@ -14,7 +14,11 @@ from app.services.car import UserCarService
 router = APIRouter(prefix="/my-cars", tags=["My Cars"])
 
 
-def get_user_car_service(db: AsyncSession = Depends(get_db)) -> UserCarService:
+def get_user_car_service(db: SessionDep) -> UserCarService:
+    return UserCarService(db)
+
+
+def get_user_car_read_service(db: ReadSessionDep) -> UserCarService:
     return UserCarService(db)
 
 
@@ -23,29 +27,51 @@ def get_user_car_service(db: AsyncSession = Depends(get_db)) -> UserCarService:
     response_model=UserCarsRead,
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(3)
 async def add_to_my_cars(
     car_spec_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"my_cars"}))],
+    response: Response,
+    current_user: Annotated[Principal, Depends(require_permissions({"my_cars"}))],
     service: UserCarService = Depends(get_user_car_service),
 ):
     record = await service.add(current_user, car_spec_id)
+    if not record.created:
+        response.status_code = status.HTTP_200_OK
     return UserCarsRead.model_validate(record)
 
 
+@router.patch("", response_model=UserCarsChangeResult)
+@query_budget(3)
+async def change_my_cars(
+    change: UserCarsChange,
+    current_user: Annotated[Principal, Depends(require_permissions({"my_cars"}))],
+    service: UserCarService = Depends(get_user_car_service),
+):
+    """
+    Add and remove many car specs in one call, e.g. to sync a garage.
+
+    `add` and `remove` take up to USER_CARS_CHANGE_MAX_IDS ids each (10000
+    by default); split larger syncs across calls.
+    """
+    return await service.change(current_user, change.add, change.remove)
+
+
 @router.delete("/{car_spec_id}")
+@query_budget(3)
 async def remove_from_my_cars(
     car_spec_id: int,
-    current_user: Annotated[User, Depends(require_permissions({"my_cars"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"my_cars"}))],
     service: UserCarService = Depends(get_user_car_service),
 ):
     return await service.remove(current_user, car_spec_id)
 
 
-@router.get("", response_model=PaginatedResponse[CarSpecRead])
+@router.get("", response_model=PaginatedResponse[CarSpecDetail])
+@query_budget(4)
 async def list_my_cars(
-    current_user: Annotated[User, Depends(require_permissions({"my_cars"}))],
+    current_user: Annotated[Principal, Depends(require_permissions({"my_cars"}))],
     params: PaginationParams = Depends(),
-    service: UserCarService = Depends(get_user_car_service),
+    service: UserCarService = Depends(get_user_car_read_service),
 ):
     result = await service.list_my_cars(
         current_user,
@@ -53,6 +79,9 @@ async def list_my_cars(
         params.per_page,
         params.sort_by,
         params.filters,
+        params.cursor,
+        params.count,
+        select_fields(CarSpecDetail, params.fields),
     )
-    return serialize_paginated(result, CarSpecRead)
+    return serialize_paginated(result, CarSpecDetail)
 
@@ -1,19 +1,34 @@
-from typing import Type, TypeVar
+from typing import Dict
 
-from pydantic import BaseModel
+from fastapi import Request, Response
 
-from app.schemas.pagination import PaginatedResponse
+from app.core.config import settings
 
 
-SchemaT = TypeVar("SchemaT", bound=BaseModel)
+def catalog_etag(scope: str, version: int, variant: str = "") -> str:
+    """
+    Strong ETag for catalog data as of `version` of `scope` (the whole
+    catalog or one table, see CarRepository.get_catalog_version).
 
+    Read the version before the data it tags: a write landing in between
+    then only costs the client one extra full response, never a stale 304.
+    """
+    return f'"{scope}-{version}{variant}"'
 
-def serialize_paginated(
-    result: PaginatedResponse, schema: Type[SchemaT]
-) -> PaginatedResponse:
-    """Convert ORM objects in `data` to the provided read schema."""
-    return PaginatedResponse(
-        data=[schema.model_validate(item) for item in result.data],
-        meta=result.meta,
-    )
 
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": settings.CATALOG_CACHE_CONTROL}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+
+from app.core.db import pool_stats
+from app.core.deps import require_permissions
+from app.schemas.diagnostics import CacheStats, PoolStats
+from app.utils.read_cache import catalog_read_cache
+
+router = APIRouter(prefix="/diagnostics", tags=["Diagnostics"])
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStats,
+    dependencies=[Depends(require_permissions({"users:crud"}))],
+)
+async def get_pool_stats():
+    """Connection pool occupancy and checkout waits for this worker process."""
+    stats = pool_stats()
+    checkouts = stats["checkouts"]
+    stats["wait_seconds_avg"] = stats["wait_seconds_total"] / checkouts if checkouts else 0.0
+    return stats
+
+
+@router.get(
+    "/cache",
+    response_model=CacheStats,
+    dependencies=[Depends(require_permissions({"users:crud"}))],
+)
+async def get_cache_stats():
+    """Catalog read cache counters for this worker process."""
+    stats = catalog_read_cache.stats.as_dict()
+    reads = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / reads if reads else 0.0
+    stats["backend"] = catalog_read_cache.name
+    return stats
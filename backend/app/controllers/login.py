@@ -1,8 +1,10 @@
+from typing import Annotated
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from app.core.deps import get_db
+from app.core.db import AsyncSession
+from app.core.deps import get_session
 from app.schemas.auth import LoginRequest, TokenResponse
 from app.services.user import UserService
 from app.core.security import create_access_token
@@ -13,16 +15,22 @@ router = APIRouter(prefix="/login", tags=["Login"])
 
 
 @router.post("/access-token", response_model=TokenResponse)
-async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
-    service = UserService(db)
+async def login(data: LoginRequest, db: Annotated[AsyncSession, Depends(get_session)]):
+    # Login only reads, so it takes no unit of work; closing the session
+    # before the hash returns its connection to the pool, which a login
+    # burst would otherwise drain.
+    login = await UserService(db).get_login(data.username)
+    await db.close()
 
-    user = await service.authenticate(data.username, data.password)
-    if not user:
+    principal = await UserService.authenticate(login, data.password)
+    if not principal:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     extra_claims = {}
-    if user.roles:
-        extra_claims["role"] = user.roles[0].name
-    token = create_access_token(user.id, access_token_expires, extra_claims)
+    if principal.roles:
+        extra_claims["role"] = min(principal.roles)
+    token = create_access_token(
+        principal.id, access_token_expires, extra_claims, principal=principal
+    )
 
     return TokenResponse(access_token=token)
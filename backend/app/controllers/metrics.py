@@ -0,0 +1,48 @@
+import hmac
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.config import settings
+from app.core.db import engine, read_engines
+from app.core.deps import bearer_scheme
+from app.core.metrics import metrics
+from app.utils.read_cache import catalog_read_cache
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def require_metrics_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(bearer_scheme)],
+) -> None:
+    """Admit the scraper holding METRICS_TOKEN; user tokens are too short-lived to scrape with."""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Metrics scraping is not configured")
+    presented = credentials.credentials if credentials is not None else ""
+    if not hmac.compare_digest(presented.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status.HTTP_401_UNAUTHORIZED,
+            "Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+async def get_metrics():
+    """Prometheus scrape endpoint; figures are per worker process."""
+    pools = {"primary": engine.pool.stats()}
+    for index, read_engine in enumerate(read_engines):
+        pools[f"replica{index}"] = read_engine.pool.stats()
+    caches = {}
+    if catalog_read_cache.backend is not None:
+        caches["catalog_read"] = catalog_read_cache.stats.as_dict()
+    return PlainTextResponse(metrics.render(pools, caches), media_type=PROMETHEUS_CONTENT_TYPE)
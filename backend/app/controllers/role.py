@@ -1,15 +1,14 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.core.deps import get_db, require_permissions
+from app.core.deps import SessionDep, require_permissions
 from app.services.role import RoleService
 from app.schemas.role import RoleResponse, PermissionResponse
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
 
-def get_role_service(db: AsyncSession = Depends(get_db)):
+def get_role_service(db: SessionDep):
     return RoleService(db)
 
 
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, require_permissions
+from app.controllers.utils import select_fields, serialize_paginated
+from app.core.deps import SessionDep, require_permissions
+from app.core.query_stats import query_budget
 from app.services.user import UserService
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.schemas.role import RoleResponse
@@ -11,7 +12,7 @@ from app.schemas.pagination import PaginatedResponse, PaginationParams
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-def get_user_service(db: AsyncSession = Depends(get_db)):
+def get_user_service(db: SessionDep):
     return UserService(db)
 
 
@@ -38,12 +39,16 @@ async def list_users(
     params: PaginationParams = Depends(),
     service: UserService = Depends(get_user_service),
 ):
-    return await service.get_users(
+    result = await service.get_users(
         page=params.page,
         per_page=params.per_page,
         sort_by=params.sort_by,
         filters=params.filters,
+        cursor=params.cursor,
+        count=params.count,
+        fields=select_fields(UserResponse, params.fields),
     )
+    return serialize_paginated(result, UserResponse)
 
 
 @router.get(
@@ -64,6 +69,7 @@ async def get_user(user_id: int, service: UserService = Depends(get_user_service
     response_model=UserResponse,
     dependencies=[Depends(require_permissions({"users:crud"}))],
 )
+@query_budget(3)
 async def update_user(user_id: int, data: UserUpdate, service: UserService = Depends(get_user_service)):
     user = await service.update_user(user_id, data)
     if not user:
@@ -77,6 +83,7 @@ async def update_user(user_id: int, data: UserUpdate, service: UserService = Dep
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(require_permissions({"users:crud"}))],
 )
+@query_budget(3)
 async def delete_user(user_id: int, service: UserService = Depends(get_user_service)):
     ok = await service.delete_user(user_id)
     if not ok:
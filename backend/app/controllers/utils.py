@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.schemas.pagination import PaginatedResponse
+
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[SchemaT]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+@lru_cache(maxsize=settings.QUERY_COMPILE_CACHE_SIZE)
+def select_fields(schema: Type[SchemaT], fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Columns to select for a list endpoint rendering `schema`.
+
+    `fields` is a sparse fieldset ("id,name,year"); None or one naming no
+    field (blank, "," ...) selects every field of the schema. Fields keep
+    the schema's order.
+    """
+    available = tuple(schema.model_fields)
+    requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+    if not requested:
+        return available
+
+    for name in requested:
+        if name not in schema.model_fields:
+            raise HTTPException(status_code=400, detail=f"Cannot select field '{name}'")
+    return tuple(name for name in available if name in requested)
+
+
+def serialize_paginated(
+    result: PaginatedResponse, schema: Type[SchemaT], headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    """
+    Render a page through the provided read schema.
+
+    Projected pages (see `select_fields`) already hold plain dicts of
+    typed column values and are encoded as they are. ORM objects are
+    validated once, in a single pydantic-core call. Either way the
+    response is returned directly so FastAPI does not validate the page a
+    second time against the endpoint's response_model.
+    """
+    data = result.data
+    if data and not isinstance(data[0], dict):
+        adapter = _list_adapter(schema)
+        data = adapter.dump_python(adapter.validate_python(data, from_attributes=True))
+    return ORJSONResponse({"data": data, "meta": result.meta.model_dump()}, headers=headers)
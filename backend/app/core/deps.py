@@ -7,19 +7,33 @@ from pydantic import ValidationError
 
 from app.core.config import settings
 from app.core.db import AsyncSessionMaker, AsyncSession
+from app.core.principal import Principal, authz_versions, get_principal
+from app.core.replicas import replica_router
+from app.core.unit_of_work import UnitOfWork
 from app.schemas.auth import TokenPayload
-from app.models.rbac import User
 
 
 bearer_scheme = HTTPBearer(description="Enter your access token", auto_error=False)
 
 
-async def get_db() -> AsyncSession:
+async def get_session() -> AsyncSession:
+    """The request's primary session, open until the response is sent (streamed bodies included)."""
     async with AsyncSessionMaker() as session:
         yield session
 
 
-SessionDep = Annotated[AsyncSession, Depends(get_db)]
+async def get_db(session: Annotated[AsyncSession, Depends(get_session)]) -> AsyncSession:
+    """The request's session inside its unit of work.
+
+    Scoped to the endpoint function (use SessionDep): the transaction is
+    committed when the endpoint returns, before the response is sent, and
+    rolled back if it raises.
+    """
+    async with UnitOfWork(session):
+        yield session
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_db, scope="function")]
 
 
 def _unauthenticated(detail: str = "Not authenticated"):
@@ -47,7 +61,7 @@ def get_bearer_token(
 TokenDep = Annotated[str, Depends(get_bearer_token)]
 
 
-async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+async def get_current_user(session: SessionDep, token: TokenDep) -> Principal:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -66,15 +80,60 @@ async def get_current_user(session: SessionDep, token: TokenDep) -> User:
             detail="Invalid authentication subject",
         )
 
-    user = await session.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
+    if settings.AUTH_STATELESS_TOKENS and token_data.perms is not None and token_data.av is not None:
+        user = await _principal_from_token(session, user_id, token_data)
+    else:
+        user = await get_principal(session, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        if not user.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+
+    # Lets commits on this session pin the user's reads to the primary.
+    session.info["principal_id"] = user.id
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+async def _principal_from_token(
+    session: AsyncSession, user_id: int, token_data: TokenPayload
+) -> Principal:
+    """Authorize from the claims alone, rejecting tokens older than the user's authz version."""
+    current_version = await authz_versions.get(session, user_id, at_least=token_data.av)
+    if current_version is None or token_data.av < current_version:
+        _unauthenticated("Token has been revoked")
+
+    return Principal(
+        id=user_id,
+        is_active=True,
+        roles=frozenset(token_data.roles or ()),
+        permissions=frozenset(token_data.perms),
+        authz_version=token_data.av,
+    )
+
+
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+
+
+async def get_read_db(
+    session: Annotated[AsyncSession, Depends(get_session)], user: CurrentUser
+) -> AsyncSession:
+    """Session for read-only endpoints: a read replica when one is healthy.
+
+    Falls back to the request's primary session when no replicas are
+    configured or reachable, and for users who have just written.
+    """
+    replica = None
+    if replica_router.enabled and not replica_router.is_pinned(user.id):
+        replica = await replica_router.session()
+    if replica is None:
+        yield session
+        return
+
+    async with replica:
+        yield replica
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
 
 
 def require_permissions(*alternatives: Set[str]):
@@ -84,14 +143,9 @@ def require_permissions(*alternatives: Set[str]):
         if not user.roles:
             raise HTTPException(403, "User role not assigned")
 
-        user_perm_names: Set[str] = set()
-        for role in user.roles:
-            if role.permissions:
-                user_perm_names.update(p.name for p in role.permissions)
-
         # Check if ANY of the alternatives is satisfied
         for required in alternatives:
-            if required.issubset(user_perm_names):
+            if required.issubset(user.permissions):
                 return user
 
         raise HTTPException(
@@ -101,17 +155,25 @@ def require_permissions(*alternatives: Set[str]):
     return validator
 
 
-def has_permission(user: User | None, permission_name: str) -> bool:
+def has_permission(user: Principal | None, permission_name: str) -> bool:
     """Return True if `user` has a permission named `permission_name`.
 
-    This helper compares permission names (strings) to the Role->Permission model
-    relationships that are seeded/managed elsewhere in the application.
+    The permission set is resolved once per principal (see app.core.principal),
+    so this is a plain set lookup.
     """
-    if not user or not getattr(user, "roles", None):
+    if not user:
         return False
+    return permission_name in user.permissions
+
 
-    perm_names: Set[str] = set()
-    for role in user.roles:
-        if role.permissions:
-            perm_names.update(p.name for p in role.permissions)
-    return permission_name in perm_names
+def owner_scope(user: Principal, any_permission: str, own_permission: str) -> int | None:
+    """Whose rows `user` may write: None for any row, their id for their own.
+
+    `any_permission` grants every row, `own_permission` the rows the user
+    created; with neither the request is forbidden.
+    """
+    if has_permission(user, any_permission):
+        return None
+    if has_permission(user, own_permission):
+        return user.id
+    raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
@@ -0,0 +1,171 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request latency buckets in seconds (Prometheus client defaults).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Label used for requests that matched no route, to keep label cardinality bounded.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram keyed by a label tuple.
+
+    Only touched from the event loop thread, so updates need no lock;
+    buckets are stored non-cumulative and summed when rendered.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # [per-bucket counts (+Inf last), sum, count]
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, name: str, label_names: Tuple[str, ...]) -> Iterable[str]:
+        for labels, (counts, total, count) in self._series.items():
+            base = _labels(label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f'{name}_bucket{{{base},le="{bound}"}} {cumulative}'
+            yield f'{name}_bucket{{{base},le="+Inf"}} {count}'
+            yield f"{name}_sum{{{base}}} {total}"
+            yield f"{name}_count{{{base}}} {count}"
+
+
+class Metrics:
+    """Per-process HTTP metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+        self.in_flight = 0
+
+    def record(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.latency.observe((method, route), seconds)
+        key = (method, route, str(status))
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self, pools: Dict[str, dict], caches: Optional[Dict[str, dict]] = None) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+            *self.latency.render("http_request_duration_seconds", ("method", "route")),
+            "# HELP http_responses_total Responses by route template and status code.",
+            "# TYPE http_responses_total counter",
+            *(
+                f"http_responses_total{{{_labels(('method', 'route', 'status'), key)}}} {value}"
+                for key, value in self.responses.items()
+            ),
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        lines.extend(_render_pools(pools))
+        lines.extend(_render_caches(caches or {}))
+        return "\n".join(lines) + "\n"
+
+
+_POOL_GAUGES = (
+    ("size", "db_pool_size", "Configured pool size."),
+    ("checked_out", "db_pool_checked_out", "Connections currently checked out."),
+    ("checked_in", "db_pool_checked_in", "Idle connections in the pool."),
+    ("overflow", "db_pool_overflow", "Overflow connections currently open."),
+)
+_POOL_COUNTERS = (
+    ("checkouts", "db_pool_checkouts_total", "Connection checkouts."),
+    ("timeouts", "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection."),
+    ("wait_seconds_total", "db_pool_checkout_seconds_total", "Time spent checking out connections."),
+)
+
+
+def _render_pools(pools: Dict[str, dict]) -> Iterable[str]:
+    for kind, specs in (("gauge", _POOL_GAUGES), ("counter", _POOL_COUNTERS)):
+        for key, name, help_text in specs:
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} {kind}"
+            for pool_name, stats in pools.items():
+                yield f'{name}{{pool="{pool_name}"}} {stats[key]}'
+
+
+_CACHE_COUNTERS = (
+    ("hits", "cache_hits_total", "Reads answered from the cache."),
+    ("misses", "cache_misses_total", "Reads that went to the database."),
+    ("sets", "cache_sets_total", "Entries stored."),
+    ("evictions", "cache_evictions_total", "Entries dropped to make room."),
+    ("invalidations", "cache_invalidations_total", "Version counters bumped by writes."),
+    ("errors", "cache_errors_total", "Cache backend failures."),
+)
+
+
+def _render_caches(caches: Dict[str, dict]) -> Iterable[str]:
+    if not caches:
+        return
+    for key, name, help_text in _CACHE_COUNTERS:
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} counter"
+        for cache_name, stats in caches.items():
+            yield f'{name}{{cache="{cache_name}"}} {stats[key]}'
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and in-flight requests per route template.
+
+    The route template (e.g. "/generations/{generation_id}/specs") is read
+    from the matched route after the app ran, never the raw path.
+    """
+
+    def __init__(self, app: ASGIApp, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            route = scope.get("route")
+            registry.record(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                time.perf_counter() - started,
+            )
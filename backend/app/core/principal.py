@@ -0,0 +1,193 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.unit_of_work import after_commit
+from app.models.rbac import Permission, Role, User, role_permissions_table, user_roles_table
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated caller with roles and permissions already resolved.
+
+    This is what `get_current_user` hands to controllers and services instead
+    of the ORM `User`, so authorization never touches the RBAC relationships.
+    """
+
+    id: int
+    is_active: bool
+    roles: FrozenSet[str]
+    permissions: FrozenSet[str]
+    authz_version: int = 0
+
+
+class PrincipalCache:
+    """
+    In-process user id -> Principal cache with TTL.
+
+    Repositories that change a user's roles, a role's permissions or the user
+    row itself must call `invalidate()` / `clear()` so the next request
+    re-resolves the principal. The TTL bounds staleness across workers.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[Principal, float]] = {}
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        if len(self._entries) >= self.max_entries and principal.id not in self._entries:
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+
+async def load_principal(session: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Resolve a user's roles and permission names in a single flat query."""
+    query = (
+        select(User.is_active, User.authz_version, Role.name, Permission.name)
+        .select_from(User)
+        .outerjoin(user_roles_table, user_roles_table.c.user_id == User.id)
+        .outerjoin(Role, Role.id == user_roles_table.c.role_id)
+        .outerjoin(role_permissions_table, role_permissions_table.c.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == role_permissions_table.c.permission_id)
+        .where(User.id == user_id)
+    )
+    rows = (await session.execute(query)).all()
+    if not rows:
+        return None
+
+    return Principal(
+        id=user_id,
+        is_active=bool(rows[0][0]),
+        roles=frozenset(role for _, _, role, _ in rows if role is not None),
+        permissions=frozenset(perm for _, _, _, perm in rows if perm is not None),
+        authz_version=rows[0][1],
+    )
+
+
+async def get_principal(session: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Cached `load_principal`; a hit costs no database round-trip."""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = await load_principal(session, user_id)
+        if principal is not None:
+            principal_cache.set(principal)
+    return principal
+
+
+class AuthzVersionTable:
+    """
+    Periodically refreshed user id -> authz version map for active users.
+
+    Tokens carry the authz version their permissions were resolved at; a
+    token older than the user's version (role change, password change) or
+    belonging to a deactivated or deleted user is rejected. Bumps made by
+    this process are applied immediately, other workers see them after the
+    refresh interval; a token newer than the table (issued by another
+    worker since) makes `get` read that user's row.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._refreshed_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _is_stale(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= self.refresh_seconds
+        )
+
+    async def refresh(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(User.id, User.authz_version).where(User.is_active.is_(True))
+        )
+        self._versions = dict(result.all())
+        self._refreshed_at = time.monotonic()
+
+    async def get(
+        self, session: AsyncSession, user_id: int, at_least: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Current version of an active user, or None if inactive/deleted.
+
+        When the table has no version for the user, or one below `at_least`,
+        it may just be behind: the user's row is read instead.
+        """
+        if self._is_stale():
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._is_stale():
+                    await self.refresh(session)
+        version = self._versions.get(user_id)
+        if at_least is not None and (version is None or version < at_least):
+            version = await self._load(session, user_id)
+        return version
+
+    async def _load(self, session: AsyncSession, user_id: int) -> Optional[int]:
+        version = (
+            await session.execute(
+                select(User.authz_version).where(User.id == user_id, User.is_active.is_(True))
+            )
+        ).scalar_one_or_none()
+        if version is None:
+            self.discard(user_id)
+        else:
+            self._versions[user_id] = version
+        return version
+
+    def update(self, versions: Iterable[Tuple[int, int]]) -> None:
+        self._versions.update(versions)
+
+    def discard(self, user_id: int) -> None:
+        self._versions.pop(user_id, None)
+
+
+authz_versions = AuthzVersionTable(refresh_seconds=settings.AUTHZ_VERSION_REFRESH_SECONDS)
+
+
+async def bump_authz_version(session: AsyncSession, *where) -> None:
+    """Increment authz_version for the users matching `where`.
+
+    Runs in the caller's unit of work; tokens issued before the bump stop
+    passing the stateless check once it is committed.
+    """
+    result = await session.execute(
+        update(User)
+        .where(*where)
+        .values(authz_version=User.authz_version + 1)
+        .returning(User.id, User.authz_version)
+        .execution_options(synchronize_session=False)
+    )
+    after_commit(session, authz_versions.update, result.all())
@@ -0,0 +1,154 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """SQL executed on behalf of one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    shapes: Counter = field(default_factory=Counter)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being handled, or None outside an instrumented request."""
+    return _current.get()
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declare the most queries an endpoint may run (principal lookup included).
+
+    Only checked when QUERY_BUDGETS_ENFORCED is set, e.g. in CI:
+
+        @router.get("/{brand_id}")
+        @query_budget(3)
+        async def get_brand(...): ...
+    """
+    def decorator(endpoint: F) -> F:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+# ---------------------------------------
+# Engine events
+# ---------------------------------------
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_query_stats_started", None)
+    if stats is None or started is None:
+        return
+    stats.count += 1
+    stats.seconds += time.perf_counter() - started
+    stats.rows += max(cursor.rowcount, 0)
+    # Bound parameters are placeholders, so the SQL text is the statement shape.
+    stats.shapes[statement] += 1
+
+
+# ---------------------------------------
+# Middleware
+# ---------------------------------------
+
+class QueryStatsMiddleware:
+    """
+    Counts queries, DB time and rows per request.
+
+    Adds `Server-Timing` and `X-DB-Queries` response headers, logs one
+    structured line per request and warns when a statement shape runs
+    more than `repeat_threshold` times (likely N+1). With
+    `enforce_budgets`, a request exceeding its endpoint's `query_budget`
+    raises QueryBudgetExceeded so tests fail.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 10, enforce_budgets: bool = False):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.enforce_budgets = enforce_budgets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"',
+                )
+                headers.append("X-DB-Queries", str(stats.count))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        repeated = {
+            shape: times for shape, times in stats.shapes.items()
+            if times > self.repeat_threshold
+        }
+        logger.info(
+            "%s %s queries=%d db_ms=%.1f rows=%d",
+            scope["method"], path, stats.count, stats.seconds * 1000, stats.rows,
+            extra={
+                "route": path,
+                "db_queries": stats.count,
+                "db_ms": round(stats.seconds * 1000, 3),
+                "db_rows": stats.rows,
+                "db_repeated_statements": len(repeated),
+            },
+        )
+        for shape, times in repeated.items():
+            logger.warning(
+                "Possible N+1 on %s %s: statement ran %d times: %s",
+                scope["method"], path, times, shape,
+            )
+
+        budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+        if self.enforce_budgets and budget is not None and stats.count > budget:
+            raise QueryBudgetExceeded(
+                f"{scope['method']} {path} ran {stats.count} queries, budget is {budget}"
+            )
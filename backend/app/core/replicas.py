@@ -0,0 +1,95 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import read_engines
+from app.core.unit_of_work import wrote
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """
+    Hands out sessions on read replicas, round-robin, skipping unhealthy ones.
+
+    A replica that fails to connect is skipped for `retry_seconds`; when no
+    replica is usable `session()` returns None and the caller reads from the
+    primary. Users who just committed a write are pinned to the primary for
+    `sticky_seconds` so they read their own writes despite replication lag
+    (per worker process).
+    """
+
+    def __init__(self, engines: List[AsyncEngine], retry_seconds: float, sticky_seconds: float):
+        self.retry_seconds = retry_seconds
+        self.sticky_seconds = sticky_seconds
+        self._makers = [
+            async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+            for engine in engines
+        ]
+        self._down_until = [0.0] * len(engines)
+        self._next = 0
+        self._pins: Dict[int, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._makers)
+
+    async def session(self) -> Optional[AsyncSession]:
+        """A session already connected to a healthy replica, or None."""
+        for _ in range(len(self._makers)):
+            index = self._next
+            self._next = (index + 1) % len(self._makers)
+            if self._down_until[index] > time.monotonic():
+                continue
+
+            session = self._makers[index]()
+            try:
+                # Connect now so an unreachable replica is detected here
+                # rather than half way through the request.
+                await session.connection()
+            except (OSError, SQLAlchemyError):
+                await session.close()
+                self._down_until[index] = time.monotonic() + self.retry_seconds
+                logger.warning("Read replica %d unavailable, skipping for %ss", index, self.retry_seconds)
+                continue
+            return session
+        return None
+
+    def pin(self, user_id: int) -> None:
+        if self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        if len(self._pins) >= 10000:
+            self._pins = {uid: until for uid, until in self._pins.items() if until > now}
+        self._pins[user_id] = now + self.sticky_seconds
+
+    def is_pinned(self, user_id: int) -> bool:
+        until = self._pins.get(user_id)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._pins.pop(user_id, None)
+            return False
+        return True
+
+
+replica_router = ReplicaRouter(
+    read_engines,
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer(session: Session) -> None:
+    # get_current_user records the caller on the request's primary session;
+    # every request commits its unit of work, but only writes pin.
+    user_id = session.info.get("principal_id")
+    if user_id is not None and replica_router.enabled and wrote(session):
+        replica_router.pin(user_id)
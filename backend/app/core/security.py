@@ -1,23 +1,43 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Mapping
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional, TypeVar
 import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from app.core.principal import Principal
+
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop.
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_semaphore: Optional[asyncio.Semaphore] = None
+
+T = TypeVar("T")
+
 
 def create_access_token(
     user_id: int,
     expires_delta: timedelta,
     extra_claims: Mapping[str, Any] | None = None,
+    principal: "Principal | None" = None,
 ) -> str:
-    """Create a short-lived JWT tied to the numeric user id."""
+    """Create a short-lived JWT tied to the numeric user id.
+
+    When `principal` is given, its roles, permissions and authz version are
+    embedded so `get_current_user` can authorize without a database lookup.
+    """
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode: dict[str, Any] = {"exp": expire, "sub": str(user_id)}
     if extra_claims:
         to_encode.update(extra_claims)
+    if principal is not None:
+        to_encode["roles"] = sorted(principal.roles)
+        to_encode["perms"] = sorted(principal.permissions)
+        to_encode["av"] = principal.authz_version
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -28,3 +48,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` on the password hashing pool; use from async code."""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """`get_password_hash` on the password hashing pool; use from async code."""
+    return await _run_password_job(get_password_hash, password)
+
+
+async def _run_password_job(func: Callable[..., T], *args) -> T:
+    global _password_executor, _password_semaphore
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_POOL_SIZE,
+            thread_name_prefix="password-hash",
+        )
+    if _password_semaphore is None:
+        _password_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+
+    # Bound in-flight jobs so a login burst queues here instead of piling
+    # unbounded work onto the executor.
+    async with _password_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+
+
+def shutdown_password_executor() -> None:
+    global _password_executor, _password_semaphore
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+    _password_executor = None
+    _password_semaphore = None
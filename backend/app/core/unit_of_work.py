@@ -0,0 +1,95 @@
+"""
+One transaction per request.
+
+Repositories execute their statements in the session's transaction and
+never commit. A UnitOfWork wraps a whole request (see deps.get_db): it
+commits once when the block exits cleanly and rolls back if it raises, so
+a service's steps succeed or fail together. Work that must wait until the
+data is visible to other sessions -- cache invalidation above all -- is
+registered with `after_commit`; a rollback discards it.
+"""
+import inspect
+from typing import Any, Callable, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+
+# Execution options for a SELECT that writes through data-modifying CTEs,
+# so its transaction still counts as a writing one (see `wrote`).
+WRITES = {"writes": True}
+
+_UNIT_OF_WORK = "unit_of_work"
+_WROTE = "unit_of_work_wrote"
+
+
+class UnitOfWork:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._after_commit: List[Tuple[Callable[..., Any], tuple]] = []
+
+    @staticmethod
+    def of(session: AsyncSession) -> "UnitOfWork":
+        """The unit of work `session` is taking part in."""
+        unit = session.info.get(_UNIT_OF_WORK)
+        if unit is None:
+            raise RuntimeError("No unit of work is active on this session")
+        return unit
+
+    def after_commit(self, callback: Callable[..., Any], *args) -> None:
+        """Call `callback(*args)` (awaiting it if it is a coroutine) once committed."""
+        self._after_commit.append((callback, args))
+
+    async def commit(self) -> None:
+        await self.session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback, args in callbacks:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                await result
+
+    async def rollback(self) -> None:
+        self._after_commit.clear()
+        await self.session.rollback()
+
+    async def __aenter__(self) -> "UnitOfWork":
+        if _UNIT_OF_WORK in self.session.info:
+            raise RuntimeError("A unit of work is already active on this session")
+        self.session.info[_UNIT_OF_WORK] = self
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                await self.rollback()
+        finally:
+            self.session.info.pop(_UNIT_OF_WORK, None)
+
+
+def after_commit(session: AsyncSession, callback: Callable[..., Any], *args) -> None:
+    """Register `callback(*args)` with the unit of work `session` is taking part in."""
+    UnitOfWork.of(session).after_commit(callback, *args)
+
+
+def wrote(session: Session) -> bool:
+    """Whether the session's current transaction has written anything."""
+    return session.info.get(_WROTE, False)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_write(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete or state.execution_options.get("writes"):
+        state.session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session: Session, flush_context) -> None:
+    session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_wrote(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_WROTE, None)
@@ -1,8 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.controllers import login, user, role
+from app.controllers import diagnostics, login, metrics, user, role
 from app.controllers.car import car_routers
+from app.core.config import settings
+from app.core.db import engine, read_engines
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware, instrument_engine
+from app.core.responses import ORJSONResponse
 from app.startup_bootstrap import lifespan
 
 
@@ -13,6 +18,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -24,10 +30,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL query counting (opt-in)
+if settings.QUERY_STATS_ENABLED or settings.QUERY_BUDGETS_ENFORCED:
+    for db_engine in (engine, *read_engines):
+        instrument_engine(db_engine)
+    app.add_middleware(
+        QueryStatsMiddleware,
+        repeat_threshold=settings.QUERY_STATS_REPEAT_THRESHOLD,
+        enforce_budgets=settings.QUERY_BUDGETS_ENFORCED,
+    )
+
+# Route-level latency metrics (outermost, so it times the whole stack)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(login.router)
 app.include_router(user.router)
 app.include_router(role.router)
+app.include_router(diagnostics.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 for router in car_routers:
     app.include_router(router)
 
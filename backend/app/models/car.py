@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import BigInteger, Column, Index, Integer, String, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from app.core.db import Base
 
 
@@ -12,6 +14,7 @@ class Brand(Base):
 
 class Model(Base):
     __tablename__ = "models"
+    __table_args__ = (UniqueConstraint("brand_id", "name", name="uq_models_brand_id_name"),)
 
     id = Column(Integer, primary_key=True)
     brand_id = Column(Integer, ForeignKey("brands.id", ondelete="CASCADE"))
@@ -21,6 +24,7 @@ class Model(Base):
 
 class Submodel(Base):
     __tablename__ = "submodels"
+    __table_args__ = (UniqueConstraint("model_id", "name", name="uq_submodels_model_id_name"),)
 
     id = Column(Integer, primary_key=True)
     model_id = Column(Integer, ForeignKey("models.id", ondelete="CASCADE"))
@@ -30,6 +34,10 @@ class Submodel(Base):
 
 class Generation(Base):
     __tablename__ = "generations"
+    __table_args__ = (
+        UniqueConstraint("submodel_id", "name", name="uq_generations_submodel_id_name"),
+        Index("ix_generations_submodel_id_year_start_id", "submodel_id", "year_start", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     submodel_id = Column(Integer, ForeignKey("submodels.id", ondelete="CASCADE"))
@@ -41,6 +49,19 @@ class Generation(Base):
 
 class CarSpec(Base):
     __tablename__ = "car_specs"
+    __table_args__ = (
+        UniqueConstraint("generation_id", "name", "year", name="uq_car_specs_generation_id_name_year"),
+        Index("ix_car_specs_generation_id_year_id", "generation_id", "year", "id"),
+        Index("ix_car_specs_search_text_trgm", "search_text",
+              postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+        Index("ix_car_specs_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # Columns usable in `filters` / `sort_by` (see app.utils.query_builder)
+    __filterable__ = (
+        "id", "generation_id", "name", "engine", "horsepower", "torque",
+        "fuel_type", "year", "created_by",
+    )
+    __sortable__ = __filterable__
 
     id = Column(Integer, primary_key=True)
     generation_id = Column(Integer, ForeignKey("generations.id", ondelete="CASCADE"))
@@ -51,11 +72,63 @@ class CarSpec(Base):
     fuel_type = Column(String(50), nullable=False)
     year = Column(Integer, nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # From the spec and its parents' names: written by the catalog import,
+    # otherwise by database triggers (see d4f81b2c6e07).
+    search_text = deferred(Column(Text))
+    search_vector = deferred(Column(TSVECTOR))
+
+
+class SpecCatalog(Base):
+    """
+    Read-only copy of every car spec with its generation, submodel, model
+    and brand ids and names, maintained by database triggers.
+    """
+    __tablename__ = "spec_catalog"
+    __table_args__ = (
+        Index("ix_spec_catalog_generation_id", "generation_id"),
+        Index("ix_spec_catalog_submodel_id", "submodel_id"),
+        Index("ix_spec_catalog_model_id", "model_id"),
+        Index("ix_spec_catalog_brand_id", "brand_id"),
+    )
+    __filterable__ = CarSpec.__filterable__ + (
+        "generation_name", "submodel_id", "submodel_name", "model_id", "model_name",
+        "brand_id", "brand_name",
+    )
+    __sortable__ = __filterable__
+
+    id = Column(Integer, ForeignKey("car_specs.id", ondelete="CASCADE"), primary_key=True)
+    generation_id = Column(Integer, nullable=False)
+    name = Column(String(100), nullable=False)
+    engine = Column(String(100), nullable=False)
+    horsepower = Column(Integer, nullable=False)
+    torque = Column(Integer, nullable=False)
+    fuel_type = Column(String(50), nullable=False)
+    year = Column(Integer, nullable=False)
+    created_by = Column(Integer, nullable=False)
+    generation_name = Column(String(100), nullable=False)
+    submodel_id = Column(Integer, nullable=False)
+    submodel_name = Column(String(100), nullable=False)
+    model_id = Column(Integer, nullable=False)
+    model_name = Column(String(100), nullable=False)
+    brand_id = Column(Integer, nullable=False)
+    brand_name = Column(String(100), nullable=False)
 
 
 class UserCars(Base):
     __tablename__ = "user_cars"
+    __table_args__ = (
+        Index("uq_user_cars_user_id_car_spec_id", "user_id", "car_spec_id", unique=True),
+        Index("ix_user_cars_car_spec_id", "car_spec_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    car_spec_id = Column(Integer, ForeignKey("car_specs.id", ondelete="CASCADE"))
\ No newline at end of file
+    car_spec_id = Column(Integer, ForeignKey("car_specs.id", ondelete="CASCADE"))
+
+
+class CatalogVersion(Base):
+    """Monotonic version counters for catalog data, bumped on every write."""
+    __tablename__ = "catalog_versions"
+
+    scope = Column(String(100), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
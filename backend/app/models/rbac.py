@@ -22,11 +22,17 @@ user_roles_table = Table(
 
 class User(Base):
     __tablename__ = "users"
+    # Columns usable in `filters` / `sort_by` (see app.utils.query_builder)
+    __filterable__ = ("id", "username", "is_active", "created_at")
+    __sortable__ = ("id", "username", "is_active", "created_at")
+    # Columns list endpoints may project (never the password hash)
+    __selectable__ = ("id", "username", "is_active", "created_at")
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(255), unique=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
+    authz_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(TIMESTAMP, server_default=func.now())
     roles = relationship("Role", secondary=user_roles_table, back_populates="users", lazy="selectin")
 
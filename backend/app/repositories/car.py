@@ -1,9 +1,97 @@
-from typing import Optional, List
+import re
+from typing import AsyncIterator, Callable, Dict, NamedTuple, Optional, List, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-
-from app.models.car import Brand, Model, Submodel, Generation, CarSpec, UserCars
+from sqlalchemy import (
+    ARRAY, Integer, String, any_, column, exists, false, select, delete, func, literal, or_, true,
+    union_all, update, values,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.engine import Result, Row, RowMapping
+from sqlalchemy.exc import IntegrityError
+
+from app.core.unit_of_work import WRITES, UnitOfWork, after_commit
+from app.models.car import Brand, Model, Submodel, Generation, CarSpec, SpecCatalog, UserCars, CatalogVersion
+from app.utils.count_cache import count_cache
 from app.utils.paginate import paginate
+from app.utils.query_builder import compile_query, order_by_keys
+
+
+# Tables losing rows through ON DELETE CASCADE when a row of the key table is deleted.
+_CASCADE_TABLES = {
+    "brands": ("brands", "models", "submodels", "generations", "car_specs", "spec_catalog", "user_cars"),
+    "models": ("models", "submodels", "generations", "car_specs", "spec_catalog", "user_cars"),
+    "submodels": ("submodels", "generations", "car_specs", "spec_catalog", "user_cars"),
+    "generations": ("generations", "car_specs", "spec_catalog", "user_cars"),
+    "car_specs": ("car_specs", "spec_catalog", "user_cars"),
+}
+
+# Trigger-maintained copy of the specs and their parents' names: inserting
+# specs and updating any catalog row can change it.
+_SPEC_CATALOG = "spec_catalog"
+
+# CarSpec columns exposed by read schemas (excludes the derived search columns).
+_SPEC_COLUMNS = (
+    CarSpec.id,
+    CarSpec.generation_id,
+    CarSpec.name,
+    CarSpec.engine,
+    CarSpec.horsepower,
+    CarSpec.torque,
+    CarSpec.fuel_type,
+    CarSpec.year,
+    CarSpec.created_by,
+)
+
+# catalog_versions scope covering the whole brand -> spec hierarchy.
+CATALOG_SCOPE = "catalog"
+
+# Tables with their own catalog_versions scope (named after the table), in
+# the order scopes are bumped so concurrent writers lock rows consistently.
+_CATALOG_TABLES = ("brands", "models", "submodels", "generations", "car_specs")
+
+# asyncpg caps a statement at 32767 bind parameters.
+_MAX_BIND_PARAMS = 32767
+
+_FOREIGN_KEY_VIOLATION = "23503"
+
+
+class OwnedWrite(NamedTuple):
+    """Outcome of an update or delete limited to rows the caller may write."""
+    found: bool                 # the row exists (under the given parent)
+    row: Optional[Row] = None   # RETURNING row; None when not found or not the caller's
+
+
+# Parent foreign key of each catalog table (brands have none).
+_PARENT_COLUMN = {
+    Model: Model.brand_id,
+    Submodel: Submodel.model_id,
+    Generation: Generation.submodel_id,
+    CarSpec: CarSpec.generation_id,
+}
+
+
+def _read_columns(model):
+    """Columns returned for a written row (deferred columns left out)."""
+    return [model.__table__.c[attr.key] for attr in model.__mapper__.column_attrs if not attr.deferred]
+
+
+def _catalog_version_bump(tables: Sequence[str], when=None):
+    """
+    Upsert incrementing the catalog version and those of `tables`; when
+    `when` (a CTE) is given, only if it returned rows.
+    """
+    scopes = [CATALOG_SCOPE, *(table for table in _CATALOG_TABLES if table in tables)]
+    if when is None:
+        stmt = insert(CatalogVersion).values([{"scope": scope, "version": 1} for scope in scopes])
+    else:
+        rows = values(column("scope", String), name="scopes").data([(scope,) for scope in scopes])
+        stmt = insert(CatalogVersion).from_select(
+            ["scope", "version"],
+            select(rows.c.scope, literal(1)).where(select(when.c.id).exists()),
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=["scope"], set_={"version": CatalogVersion.version + 1}
+    )
 
 
 class CarRepository:
@@ -14,17 +102,168 @@ class CarRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    # ====================================================================
+    # CATALOG VERSION
+    # ====================================================================
+
+    async def get_catalog_version(self, scope: str = CATALOG_SCOPE) -> int:
+        """Version of the whole catalog, or of one table's rows when `scope` is a table name."""
+        result = await self.db.execute(
+            select(CatalogVersion.version).where(CatalogVersion.scope == scope)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def get_catalog_tree_rows(self, include_specs: bool = False) -> List[RowMapping]:
+        """
+        The whole hierarchy as one flat outer-joined result, ordered so each
+        parent's children are contiguous.
+        """
+        columns = [
+            Brand.id.label("brand_id"),
+            Brand.name.label("brand_name"),
+            Model.id.label("model_id"),
+            Model.name.label("model_name"),
+            Submodel.id.label("submodel_id"),
+            Submodel.name.label("submodel_name"),
+            Generation.id.label("generation_id"),
+            Generation.name.label("generation_name"),
+            Generation.year_start,
+            Generation.year_end,
+        ]
+        order_by = [Brand.name, Brand.id, Model.name, Model.id, Submodel.name, Submodel.id,
+                    Generation.year_start, Generation.id]
+        query = (
+            select(*columns)
+            .outerjoin(Model, Model.brand_id == Brand.id)
+            .outerjoin(Submodel, Submodel.model_id == Model.id)
+            .outerjoin(Generation, Generation.submodel_id == Submodel.id)
+        )
+        if include_specs:
+            query = query.add_columns(
+                CarSpec.id.label("spec_id"),
+                CarSpec.name.label("spec_name"),
+                CarSpec.engine,
+                CarSpec.horsepower,
+                CarSpec.torque,
+                CarSpec.fuel_type,
+                CarSpec.year,
+            ).outerjoin(CarSpec, CarSpec.generation_id == Generation.id)
+            order_by += [CarSpec.year, CarSpec.id]
+
+        result = await self.db.execute(query.order_by(*order_by))
+        return result.mappings().all()
+
+    async def _bump_catalog_version(self, *tables: str):
+        """
+        Increment the catalog version and those of `tables` in the caller's
+        transaction (other tables in the list, e.g. user_cars, have no
+        version) and drop the cached counts of all of them once it commits.
+        """
+        await self.db.execute(_catalog_version_bump(tables))
+        after_commit(self.db, count_cache.invalidate, *tables)
+
+    async def _exists(self, model, row_id: int) -> bool:
+        result = await self.db.execute(select(exists().where(model.id == row_id)))
+        return result.scalar_one()
+
+    @staticmethod
+    def _child_insert(model, parent, parent_id: int, **values):
+        """INSERT ... SELECT `values` WHERE EXISTS (parent row)."""
+        table = model.__table__
+        row = select(*(literal(value, table.c[key].type) for key, value in values.items()))
+        return insert(model).from_select(
+            list(values), row.where(exists().where(parent.id == parent_id))
+        )
+
+    async def _execute_child_insert(self, stmt) -> Optional[Result]:
+        """
+        Execute a statement inserting child rows; None when a concurrent
+        parent delete makes it fail its foreign key (the unit of work is
+        rolled back then, its transaction being aborted).
+        """
+        try:
+            return await self.db.execute(stmt)
+        except IntegrityError as e:
+            if getattr(e.orig, "sqlstate", None) != _FOREIGN_KEY_VIOLATION:
+                raise
+            await UnitOfWork.of(self.db).rollback()
+            return None
+
+    async def _insert_child(self, model, parent, parent_id: int, **values):
+        """
+        INSERT ... SELECT ... WHERE EXISTS (parent row) RETURNING the new
+        row, so checking the parent costs no extra round-trip. Returns None
+        when the parent does not exist.
+        """
+        result = await self._execute_child_insert(
+            self._child_insert(model, parent, parent_id, **values).returning(model)
+        )
+        return None if result is None else result.scalar_one_or_none()
+
+    async def _write_owned(
+        self, model, row_id: int, parent_id: Optional[int], owner_id: Optional[int],
+        changes: Optional[dict],
+    ) -> OwnedWrite:
+        """
+        Update row `row_id` of `model` with `changes`, or delete it when
+        `changes` is None, in one statement that also bumps the catalog
+        versions. The row must sit under `parent_id` and, unless
+        `owner_id` is None, have been created by `owner_id`.
+
+        A CTE reads the row without the ownership predicate, so the
+        result tells a missing row from someone else's.
+        """
+        table = model.__tablename__
+        where = [model.id == row_id]
+        parent_column = _PARENT_COLUMN.get(model)
+        if parent_column is not None:
+            where.append(parent_column == parent_id)
+        target = select(model.created_by).where(*where).cte("target")
+
+        if owner_id is not None:
+            where.append(model.created_by == owner_id)
+        if changes is None:
+            write = delete(model).where(*where).returning(model.id)
+            bumped = _CASCADE_TABLES[table]
+        elif changes:
+            write = update(model).where(*where).values(**changes).returning(*_read_columns(model))
+            bumped = (table, _SPEC_CATALOG)
+        else:
+            # Nothing to write: report the row as an update would have.
+            write = select(*_read_columns(model)).where(*where)
+            bumped = ()
+        written = write.cte("written")
+
+        stmt = select(target.c.created_by.label("owner_id"), *written.c).select_from(
+            target.outerjoin(written, true())
+        )
+        if bumped:
+            stmt = stmt.add_cte(_catalog_version_bump(bumped, written).cte("bump"))
+
+        row = (await self.db.execute(stmt.execution_options(**WRITES))).one_or_none()
+        if row is None:
+            return OwnedWrite(found=False)
+        if row.id is None:
+            return OwnedWrite(found=True)
+        if bumped:
+            after_commit(self.db, count_cache.invalidate, *bumped)
+        return OwnedWrite(found=True, row=row)
+
     # ====================================================================
     # BRAND OPERATIONS
     # ====================================================================
 
     async def create_brand(self, name: str, created_by: int) -> Brand:
-        brand = Brand(name=name, created_by=created_by)
-        self.db.add(brand)
-        await self.db.commit()
-        await self.db.refresh(brand)
+        result = await self.db.execute(
+            insert(Brand).values(name=name, created_by=created_by).returning(Brand)
+        )
+        brand = result.scalar_one()
+        await self._bump_catalog_version("brands")
         return brand
 
+    async def brand_exists(self, brand_id: int) -> bool:
+        return await self._exists(Brand, brand_id)
+
     async def get_brand_by_id(self, brand_id: int) -> Optional[Brand]:
         result = await self.db.execute(select(Brand).where(Brand.id == brand_id))
         return result.scalar_one_or_none()
@@ -33,7 +272,7 @@ class CarRepository:
         result = await self.db.execute(select(Brand).order_by(Brand.name))
         return result.scalars().all()
 
-    async def get_brands_paginated(self, page, per_page, sort_by, filters):
+    async def get_brands_paginated(self, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         return await paginate(
             session=self.db,
             model=Brand,
@@ -41,31 +280,34 @@ class CarRepository:
             per_page=per_page,
             sort_by=sort_by,
             filters=filters,
+            cursor=cursor,
+            count=count,
+            fields=fields,
         )
 
-    async def delete_brand(self, brand_id: int):
-        await self.db.execute(delete(Brand).where(Brand.id == brand_id))
-        await self.db.commit()
+    async def delete_brand(self, brand_id: int, owner_id: Optional[int] = None) -> OwnedWrite:
+        return await self._write_owned(Brand, brand_id, None, owner_id, None)
 
-    async def update_brand(self, brand: Brand, **kwargs) -> Brand:
-        for key, value in kwargs.items():
-            setattr(brand, key, value)
-        self.db.add(brand)
-        await self.db.commit()
-        await self.db.refresh(brand)
-        return brand
+    async def update_brand(self, brand_id: int, owner_id: Optional[int] = None, **kwargs) -> OwnedWrite:
+        return await self._write_owned(Brand, brand_id, None, owner_id, kwargs)
 
     # ====================================================================
     # MODEL OPERATIONS
     # ====================================================================
 
-    async def create_model(self, brand_id: int, name: str, created_by: int) -> Model:
-        model = Model(brand_id=brand_id, name=name, created_by=created_by)
-        self.db.add(model)
-        await self.db.commit()
-        await self.db.refresh(model)
+    async def create_model(self, brand_id: int, name: str, created_by: int) -> Optional[Model]:
+        """The new model, or None if the brand does not exist."""
+        model = await self._insert_child(
+            Model, Brand, brand_id, brand_id=brand_id, name=name, created_by=created_by
+        )
+        if model is None:
+            return None
+        await self._bump_catalog_version("models")
         return model
 
+    async def model_exists(self, model_id: int) -> bool:
+        return await self._exists(Model, model_id)
+
     async def get_model_by_id(self, model_id: int) -> Optional[Model]:
         result = await self.db.execute(select(Model).where(Model.id == model_id))
         return result.scalar_one_or_none()
@@ -75,7 +317,7 @@ class CarRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get_models_paginated(self, brand_id, page, per_page, sort_by, filters):
+    async def get_models_paginated(self, brand_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         base_query = select(Model).where(Model.brand_id == brand_id)
         return await paginate(
             session=self.db,
@@ -85,31 +327,38 @@ class CarRepository:
             sort_by=sort_by,
             filters=filters,
             base_query=base_query,
+            cursor=cursor,
+            count=count,
+            fields=fields,
         )
 
-    async def delete_model(self, model_id: int):
-        await self.db.execute(delete(Model).where(Model.id == model_id))
-        await self.db.commit()
+    async def delete_model(
+        self, model_id: int, brand_id: int, owner_id: Optional[int] = None
+    ) -> OwnedWrite:
+        return await self._write_owned(Model, model_id, brand_id, owner_id, None)
 
-    async def update_model(self, model: Model, **kwargs) -> Model:
-        for key, value in kwargs.items():
-            setattr(model, key, value)
-        self.db.add(model)
-        await self.db.commit()
-        await self.db.refresh(model)
-        return model
+    async def update_model(
+        self, model_id: int, brand_id: int, owner_id: Optional[int] = None, **kwargs
+    ) -> OwnedWrite:
+        return await self._write_owned(Model, model_id, brand_id, owner_id, kwargs)
 
     # ====================================================================
     # SUBMODEL OPERATIONS
     # ====================================================================
 
-    async def create_submodel(self, model_id: int, name: str, created_by: int) -> Submodel:
-        submodel = Submodel(model_id=model_id, name=name, created_by=created_by)
-        self.db.add(submodel)
-        await self.db.commit()
-        await self.db.refresh(submodel)
+    async def create_submodel(self, model_id: int, name: str, created_by: int) -> Optional[Submodel]:
+        """The new submodel, or None if the model does not exist."""
+        submodel = await self._insert_child(
+            Submodel, Model, model_id, model_id=model_id, name=name, created_by=created_by
+        )
+        if submodel is None:
+            return None
+        await self._bump_catalog_version("submodels")
         return submodel
 
+    async def submodel_exists(self, submodel_id: int) -> bool:
+        return await self._exists(Submodel, submodel_id)
+
     async def get_submodel_by_id(self, submodel_id: int) -> Optional[Submodel]:
         result = await self.db.execute(select(Submodel).where(Submodel.id == submodel_id))
         return result.scalar_one_or_none()
@@ -119,7 +368,7 @@ class CarRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get_submodels_paginated(self, model_id, page, per_page, sort_by, filters):
+    async def get_submodels_paginated(self, model_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         base_query = select(Submodel).where(Submodel.model_id == model_id)
         return await paginate(
             self.db,
@@ -129,19 +378,20 @@ class CarRepository:
             sort_by,
             filters,
             base_query,
+            cursor=cursor,
+            count=count,
+            fields=fields,
         )
 
-    async def delete_submodel(self, submodel_id: int):
-        await self.db.execute(delete(Submodel).where(Submodel.id == submodel_id))
-        await self.db.commit()
+    async def delete_submodel(
+        self, submodel_id: int, model_id: int, owner_id: Optional[int] = None
+    ) -> OwnedWrite:
+        return await self._write_owned(Submodel, submodel_id, model_id, owner_id, None)
 
-    async def update_submodel(self, submodel: Submodel, **kwargs) -> Submodel:
-        for key, value in kwargs.items():
-            setattr(submodel, key, value)
-        self.db.add(submodel)
-        await self.db.commit()
-        await self.db.refresh(submodel)
-        return submodel
+    async def update_submodel(
+        self, submodel_id: int, model_id: int, owner_id: Optional[int] = None, **kwargs
+    ) -> OwnedWrite:
+        return await self._write_owned(Submodel, submodel_id, model_id, owner_id, kwargs)
 
     # ====================================================================
     # GENERATION OPERATIONS
@@ -152,19 +402,26 @@ class CarRepository:
         year_start: Optional[int] = None,
         year_end: Optional[int] = None,
         created_by: int = None
-    ) -> Generation:
-        generation = Generation(
+    ) -> Optional[Generation]:
+        """The new generation, or None if the submodel does not exist."""
+        generation = await self._insert_child(
+            Generation,
+            Submodel,
+            submodel_id,
             submodel_id=submodel_id,
             name=name,
             year_start=year_start,
             year_end=year_end,
-            created_by=created_by
+            created_by=created_by,
         )
-        self.db.add(generation)
-        await self.db.commit()
-        await self.db.refresh(generation)
+        if generation is None:
+            return None
+        await self._bump_catalog_version("generations")
         return generation
 
+    async def generation_exists(self, generation_id: int) -> bool:
+        return await self._exists(Generation, generation_id)
+
     async def get_generation_by_id(self, generation_id: int) -> Optional[Generation]:
         result = await self.db.execute(select(Generation).where(Generation.id == generation_id))
         return result.scalar_one_or_none()
@@ -174,7 +431,7 @@ class CarRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get_generations_paginated(self, submodel_id, page, per_page, sort_by, filters):
+    async def get_generations_paginated(self, submodel_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         base_query = select(Generation).where(Generation.submodel_id == submodel_id)
         return await paginate(
             self.db,
@@ -184,19 +441,20 @@ class CarRepository:
             sort_by,
             filters,
             base_query,
+            cursor=cursor,
+            count=count,
+            fields=fields,
         )
 
-    async def delete_generation(self, generation_id: int):
-        await self.db.execute(delete(Generation).where(Generation.id == generation_id))
-        await self.db.commit()
+    async def delete_generation(
+        self, generation_id: int, submodel_id: int, owner_id: Optional[int] = None
+    ) -> OwnedWrite:
+        return await self._write_owned(Generation, generation_id, submodel_id, owner_id, None)
 
-    async def update_generation(self, generation: Generation, **kwargs) -> Generation:
-        for key, value in kwargs.items():
-            setattr(generation, key, value)
-        self.db.add(generation)
-        await self.db.commit()
-        await self.db.refresh(generation)
-        return generation
+    async def update_generation(
+        self, generation_id: int, submodel_id: int, owner_id: Optional[int] = None, **kwargs
+    ) -> OwnedWrite:
+        return await self._write_owned(Generation, generation_id, submodel_id, owner_id, kwargs)
 
     # ====================================================================
     # CARSPEC OPERATIONS
@@ -212,8 +470,12 @@ class CarRepository:
         fuel_type: str,
         year: int,
         created_by: int,
-    ) -> CarSpec:
-        spec = CarSpec(
+    ) -> Optional[CarSpec]:
+        """The new spec, or None if the generation does not exist."""
+        spec = await self._insert_child(
+            CarSpec,
+            Generation,
+            generation_id,
             generation_id=generation_id,
             name=name,
             engine=engine,
@@ -223,9 +485,9 @@ class CarRepository:
             year=year,
             created_by=created_by,
         )
-        self.db.add(spec)
-        await self.db.commit()
-        await self.db.refresh(spec)
+        if spec is None:
+            return None
+        await self._bump_catalog_version("car_specs", _SPEC_CATALOG)
         return spec
 
     async def get_car_specs_by_generation_id(self, generation_id: int) -> List[CarSpec]:
@@ -233,7 +495,7 @@ class CarRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get_specs_paginated(self, generation_id, page, per_page, sort_by, filters):
+    async def get_specs_paginated(self, generation_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         base_query = select(CarSpec).where(CarSpec.generation_id == generation_id)
         return await paginate(
             self.db,
@@ -243,34 +505,199 @@ class CarRepository:
             sort_by,
             filters,
             base_query,
+            cursor=cursor,
+            count=count,
+            fields=fields,
+        )
+
+    async def search_car_specs(self, text: str, limit: int) -> List[RowMapping]:
+        """
+        Ranked search over spec, generation, submodel, model and brand names,
+        engine and fuel type.
+
+        Each word is matched as a prefix against search_vector (weighted so
+        brand/model hits rank first); search_text additionally catches typos
+        and partial words through trigram word similarity. Both predicates
+        are served by GIN indexes. The matches' hierarchy comes from
+        spec_catalog.
+        """
+        text = text.strip().lower()
+        words = re.findall(r"\w+", text)
+        if not words:
+            return []
+
+        tsquery = func.to_tsquery("simple", " & ".join(f"{w}:*" for w in words))
+        rank = (
+            func.ts_rank(CarSpec.search_vector, tsquery)
+            + func.word_similarity(text, CarSpec.search_text)
+        ).label("rank")
+        matches = (
+            select(CarSpec.id, rank)
+            .where(or_(
+                CarSpec.search_vector.op("@@")(tsquery),
+                literal(text).op("<%")(CarSpec.search_text),
+            ))
+            .order_by(rank.desc(), CarSpec.id)
+            .limit(limit)
+            .subquery()
         )
 
+        query = (
+            select(*SpecCatalog.__table__.columns, matches.c.rank)
+            .join(matches, matches.c.id == SpecCatalog.id)
+            .order_by(matches.c.rank.desc(), SpecCatalog.id)
+        )
+        result = await self.db.execute(query)
+        return result.mappings().all()
+
     async def get_car_spec_by_id(self, spec_id: int) -> Optional[CarSpec]:
         result = await self.db.execute(select(CarSpec).where(CarSpec.id == spec_id))
         return result.scalar_one_or_none()
 
-    async def delete_car_spec(self, spec_id: int):
-        await self.db.execute(delete(CarSpec).where(CarSpec.id == spec_id))
-        await self.db.commit()
+    async def get_spec_detail(self, spec_id: int) -> Optional[SpecCatalog]:
+        """The spec with its generation, submodel, model and brand ids and names."""
+        result = await self.db.execute(select(SpecCatalog).where(SpecCatalog.id == spec_id))
+        return result.scalar_one_or_none()
+
+    async def delete_car_spec(
+        self, spec_id: int, generation_id: int, owner_id: Optional[int] = None
+    ) -> OwnedWrite:
+        return await self._write_owned(CarSpec, spec_id, generation_id, owner_id, None)
 
-    async def update_car_spec(self, spec: CarSpec, **kwargs) -> CarSpec:
-        for key, value in kwargs.items():
-            setattr(spec, key, value)
-        self.db.add(spec)
-        await self.db.commit()
-        await self.db.refresh(spec)
-        return spec
+    async def update_car_spec(
+        self, spec_id: int, generation_id: int, owner_id: Optional[int] = None, **kwargs
+    ) -> OwnedWrite:
+        return await self._write_owned(CarSpec, spec_id, generation_id, owner_id, kwargs)
+
+    async def stream_car_specs(
+        self,
+        sort_by: Optional[str],
+        filters: Optional[str],
+        generation_id: Optional[int] = None,
+        with_hierarchy: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[RowMapping]:
+        """
+        Yield spec rows through a server-side cursor, `batch_size` at a time.
+
+        with_hierarchy adds ids and names of the generation, submodel, model
+        and brand. filters/sort_by apply to CarSpec columns.
+        """
+        columns = list(_SPEC_COLUMNS)
+        if with_hierarchy:
+            columns += [
+                Generation.name.label("generation_name"),
+                Generation.submodel_id,
+                Submodel.name.label("submodel_name"),
+                Submodel.model_id,
+                Model.name.label("model_name"),
+                Model.brand_id,
+                Brand.name.label("brand_name"),
+            ]
+
+        query = select(*columns)
+        if with_hierarchy:
+            query = (
+                query.join(Generation, Generation.id == CarSpec.generation_id)
+                .join(Submodel, Submodel.id == Generation.submodel_id)
+                .join(Model, Model.id == Submodel.model_id)
+                .join(Brand, Brand.id == Model.brand_id)
+            )
+        if generation_id is not None:
+            query = query.where(CarSpec.generation_id == generation_id)
+
+        compiled = compile_query(CarSpec, filters, sort_by)
+        if compiled.where:
+            query = query.where(*compiled.where)
+        query = order_by_keys(query, compiled.order).order_by(CarSpec.id)
+
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for row in result.mappings():
+            yield row
 
     # ====================================================================
     # USER CARS (JOIN TABLE)
     # ====================================================================
 
-    async def add_car_to_user_list(self, user_id: int, car_spec_id: int) -> UserCars:
-        user_car = UserCars(user_id=user_id, car_spec_id=car_spec_id)
-        self.db.add(user_car)
-        await self.db.commit()
-        await self.db.refresh(user_car)
-        return user_car
+    async def add_car_to_user_list(self, user_id: int, car_spec_id: int) -> Optional[Row]:
+        """
+        The user's garage entry for the car spec, with `created` False if
+        it was already there; None if the car spec does not exist.
+        """
+        columns = (UserCars.id, UserCars.user_id, UserCars.car_spec_id)
+        existing = select(*columns, false().label("created")).where(
+            UserCars.user_id == user_id, UserCars.car_spec_id == car_spec_id
+        )
+        inserted = (
+            self._child_insert(UserCars, CarSpec, car_spec_id, user_id=user_id, car_spec_id=car_spec_id)
+            .on_conflict_do_nothing(index_elements=["user_id", "car_spec_id"])
+            .returning(*columns)
+            .cte("inserted")
+        )
+        stmt = select(*inserted.c, true().label("created")).union_all(existing)
+        result = await self._execute_child_insert(stmt.execution_options(**WRITES))
+        if result is None:
+            return None
+        entry = result.first()
+        if entry is None:
+            # Either the spec does not exist or a concurrent add committed the
+            # row after this statement's snapshot: the insert skipped it and
+            # the SELECT branch could not see it. A new statement can.
+            entry = (await self.db.execute(existing)).first()
+        elif entry.created:
+            after_commit(self.db, count_cache.invalidate, "user_cars")
+        return entry
+
+    async def change_user_cars(
+        self, user_id: int, add: Sequence[int], remove: Sequence[int]
+    ) -> Optional[Dict[str, List[int]]]:
+        """
+        Add the car specs `add` to a user's garage and drop `remove` from
+        it in one statement. Returns the ids "added" (not there before),
+        "removed" (there before) and "missing" (in `add` but not a car
+        spec); None if a car spec in `add` was deleted concurrently.
+        """
+        changes = []
+        if add:
+            wanted = literal(list(dict.fromkeys(add)), ARRAY(Integer))
+            added = (
+                insert(UserCars)
+                .from_select(
+                    ["user_id", "car_spec_id"],
+                    select(literal(user_id), CarSpec.id).where(CarSpec.id == any_(wanted)),
+                )
+                .on_conflict_do_nothing(index_elements=["user_id", "car_spec_id"])
+                .returning(UserCars.car_spec_id)
+                .cte("added")
+            )
+            requested = func.unnest(wanted).column_valued("car_spec_id")
+            changes.append(select(literal("added").label("change"), added.c.car_spec_id))
+            changes.append(
+                select(literal("missing"), requested).where(~exists().where(CarSpec.id == requested))
+            )
+        if remove:
+            removed = (
+                delete(UserCars)
+                .where(
+                    UserCars.user_id == user_id,
+                    UserCars.car_spec_id == any_(literal(list(remove), ARRAY(Integer))),
+                )
+                .returning(UserCars.car_spec_id)
+                .cte("removed")
+            )
+            changes.append(select(literal("removed"), removed.c.car_spec_id))
+
+        result = {"added": [], "removed": [], "missing": []}
+        if not changes:
+            return result
+        rows = await self._execute_child_insert(union_all(*changes).execution_options(**WRITES))
+        if rows is None:
+            return None
+        for change, car_spec_id in rows:
+            result[change].append(car_spec_id)
+        if result["added"] or result["removed"]:
+            after_commit(self.db, count_cache.invalidate, "user_cars")
+        return result
 
     async def remove_car_from_user_list(self, user_id: int, car_spec_id: int):
         await self.db.execute(
@@ -278,7 +705,7 @@ class CarRepository:
                 (UserCars.user_id == user_id) & (UserCars.car_spec_id == car_spec_id)
             )
         )
-        await self.db.commit()
+        after_commit(self.db, count_cache.invalidate, "user_cars")
 
     async def get_cars_by_user_id(self, user_id: int) -> List[CarSpec]:
         query = (
@@ -290,19 +717,117 @@ class CarRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def get_user_cars_paginated(self, user_id, page, per_page, sort_by, filters):
+    async def get_user_cars_paginated(self, user_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         base_query = (
-            select(CarSpec)
-            .join(UserCars, UserCars.car_spec_id == CarSpec.id)
+            select(SpecCatalog)
+            .join(UserCars, UserCars.car_spec_id == SpecCatalog.id)
             .where(UserCars.user_id == user_id)
         )
 
         return await paginate(
             self.db,
-            CarSpec,
+            SpecCatalog,
             page,
             per_page,
             sort_by,
             filters,
             base_query=base_query,
+            cursor=cursor,
+            count=count,
+            fields=fields,
+        )
+
+    # ====================================================================
+    # BULK IMPORT (caller finishes with finish_import)
+    # ====================================================================
+
+    async def upsert_brands(self, rows: List[dict], batch_size: int) -> Dict[Tuple, int]:
+        return await self._upsert(Brand, rows, ("name",), (), batch_size)
+
+    async def upsert_models(self, rows: List[dict], batch_size: int) -> Dict[Tuple, int]:
+        return await self._upsert(Model, rows, ("brand_id", "name"), (), batch_size)
+
+    async def upsert_submodels(self, rows: List[dict], batch_size: int) -> Dict[Tuple, int]:
+        return await self._upsert(Submodel, rows, ("model_id", "name"), (), batch_size)
+
+    async def upsert_generations(self, rows: List[dict], batch_size: int) -> Dict[Tuple, int]:
+        return await self._upsert(
+            Generation, rows, ("submodel_id", "name"), ("year_start", "year_end"), batch_size
         )
+
+    async def upsert_car_specs(self, rows: List[dict], batch_size: int) -> Dict[Tuple, int]:
+        return await self._upsert(
+            CarSpec,
+            rows,
+            ("generation_id", "name", "year"),
+            ("engine", "horsepower", "torque", "fuel_type", "search_text", "search_vector"),
+            batch_size,
+            insert_rows=self._insert_specs_with_search,
+        )
+
+    @staticmethod
+    def _insert_specs_with_search(rows: List[dict]):
+        """
+        INSERT the spec rows through a join to their generations' hierarchy
+        so the search columns are written with them; the search triggers
+        skip rows that arrive with them set.
+        """
+        table = CarSpec.__table__
+        keys = list(rows[0])
+        batch = values(*(column(key, table.c[key].type) for key in keys), name="batch").data(
+            [tuple(row[key] for key in keys) for row in rows]
+        )
+        names = (
+            Brand.name, Model.name, Submodel.name, Generation.name,
+            batch.c.name, batch.c.engine, batch.c.fuel_type,
+        )
+        # Outer joins: a generation deleted meanwhile still fails the
+        # foreign key instead of dropping its specs silently.
+        source = (
+            select(*batch.c, func.car_spec_search_text(*names), func.car_spec_search_vector(*names))
+            .select_from(batch)
+            .outerjoin(Generation, Generation.id == batch.c.generation_id)
+            .outerjoin(Submodel, Submodel.id == Generation.submodel_id)
+            .outerjoin(Model, Model.id == Submodel.model_id)
+            .outerjoin(Brand, Brand.id == Model.brand_id)
+        )
+        return insert(CarSpec).from_select([*keys, "search_text", "search_vector"], source)
+
+    async def finish_import(self):
+        await self._bump_catalog_version(*_CATALOG_TABLES, _SPEC_CATALOG)
+
+    async def _upsert(
+        self,
+        model,
+        rows: List[dict],
+        key_columns: Sequence[str],
+        update_columns: Sequence[str],
+        batch_size: int,
+        insert_rows: Optional[Callable[[List[dict]], Insert]] = None,
+    ) -> Dict[Tuple, int]:
+        """
+        Multi-row INSERT ... ON CONFLICT (key_columns) DO UPDATE ... RETURNING.
+
+        Existing rows keep their id and created_by; update_columns are
+        overwritten. Returns {natural key tuple: id} for every row.
+        Rows must already be unique on key_columns. `insert_rows` builds
+        the INSERT for a batch when a plain VALUES list is not enough.
+        """
+        ids: Dict[Tuple, int] = {}
+        if not rows:
+            return ids
+
+        batch_size = max(1, min(batch_size, _MAX_BIND_PARAMS // len(rows[0])))
+        key_attrs = [getattr(model, c) for c in key_columns]
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            stmt = insert(model).values(batch) if insert_rows is None else insert_rows(batch)
+            # A no-op SET on the key still lets RETURNING report existing rows.
+            set_ = {c: stmt.excluded[c] for c in (update_columns or key_columns[-1:])}
+            stmt = stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_)
+            result = await self.db.execute(stmt.returning(model.id, *key_attrs))
+            for row in result:
+                ids[tuple(row[1:])] = row[0]
+
+        return ids
@@ -2,7 +2,9 @@ from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.models.rbac import Role, Permission, role_permissions_table, user_roles_table
+from app.core.principal import bump_authz_version, principal_cache
+from app.core.unit_of_work import after_commit
+from app.models.rbac import Role, Permission, User, role_permissions_table, user_roles_table
 
 
 class RoleRepository:
@@ -28,14 +30,16 @@ class RoleRepository:
         """Create a new role."""
         role = Role(name=name, description=description)
         self.db.add(role)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(role)
         return role
 
     async def delete(self, role: Role):
         """Delete an existing role."""
+        await self._bump_role_members(role.id)
         await self.db.delete(role)
-        await self.db.commit()
+        await self.db.flush()
+        after_commit(self.db, principal_cache.clear)
 
 
     # Permission assignment (Role to Permission)
@@ -47,7 +51,8 @@ class RoleRepository:
                 permission_id=permission_id
             )
         )
-        await self.db.commit()
+        await self._bump_role_members(role_id)
+        after_commit(self.db, principal_cache.clear)
 
     async def remove_permission(self, role_id: int, permission_id: int):
         """Remove a permission from a role using the role_permissions_table."""
@@ -57,7 +62,8 @@ class RoleRepository:
                 (role_permissions_table.c.permission_id == permission_id)
             )
         )
-        await self.db.commit()
+        await self._bump_role_members(role_id)
+        after_commit(self.db, principal_cache.clear)
 
     async def get_permissions(self, role_id: int) -> List[Permission]:
         """Retrieve all permissions assigned to a specific role."""
@@ -77,7 +83,8 @@ class RoleRepository:
                 role_id=role_id
             )
         )
-        await self.db.commit()
+        await bump_authz_version(self.db, User.id == user_id)
+        after_commit(self.db, principal_cache.invalidate, user_id)
 
     async def remove_user_from_role(self, user_id: int, role_id: int):
         """Remove a user from a role using the user_roles_table."""
@@ -87,7 +94,8 @@ class RoleRepository:
                 (user_roles_table.c.role_id == role_id)
             )
         )
-        await self.db.commit()
+        await bump_authz_version(self.db, User.id == user_id)
+        after_commit(self.db, principal_cache.invalidate, user_id)
 
     async def user_has_role(self, user_id: int, role_id: int) -> bool:
         """Check if a user already has a specific role assignment."""
@@ -100,4 +108,9 @@ class RoleRepository:
             .limit(1)
         )
         result = await self.db.execute(query)
-        return result.scalar_one_or_none() is not None
\ No newline at end of file
+        return result.scalar_one_or_none() is not None
+
+    async def _bump_role_members(self, role_id: int):
+        """Invalidate outstanding tokens of every user holding the role."""
+        members = select(user_roles_table.c.user_id).where(user_roles_table.c.role_id == role_id)
+        await bump_authz_version(self.db, User.id.in_(members))
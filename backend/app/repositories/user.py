@@ -1,10 +1,14 @@
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
+from app.core.principal import authz_versions, principal_cache
+from app.core.security import get_password_hash_async
+from app.core.unit_of_work import after_commit
 from app.models.rbac import User
+from app.utils.count_cache import count_cache
 from app.utils.paginate import paginate
 
 
@@ -22,7 +26,13 @@ class UserRepository:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_users_paginated(self, page, per_page, sort_by, filters):
+    async def get_credentials(self, username: str) -> Optional[Row]:
+        """(id, hashed_password, is_active) without the roles and permissions cascade."""
+        query = select(User.id, User.hashed_password, User.is_active).where(User.username == username)
+        result = await self.db.execute(query)
+        return result.one_or_none()
+
+    async def get_users_paginated(self, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         return await paginate(
             session=self.db,
             model=User,
@@ -30,29 +40,53 @@ class UserRepository:
             per_page=per_page,
             sort_by=sort_by,
             filters=filters,
+            cursor=cursor,
+            count=count,
+            fields=fields,
         )
 
     async def create_user(self, username: str, password: str) -> User:
-        hashed_pw = get_password_hash(password)
+        hashed_pw = await get_password_hash_async(password)
         new_user = User(username=username, hashed_password=hashed_pw)
 
         self.db.add(new_user)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(new_user)
+        after_commit(self.db, authz_versions.update, [(new_user.id, new_user.authz_version)])
+        after_commit(self.db, count_cache.invalidate, "users")
         return new_user
 
-    async def update_user(self, user: User, **kwargs):
-        for key, value in kwargs.items():
-            if key == "password":
-                setattr(user, "hashed_password", get_password_hash(value))
-            else:
-                setattr(user, key, value)
-
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
-        return user
-
-    async def delete_user(self, user: User) -> None:
-        await self.db.delete(user)
-        await self.db.commit()
+    async def update_user(self, user_id: int, **kwargs) -> Optional[Row]:
+        """
+        Apply `kwargs` to user `user_id` in one UPDATE ... RETURNING;
+        None if there is no such user.
+        """
+        values = dict(kwargs)
+        if "password" in values:
+            values["hashed_password"] = await get_password_hash_async(values.pop("password"))
+            # A password change revokes tokens issued before it.
+            values["authz_version"] = User.authz_version + 1
+        returned = (User.id, User.username, User.is_active, User.created_at, User.authz_version)
+        if values:
+            stmt = update(User).where(User.id == user_id).values(**values).returning(*returned)
+        else:
+            stmt = select(*returned).where(User.id == user_id)
+
+        row = (await self.db.execute(stmt)).one_or_none()
+        if row is None or not values:
+            return row
+        if "authz_version" in values:
+            after_commit(self.db, authz_versions.update, [(row.id, row.authz_version)])
+        after_commit(self.db, principal_cache.invalidate, user_id)
+        after_commit(self.db, count_cache.invalidate, "users")
+        return row
+
+    async def delete_user(self, user_id: int) -> bool:
+        """Delete user `user_id` (role links go with it); False if there is none."""
+        result = await self.db.execute(delete(User).where(User.id == user_id).returning(User.id))
+        if result.scalar_one_or_none() is None:
+            return False
+        after_commit(self.db, principal_cache.invalidate, user_id)
+        after_commit(self.db, authz_versions.discard, user_id)
+        after_commit(self.db, count_cache.invalidate, "users")
+        return True
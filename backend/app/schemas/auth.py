@@ -15,3 +15,6 @@ class TokenPayload(BaseModel):
     sub: str  # user ID as string
     exp: int
     role: str | None = None
+    roles: list[str] | None = None
+    perms: list[str] | None = None
+    av: int | None = None  # authz version the permissions were resolved at
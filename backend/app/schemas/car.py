@@ -1,6 +1,11 @@
-from typing import Optional
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
+# The columns are Postgres `integer`; larger values fail in the database.
+Int4 = Annotated[int, Field(ge=-2**31, le=2**31 - 1)]
+
 
 # Base Schemas
 class BrandBase(BaseModel):
@@ -17,17 +22,17 @@ class SubmodelBase(BaseModel):
 
 class GenerationBase(BaseModel):
     name: str = Field(..., max_length=100)
-    year_start: int
-    year_end: int
+    year_start: Int4
+    year_end: Int4
 
 
 class CarSpecBase(BaseModel):
     name: str = Field(..., max_length=100)
     engine: str = Field(..., max_length=100)
-    horsepower: int
-    torque: int
+    horsepower: Int4
+    torque: Int4
     fuel_type: str = Field(..., max_length=50)
-    year: int
+    year: Int4
 
 
 class UserCarsBase(BaseModel):
@@ -75,17 +80,17 @@ class SubmodelUpdate(BaseModel):
 
 class GenerationUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=100)
-    year_start: Optional[int] = None
-    year_end: Optional[int] = None
+    year_start: Optional[Int4] = None
+    year_end: Optional[Int4] = None
 
 
 class CarSpecUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=100)
     engine: Optional[str] = Field(None, max_length=100)
-    horsepower: Optional[int] = None
-    torque: Optional[int] = None
+    horsepower: Optional[Int4] = None
+    torque: Optional[Int4] = None
     fuel_type: Optional[str] = Field(None, max_length=50)
-    year: Optional[int] = None
+    year: Optional[Int4] = None
 
 
 # READ Schemas
@@ -133,8 +138,101 @@ class CarSpecRead(CarSpecBase):
         from_attributes = True
 
 
+class CarSpecDetail(CarSpecRead):
+    """A spec with the ids and names of its generation, submodel, model and brand."""
+    generation_name: str
+    submodel_id: int
+    submodel_name: str
+    model_id: int
+    model_name: str
+    brand_id: int
+    brand_name: str
+
+
 class UserCarsRead(UserCarsBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class UserCarsChange(BaseModel):
+    # At most settings.USER_CARS_CHANGE_MAX_IDS ids in each list.
+    add: List[Int4] = Field(default=[], max_length=settings.USER_CARS_CHANGE_MAX_IDS)
+    remove: List[Int4] = Field(default=[], max_length=settings.USER_CARS_CHANGE_MAX_IDS)
+
+
+class UserCarsChangeResult(BaseModel):
+    added: List[int]  # newly in the garage; ids already there are left out
+    removed: List[int]  # ids that were in the garage
+    missing: List[int]  # ids in `add` that are not car specs
+
+
+# IMPORT Schemas (nested brand -> model -> submodel -> generation -> spec)
+class CarSpecImport(CarSpecBase):
+    pass
+
+
+class GenerationImport(GenerationBase):
+    specs: List[CarSpecImport] = []
+
+
+class SubmodelImport(SubmodelBase):
+    generations: List[GenerationImport] = []
+
+
+class ModelImport(ModelBase):
+    submodels: List[SubmodelImport] = []
+
+
+class BrandImport(BrandBase):
+    models: List[ModelImport] = []
+
+
+class CatalogImportError(BaseModel):
+    index: int  # position of the brand in the array / line number in NDJSON
+    detail: str
+
+
+class CatalogImportResult(BaseModel):
+    brands: int
+    models: int
+    submodels: int
+    generations: int
+    specs: int
+    errors: List[CatalogImportError] = []
+
+
+# TREE Schemas (whole catalog hierarchy, see /catalog/tree)
+class CatalogTreeSpec(CarSpecBase):
+    id: int
+
+
+class CatalogTreeGeneration(GenerationBase):
+    id: int
+    specs: Optional[List[CatalogTreeSpec]] = None
+
+
+class CatalogTreeSubmodel(SubmodelBase):
+    id: int
+    generations: List[CatalogTreeGeneration] = []
+
+
+class CatalogTreeModel(ModelBase):
+    id: int
+    submodels: List[CatalogTreeSubmodel] = []
+
+
+class CatalogTreeBrand(BrandBase):
+    id: int
+    models: List[CatalogTreeModel] = []
+
+
+class CatalogTree(BaseModel):
+    version: int
+    brands: List[CatalogTreeBrand]
+
+
+# SEARCH Schemas
+class CarSpecSearchResult(CarSpecDetail):
+    rank: float
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    wait_seconds_avg: float
+
+
+class CacheStats(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    sets: int
+    evictions: int
+    invalidations: int
+    errors: int
+    hit_ratio: float
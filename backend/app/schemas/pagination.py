@@ -1,21 +1,33 @@
-from typing import Generic, TypeVar, Optional, List
+from typing import Generic, TypeVar, Optional, List, Literal
 from pydantic import BaseModel
 
 T = TypeVar("T")
 
+# exact: count(*) of the filtered set
+# estimated: planner row estimate (pg_class.reltuples / EXPLAIN)
+# cached: exact count memoized in-process until a write touches the table
+# none: skip counting, total_items/total_pages are null
+CountStrategy = Literal["exact", "estimated", "cached", "none"]
+
 
 class PaginationParams(BaseModel):
     page: int = 1
     per_page: int = 10
     sort_by: Optional[str] = None       # example: "name,-id"
     filters: Optional[str] = None       # example: "brand_id:1,year>2010"
+    fields: Optional[str] = None        # example: "id,name,year"; omit for every field
+    cursor: Optional[str] = None        # "" starts keyset pagination, then pass next_cursor/prev_cursor
+    count: CountStrategy = "exact"
 
 
 class PageMeta(BaseModel):
     page: int
     per_page: int
-    total_items: int
-    total_pages: int
+    total_items: Optional[int]
+    total_pages: Optional[int]
+    count_strategy: CountStrategy = "exact"
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
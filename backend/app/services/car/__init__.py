@@ -7,6 +7,7 @@ from app.services.car.submodel import SubmodelService
 from app.services.car.generation import GenerationService
 from app.services.car.spec import CarSpecService
 from app.services.car.user_car import UserCarService
+from app.services.car.catalog import CatalogService
 
 __all__ = [
     "BrandService",
@@ -15,5 +16,6 @@ __all__ = [
     "GenerationService",
     "CarSpecService",
     "UserCarService",
+    "CatalogService",
 ]
 
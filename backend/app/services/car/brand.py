@@ -1,68 +1,72 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import has_permission
-from app.models.rbac import User
+from app.core.deps import owner_scope
+from app.core.principal import Principal
+from app.core.unit_of_work import after_commit
 from app.repositories.car import CarRepository
+from app.services.car.errors import conflict_on_duplicate
+from app.utils.read_cache import catalog_read_cache
+
+_DUPLICATE = "A brand with this name already exists"
 
 
 class BrandService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = CarRepository(db)
 
-    async def create(self, data, user: User):
-        return await self.repo.create_brand(name=data.name, created_by=user.id)
+    async def get_version(self) -> int:
+        return await self.repo.get_catalog_version("brands")
+
+    async def create(self, data, user: Principal):
+        with conflict_on_duplicate(_DUPLICATE):
+            brand = await self.repo.create_brand(name=data.name, created_by=user.id)
+        after_commit(self.db, catalog_read_cache.created, "brands")
+        return brand
 
     async def get(self, brand_id: int):
-        brand = await self.repo.get_brand_by_id(brand_id)
+        brand = await catalog_read_cache.row(
+            "brands", brand_id, lambda: self.repo.get_brand_by_id(brand_id)
+        )
         if not brand:
             raise HTTPException(404, "Brand not found")
         return brand
 
-    async def list(self, page, per_page, sort_by, filters):
-        return await self.repo.get_brands_paginated(page, per_page, sort_by, filters)
+    async def list(self, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
+        return await catalog_read_cache.page(
+            "brands",
+            None,
+            (page, per_page, sort_by, filters, cursor, count, fields),
+            lambda: self.repo.get_brands_paginated(page, per_page, sort_by, filters, cursor, count, fields),
+        )
 
-    async def delete(self, user: User, brand_id: int):
-        brand = await self.repo.get_brand_by_id(brand_id)
-        if not brand:
+    async def delete(self, user: Principal, brand_id: int):
+        owner_id = owner_scope(user, "cars:delete", "cars:delete_own")
+        result = await self.repo.delete_brand(brand_id, owner_id)
+        if not result.found:
             raise HTTPException(404, "Brand not found")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete brands you created"
+            )
+        after_commit(self.db, catalog_read_cache.deleted, "brands", brand_id)
+        return {"detail": "Brand deleted successfully"}
 
-        if has_permission(user, "cars:delete"):
-            await self.repo.delete_brand(brand_id)
-            return {"detail": "Brand deleted successfully"}
-
-        if has_permission(user, "cars:delete_own"):
-            if brand.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete brands you created"
-                )
-            await self.repo.delete_brand(brand_id)
-            return {"detail": "Brand deleted successfully"}
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
-
-    async def update(self, user: User, brand_id: int, data):
-        brand = await self.repo.get_brand_by_id(brand_id)
-        if not brand:
+    async def update(self, user: Principal, brand_id: int, data):
+        owner_id = owner_scope(user, "cars:write", "cars:update_own")
+        update_data = data.model_dump(exclude_unset=True)
+        with conflict_on_duplicate(_DUPLICATE):
+            result = await self.repo.update_brand(brand_id, owner_id, **update_data)
+        if not result.found:
             raise HTTPException(404, "Brand not found")
-
-        if has_permission(user, "cars:write"):
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return brand
-            return await self.repo.update_brand(brand, **update_data)
-
-        if has_permission(user, "cars:update_own"):
-            if brand.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update brands you created"
-                )
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return brand
-            return await self.repo.update_brand(brand, **update_data)
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only update brands you created"
+            )
+        if update_data:
+            after_commit(self.db, catalog_read_cache.updated, "brands", brand_id)
+        return result.row
 
@@ -0,0 +1,268 @@
+import csv
+import io
+import json
+import logging
+from typing import AsyncIterator, Iterable, List, Literal, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.principal import Principal
+from app.core.unit_of_work import after_commit
+from app.repositories.car import CarRepository
+from app.schemas.car import BrandImport, CatalogImportError, CatalogImportResult, CatalogTree
+from app.services.car.errors import is_data_exception, is_unique_violation
+from app.utils.catalog_cache import catalog_tree_cache
+from app.utils.read_cache import catalog_read_cache
+
+logger = logging.getLogger(__name__)
+
+_FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _import_conflict_detail(error: IntegrityError) -> str:
+    if is_unique_violation(error) or getattr(error.orig, "sqlstate", None) == _FOREIGN_KEY_VIOLATION:
+        # The upserts absorb duplicates and missing parents of their own;
+        # these come from catalog rows written or deleted meanwhile.
+        return "Import rejected: the catalog changed while importing; retry"
+    return "Import rejected: the catalog data violates a database constraint"
+
+
+class CatalogService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = CarRepository(db)
+
+    async def get_version(self) -> int:
+        return await self.repo.get_catalog_version()
+
+    async def get_tree_json(self, version: int, include_specs: bool) -> bytes:
+        """Serialized catalog tree, built from one query at most once per version."""
+        body = catalog_tree_cache.get(version, include_specs)
+        if body is None:
+            rows = await self.repo.get_catalog_tree_rows(include_specs)
+            tree = CatalogTree(version=version, brands=self._nest(rows, include_specs))
+            body = tree.model_dump_json().encode()
+            catalog_tree_cache.set(version, include_specs, body)
+        return body
+
+    @staticmethod
+    def _nest(rows, include_specs: bool) -> List[dict]:
+        """Fold flat outer-join rows into brand -> ... -> spec dicts."""
+        brands: dict = {}
+        models: dict = {}
+        submodels: dict = {}
+        generations: dict = {}
+
+        for row in rows:
+            brand = brands.get(row["brand_id"])
+            if brand is None:
+                brand = brands[row["brand_id"]] = {
+                    "id": row["brand_id"], "name": row["brand_name"], "models": []
+                }
+            if row["model_id"] is None:
+                continue
+
+            model = models.get(row["model_id"])
+            if model is None:
+                model = models[row["model_id"]] = {
+                    "id": row["model_id"], "name": row["model_name"], "submodels": []
+                }
+                brand["models"].append(model)
+            if row["submodel_id"] is None:
+                continue
+
+            submodel = submodels.get(row["submodel_id"])
+            if submodel is None:
+                submodel = submodels[row["submodel_id"]] = {
+                    "id": row["submodel_id"], "name": row["submodel_name"], "generations": []
+                }
+                model["submodels"].append(submodel)
+            if row["generation_id"] is None:
+                continue
+
+            generation = generations.get(row["generation_id"])
+            if generation is None:
+                generation = generations[row["generation_id"]] = {
+                    "id": row["generation_id"],
+                    "name": row["generation_name"],
+                    "year_start": row["year_start"],
+                    "year_end": row["year_end"],
+                    "specs": [] if include_specs else None,
+                }
+                submodel["generations"].append(generation)
+
+            if include_specs and row["spec_id"] is not None:
+                generation["specs"].append({
+                    "id": row["spec_id"],
+                    "name": row["spec_name"],
+                    "engine": row["engine"],
+                    "horsepower": row["horsepower"],
+                    "torque": row["torque"],
+                    "fuel_type": row["fuel_type"],
+                    "year": row["year"],
+                })
+
+        return list(brands.values())
+
+    async def import_catalog(
+        self,
+        items: Iterable[Tuple[int, object]],
+        user: Principal,
+        batch_size: int,
+        errors: Optional[List[CatalogImportError]] = None,
+    ) -> CatalogImportResult:
+        """
+        Validate and upsert a nested catalog in a single transaction.
+
+        `items` are (index, raw brand) pairs; brands that fail validation are
+        skipped and reported in `errors` (after any decoding errors passed
+        in), the rest are imported.
+        """
+        brands, parse_errors = self._parse(items)
+        errors = (errors or []) + parse_errors
+        try:
+            result = await self._upsert_tree(brands, user, batch_size)
+            await self.repo.finish_import()
+        except IntegrityError as e:
+            # The request's unit of work rolls the whole import back. The
+            # database's message names constraints and values; keep it in the log.
+            logger.warning("Catalog import rejected: %s", e.orig)
+            raise HTTPException(status.HTTP_409_CONFLICT, _import_conflict_detail(e))
+        except DBAPIError as e:
+            if not is_data_exception(e):
+                raise
+            # A value the schemas let through but the column cannot hold.
+            logger.warning("Catalog import rejected: %s", e.orig)
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                "Import rejected: the catalog data holds a value the database cannot store",
+            )
+
+        after_commit(
+            self.db,
+            catalog_read_cache.tables_changed,
+            "brands", "models", "submodels", "generations", "car_specs",
+        )
+
+        result.errors = errors
+        return result
+
+    async def export_specs(
+        self,
+        fmt: Literal["csv", "ndjson"],
+        sort_by: Optional[str],
+        filters: Optional[str],
+        generation_id: Optional[int] = None,
+        with_hierarchy: bool = False,
+        rows_per_chunk: int = 500,
+    ) -> AsyncIterator[str]:
+        """Render streamed spec rows as CSV or NDJSON, a chunk of rows at a time."""
+        rows = self.repo.stream_car_specs(
+            sort_by, filters, generation_id, with_hierarchy, batch_size=rows_per_chunk * 2
+        )
+        buffer = io.StringIO()
+        writer = None
+        pending = 0
+
+        async for row in rows:
+            if fmt == "csv":
+                if writer is None:
+                    writer = csv.writer(buffer)
+                    writer.writerow(row.keys())
+                writer.writerow(row.values())
+            else:
+                buffer.write(json.dumps(dict(row), separators=(",", ":")))
+                buffer.write("\n")
+
+            pending += 1
+            if pending >= rows_per_chunk:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def _parse(items: Iterable[Tuple[int, object]]) -> Tuple[List[BrandImport], List[CatalogImportError]]:
+        """Validate raw (index, brand) items, collecting an error per invalid brand."""
+        brands: List[BrandImport] = []
+        errors: List[CatalogImportError] = []
+        for index, raw in items:
+            try:
+                brands.append(BrandImport.model_validate(raw))
+            except ValidationError as e:
+                detail = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                errors.append(CatalogImportError(index=index, detail=detail))
+        return brands, errors
+
+    async def _upsert_tree(
+        self, brands: List[BrandImport], user: Principal, batch_size: int
+    ) -> CatalogImportResult:
+        """
+        Upsert the tree level by level, one batched statement per level.
+
+        Rows are matched on their name within the parent (specs also on
+        year); repeated entries in the payload are merged, last one wins.
+        """
+        brand_rows = {
+            (b.name,): {"name": b.name, "created_by": user.id}
+            for b in brands
+        }
+        brand_ids = await self.repo.upsert_brands(list(brand_rows.values()), batch_size)
+
+        model_rows, submodel_src = {}, []
+        for b in brands:
+            brand_id = brand_ids[(b.name,)]
+            for m in b.models:
+                model_rows[(brand_id, m.name)] = {"brand_id": brand_id, "name": m.name, "created_by": user.id}
+                submodel_src.append((brand_id, m))
+        model_ids = await self.repo.upsert_models(list(model_rows.values()), batch_size)
+
+        submodel_rows, generation_src = {}, []
+        for brand_id, m in submodel_src:
+            model_id = model_ids[(brand_id, m.name)]
+            for sm in m.submodels:
+                submodel_rows[(model_id, sm.name)] = {"model_id": model_id, "name": sm.name, "created_by": user.id}
+                generation_src.append((model_id, sm))
+        submodel_ids = await self.repo.upsert_submodels(list(submodel_rows.values()), batch_size)
+
+        generation_rows, spec_src = {}, []
+        for model_id, sm in generation_src:
+            submodel_id = submodel_ids[(model_id, sm.name)]
+            for g in sm.generations:
+                generation_rows[(submodel_id, g.name)] = {
+                    "submodel_id": submodel_id,
+                    "name": g.name,
+                    "year_start": g.year_start,
+                    "year_end": g.year_end,
+                    "created_by": user.id,
+                }
+                spec_src.append((submodel_id, g))
+        generation_ids = await self.repo.upsert_generations(list(generation_rows.values()), batch_size)
+
+        spec_rows = {}
+        for submodel_id, g in spec_src:
+            generation_id = generation_ids[(submodel_id, g.name)]
+            for spec in g.specs:
+                spec_rows[(generation_id, spec.name, spec.year)] = {
+                    "generation_id": generation_id,
+                    **spec.model_dump(),
+                    "created_by": user.id,
+                }
+
+        await self.repo.upsert_car_specs(list(spec_rows.values()), batch_size)
+
+        return CatalogImportResult(
+            brands=len(brand_rows),
+            models=len(model_rows),
+            submodels=len(submodel_rows),
+            generations=len(generation_rows),
+            specs=len(spec_rows),
+        )
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+_UNIQUE_VIOLATION = "23505"
+_DATA_EXCEPTION_CLASS = "22"
+
+
+def is_unique_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == _UNIQUE_VIOLATION
+
+
+def is_data_exception(error: DBAPIError) -> bool:
+    """A value the column cannot hold: out of range, NUL byte, bad encoding..."""
+    # asyncpg errors outside DataError's subclasses reach us as plain DBAPIError.
+    return (getattr(error.orig, "sqlstate", None) or "").startswith(_DATA_EXCEPTION_CLASS)
+
+
+@contextmanager
+def conflict_on_duplicate(detail: str):
+    """
+    Answer 409 with `detail` when the block breaks a unique constraint
+    (the request's unit of work rolls the failed statement back).
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        if not is_unique_violation(e):
+            raise
+        raise HTTPException(status.HTTP_409_CONFLICT, detail) from e
@@ -1,89 +1,92 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import has_permission
-from app.models.rbac import User
+from app.core.deps import owner_scope
+from app.core.principal import Principal
+from app.core.unit_of_work import after_commit
 from app.repositories.car import CarRepository
+from app.services.car.errors import conflict_on_duplicate
+from app.utils.read_cache import catalog_read_cache
+
+_DUPLICATE = "A generation with this name already exists for this submodel"
 
 
 class GenerationService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = CarRepository(db)
 
-    async def create(self, submodel_id: int, data, user: User):
-        # Check submodel exists
-        submodel = await self.repo.get_submodel_by_id(submodel_id)
-        if not submodel:
-            raise HTTPException(404, "Submodel not found")
-
-        return await self.repo.create_generation(
-            submodel_id=submodel_id,
-            name=data.name,
-            year_start=data.year_start,
-            year_end=data.year_end,
-            created_by=user.id
-        )
-
-    async def list_by_submodel(self, submodel_id, page, per_page, sort_by, filters):
-        submodel = await self.repo.get_submodel_by_id(submodel_id)
-        if not submodel:
+    async def get_version(self) -> int:
+        return await self.repo.get_catalog_version("generations")
+
+    async def create(self, submodel_id: int, data, user: Principal):
+        with conflict_on_duplicate(_DUPLICATE):
+            generation = await self.repo.create_generation(
+                submodel_id=submodel_id,
+                name=data.name,
+                year_start=data.year_start,
+                year_end=data.year_end,
+                created_by=user.id
+            )
+        if generation is None:
             raise HTTPException(404, "Submodel not found")
+        after_commit(self.db, catalog_read_cache.created, "generations", submodel_id)
+        return generation
 
-        return await self.repo.get_generations_paginated(
-            submodel_id,
-            page,
-            per_page,
-            sort_by,
-            filters
+    async def list_by_submodel(self, submodel_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
+        async def load():
+            result = await self.repo.get_generations_paginated(
+                submodel_id,
+                page,
+                per_page,
+                sort_by,
+                filters,
+                cursor,
+                count,
+                fields,
+            )
+            if not result.data and not await self.repo.submodel_exists(submodel_id):
+                raise HTTPException(404, "Submodel not found")
+            return result
+
+        return await catalog_read_cache.page(
+            "generations", submodel_id, (page, per_page, sort_by, filters, cursor, count, fields), load
         )
 
-    async def delete(self, user: User, submodel_id: int, generation_id: int):
-        generation = await self.repo.get_generation_by_id(generation_id)
-        if not generation or generation.submodel_id != submodel_id:
+    async def delete(self, user: Principal, submodel_id: int, generation_id: int):
+        owner_id = owner_scope(user, "cars:delete", "cars:delete_own")
+        result = await self.repo.delete_generation(generation_id, submodel_id, owner_id)
+        if not result.found:
             raise HTTPException(404, "Generation not found")
-
-        if has_permission(user, "cars:delete"):
-            await self.repo.delete_generation(generation_id)
-            return {"detail": "Generation deleted successfully"}
-
-        if has_permission(user, "cars:delete_own"):
-            if generation.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete generations you created"
-                )
-            await self.repo.delete_generation(generation_id)
-            return {"detail": "Generation deleted successfully"}
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete generations you created"
+            )
+        after_commit(self.db, catalog_read_cache.deleted, "generations", generation_id, submodel_id)
+        return {"detail": "Generation deleted successfully"}
 
     async def get(self, submodel_id: int, generation_id: int):
-        generation = await self.repo.get_generation_by_id(generation_id)
-        if not generation or generation.submodel_id != submodel_id:
+        generation = await catalog_read_cache.row(
+            "generations", generation_id, lambda: self.repo.get_generation_by_id(generation_id)
+        )
+        if not generation or generation["submodel_id"] != submodel_id:
             raise HTTPException(404, "Generation not found")
         return generation
 
-    async def update(self, user: User, submodel_id: int, generation_id: int, data):
-        generation = await self.repo.get_generation_by_id(generation_id)
-        if not generation or generation.submodel_id != submodel_id:
+    async def update(self, user: Principal, submodel_id: int, generation_id: int, data):
+        owner_id = owner_scope(user, "cars:write", "cars:update_own")
+        update_data = data.model_dump(exclude_unset=True)
+        with conflict_on_duplicate(_DUPLICATE):
+            result = await self.repo.update_generation(generation_id, submodel_id, owner_id, **update_data)
+        if not result.found:
             raise HTTPException(404, "Generation not found")
-
-        if has_permission(user, "cars:write"):
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return generation
-            return await self.repo.update_generation(generation, **update_data)
-
-        if has_permission(user, "cars:update_own"):
-            if generation.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update generations you created"
-                )
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return generation
-            return await self.repo.update_generation(generation, **update_data)
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only update generations you created"
+            )
+        if update_data:
+            after_commit(self.db, catalog_read_cache.updated, "generations", generation_id, submodel_id)
+        return result.row
 
@@ -1,86 +1,91 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import has_permission
-from app.models.rbac import User
+from app.core.deps import owner_scope
+from app.core.principal import Principal
+from app.core.unit_of_work import after_commit
 from app.repositories.car import CarRepository
+from app.services.car.errors import conflict_on_duplicate
+from app.utils.read_cache import catalog_read_cache
+
+_DUPLICATE = "A model with this name already exists for this brand"
 
 
 class ModelService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = CarRepository(db)
 
-    async def create(self, brand_id: int, data, user: User):
-        brand = await self.repo.get_brand_by_id(brand_id)
-        if not brand:
-            raise HTTPException(404, "Brand not found")
-
-        return await self.repo.create_model(
-            brand_id=brand_id,
-            name=data.name,
-            created_by=user.id
-        )
-
-    async def list_by_brand(self, brand_id: int, page, per_page, sort_by, filters):
-        brand = await self.repo.get_brand_by_id(brand_id)
-        if not brand:
+    async def get_version(self) -> int:
+        return await self.repo.get_catalog_version("models")
+
+    async def create(self, brand_id: int, data, user: Principal):
+        with conflict_on_duplicate(_DUPLICATE):
+            model = await self.repo.create_model(
+                brand_id=brand_id,
+                name=data.name,
+                created_by=user.id
+            )
+        if model is None:
             raise HTTPException(404, "Brand not found")
+        after_commit(self.db, catalog_read_cache.created, "models", brand_id)
+        return model
 
-        return await self.repo.get_models_paginated(
-            brand_id,
-            page,
-            per_page,
-            sort_by,
-            filters
+    async def list_by_brand(self, brand_id: int, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
+        async def load():
+            result = await self.repo.get_models_paginated(
+                brand_id,
+                page,
+                per_page,
+                sort_by,
+                filters,
+                cursor,
+                count,
+                fields,
+            )
+            # A row proves the brand exists; only an empty page needs the lookup.
+            if not result.data and not await self.repo.brand_exists(brand_id):
+                raise HTTPException(404, "Brand not found")
+            return result
+
+        return await catalog_read_cache.page(
+            "models", brand_id, (page, per_page, sort_by, filters, cursor, count, fields), load
         )
 
-    async def delete(self, user: User, brand_id: int, model_id: int):
-        model = await self.repo.get_model_by_id(model_id)
-        if not model or model.brand_id != brand_id:
+    async def delete(self, user: Principal, brand_id: int, model_id: int):
+        owner_id = owner_scope(user, "cars:delete", "cars:delete_own")
+        result = await self.repo.delete_model(model_id, brand_id, owner_id)
+        if not result.found:
             raise HTTPException(404, "Model not found")
-
-        if has_permission(user, "cars:delete"):
-            await self.repo.delete_model(model_id)
-            return {"detail": "Model deleted successfully"}
-
-        if has_permission(user, "cars:delete_own"):
-            if model.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete models you created"
-                )
-            await self.repo.delete_model(model_id)
-            return {"detail": "Model deleted successfully"}
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete models you created"
+            )
+        after_commit(self.db, catalog_read_cache.deleted, "models", model_id, brand_id)
+        return {"detail": "Model deleted successfully"}
 
     async def get(self, brand_id: int, model_id: int):
-        model = await self.repo.get_model_by_id(model_id)
-        if not model or model.brand_id != brand_id:
+        model = await catalog_read_cache.row(
+            "models", model_id, lambda: self.repo.get_model_by_id(model_id)
+        )
+        if not model or model["brand_id"] != brand_id:
             raise HTTPException(404, "Model not found")
         return model
 
-    async def update(self, user: User, brand_id: int, model_id: int, data):
-        model = await self.repo.get_model_by_id(model_id)
-        if not model or model.brand_id != brand_id:
+    async def update(self, user: Principal, brand_id: int, model_id: int, data):
+        owner_id = owner_scope(user, "cars:write", "cars:update_own")
+        update_data = data.model_dump(exclude_unset=True)
+        with conflict_on_duplicate(_DUPLICATE):
+            result = await self.repo.update_model(model_id, brand_id, owner_id, **update_data)
+        if not result.found:
             raise HTTPException(404, "Model not found")
-
-        if has_permission(user, "cars:write"):
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return model
-            return await self.repo.update_model(model, **update_data)
-
-        if has_permission(user, "cars:update_own"):
-            if model.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update models you created"
-                )
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return model
-            return await self.repo.update_model(model, **update_data)
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only update models you created"
+            )
+        if update_data:
+            after_commit(self.db, catalog_read_cache.updated, "models", model_id, brand_id)
+        return result.row
 
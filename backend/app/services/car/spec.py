@@ -1,99 +1,112 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import has_permission
-from app.models.rbac import User
+from app.core.deps import has_permission, owner_scope
+from app.core.principal import Principal
+from app.core.unit_of_work import after_commit
 from app.repositories.car import CarRepository
+from app.services.car.errors import conflict_on_duplicate
+from app.utils.read_cache import catalog_read_cache
+
+_DUPLICATE = "A car spec with this name and year already exists for this generation"
 
 
 class CarSpecService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = CarRepository(db)
 
+    async def get_version(self) -> int:
+        return await self.repo.get_catalog_version("car_specs")
+
+    async def get_catalog_version(self) -> int:
+        # Search results and spec details include parent names, so any catalog write can change them.
+        return await self.repo.get_catalog_version()
+
     @staticmethod
-    def _ensure_permission(user: User, permission: str):
+    def _ensure_permission(user: Principal, permission: str):
         if not has_permission(user, permission):
             raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
 
-    async def create(self, generation_id: int, data, user: User):
+    async def create(self, generation_id: int, data, user: Principal):
         self._ensure_permission(user, "cars:write")
-        generation = await self.repo.get_generation_by_id(generation_id)
-        if not generation:
+        with conflict_on_duplicate(_DUPLICATE):
+            spec = await self.repo.create_car_spec(
+                generation_id=generation_id,
+                name=data.name,
+                engine=data.engine,
+                horsepower=data.horsepower,
+                torque=data.torque,
+                fuel_type=data.fuel_type,
+                year=data.year,
+                created_by=user.id,
+            )
+        if spec is None:
             raise HTTPException(404, "Generation not found")
+        after_commit(self.db, catalog_read_cache.created, "car_specs", generation_id)
+        return spec
 
-        return await self.repo.create_car_spec(
-            generation_id=generation_id,
-            name=data.name,
-            engine=data.engine,
-            horsepower=data.horsepower,
-            torque=data.torque,
-            fuel_type=data.fuel_type,
-            year=data.year,
-            created_by=user.id,
-        )
-
-    async def list_by_generation(self, user: User, generation_id, page, per_page, sort_by, filters):
+    async def list_by_generation(self, user: Principal, generation_id, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         self._ensure_permission(user, "cars:read")
-        generation = await self.repo.get_generation_by_id(generation_id)
-        if not generation:
-            raise HTTPException(404, "Generation not found")
 
-        return await self.repo.get_specs_paginated(
-            generation_id,
-            page,
-            per_page,
-            sort_by,
-            filters
+        async def load():
+            result = await self.repo.get_specs_paginated(
+                generation_id,
+                page,
+                per_page,
+                sort_by,
+                filters,
+                cursor,
+                count,
+                fields,
+            )
+            if not result.data and not await self.repo.generation_exists(generation_id):
+                raise HTTPException(404, "Generation not found")
+            return result
+
+        return await catalog_read_cache.page(
+            "car_specs", generation_id, (page, per_page, sort_by, filters, cursor, count, fields), load
         )
 
-    async def get(self, user: User, spec_id: int):
+    async def search(self, user: Principal, text: str, limit: int):
+        self._ensure_permission(user, "cars:read")
+        return await self.repo.search_car_specs(text, limit)
+
+    async def get(self, user: Principal, spec_id: int):
         self._ensure_permission(user, "cars:read")
-        car = await self.repo.get_car_spec_by_id(spec_id)
+        car = await catalog_read_cache.row(
+            "spec_catalog", spec_id, lambda: self.repo.get_spec_detail(spec_id)
+        )
         if not car:
             raise HTTPException(404, "Car spec not found")
         return car
 
-    async def delete(self, user: User, generation_id: int, spec_id: int):
-        spec = await self.repo.get_car_spec_by_id(spec_id)
-        if not spec or spec.generation_id != generation_id:
+    async def delete(self, user: Principal, generation_id: int, spec_id: int):
+        owner_id = owner_scope(user, "cars:delete", "cars:delete_own")
+        result = await self.repo.delete_car_spec(spec_id, generation_id, owner_id)
+        if not result.found:
             raise HTTPException(404, "Car spec not found")
-
-        if has_permission(user, "cars:delete"):
-            await self.repo.delete_car_spec(spec_id)
-            return {"detail": "Car spec deleted successfully"}
-
-        if has_permission(user, "cars:delete_own"):
-            if spec.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete car specs you created"
-                )
-            await self.repo.delete_car_spec(spec_id)
-            return {"detail": "Car spec deleted successfully"}
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
-
-    async def update(self, user: User, generation_id: int, spec_id: int, data):
-        spec = await self.repo.get_car_spec_by_id(spec_id)
-        if not spec or spec.generation_id != generation_id:
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete car specs you created"
+            )
+        after_commit(self.db, catalog_read_cache.deleted, "car_specs", spec_id, generation_id)
+        return {"detail": "Car spec deleted successfully"}
+
+    async def update(self, user: Principal, generation_id: int, spec_id: int, data):
+        owner_id = owner_scope(user, "cars:write", "cars:update_own")
+        update_data = data.model_dump(exclude_unset=True)
+        with conflict_on_duplicate(_DUPLICATE):
+            result = await self.repo.update_car_spec(spec_id, generation_id, owner_id, **update_data)
+        if not result.found:
             raise HTTPException(404, "Car spec not found")
-
-        if has_permission(user, "cars:write"):
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return spec
-            return await self.repo.update_car_spec(spec, **update_data)
-
-        if has_permission(user, "cars:update_own"):
-            if spec.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update car specs you created"
-                )
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return spec
-            return await self.repo.update_car_spec(spec, **update_data)
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only update car specs you created"
+            )
+        if update_data:
+            after_commit(self.db, catalog_read_cache.updated, "car_specs", spec_id, generation_id)
+        return result.row
 
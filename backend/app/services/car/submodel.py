@@ -1,86 +1,90 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import has_permission
-from app.models.rbac import User
+from app.core.deps import owner_scope
+from app.core.principal import Principal
+from app.core.unit_of_work import after_commit
 from app.repositories.car import CarRepository
+from app.services.car.errors import conflict_on_duplicate
+from app.utils.read_cache import catalog_read_cache
+
+_DUPLICATE = "A submodel with this name already exists for this model"
 
 
 class SubmodelService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = CarRepository(db)
 
-    async def create(self, model_id: int, data, user: User):
-        model = await self.repo.get_model_by_id(model_id)
-        if not model:
-            raise HTTPException(404, "Model not found")
-
-        return await self.repo.create_submodel(
-            model_id=model_id,
-            name=data.name,
-            created_by=user.id
-        )
-
-    async def list_by_model(self, model_id: int, page, per_page, sort_by, filters):
-        model = await self.repo.get_model_by_id(model_id)
-        if not model:
+    async def get_version(self) -> int:
+        return await self.repo.get_catalog_version("submodels")
+
+    async def create(self, model_id: int, data, user: Principal):
+        with conflict_on_duplicate(_DUPLICATE):
+            submodel = await self.repo.create_submodel(
+                model_id=model_id,
+                name=data.name,
+                created_by=user.id
+            )
+        if submodel is None:
             raise HTTPException(404, "Model not found")
+        after_commit(self.db, catalog_read_cache.created, "submodels", model_id)
+        return submodel
 
-        return await self.repo.get_submodels_paginated(
-            model_id,
-            page,
-            per_page,
-            sort_by,
-            filters
+    async def list_by_model(self, model_id: int, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
+        async def load():
+            result = await self.repo.get_submodels_paginated(
+                model_id,
+                page,
+                per_page,
+                sort_by,
+                filters,
+                cursor,
+                count,
+                fields,
+            )
+            if not result.data and not await self.repo.model_exists(model_id):
+                raise HTTPException(404, "Model not found")
+            return result
+
+        return await catalog_read_cache.page(
+            "submodels", model_id, (page, per_page, sort_by, filters, cursor, count, fields), load
         )
 
-    async def delete(self, user: User, model_id: int, submodel_id: int):
-        submodel = await self.repo.get_submodel_by_id(submodel_id)
-        if not submodel or submodel.model_id != model_id:
+    async def delete(self, user: Principal, model_id: int, submodel_id: int):
+        owner_id = owner_scope(user, "cars:delete", "cars:delete_own")
+        result = await self.repo.delete_submodel(submodel_id, model_id, owner_id)
+        if not result.found:
             raise HTTPException(404, "Submodel not found")
-
-        if has_permission(user, "cars:delete"):
-            await self.repo.delete_submodel(submodel_id)
-            return {"detail": "Submodel deleted successfully"}
-
-        if has_permission(user, "cars:delete_own"):
-            if submodel.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only delete submodels you created"
-                )
-            await self.repo.delete_submodel(submodel_id)
-            return {"detail": "Submodel deleted successfully"}
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete submodels you created"
+            )
+        after_commit(self.db, catalog_read_cache.deleted, "submodels", submodel_id, model_id)
+        return {"detail": "Submodel deleted successfully"}
 
     async def get(self, model_id: int, submodel_id: int):
-        submodel = await self.repo.get_submodel_by_id(submodel_id)
-        if not submodel or submodel.model_id != model_id:
+        submodel = await catalog_read_cache.row(
+            "submodels", submodel_id, lambda: self.repo.get_submodel_by_id(submodel_id)
+        )
+        if not submodel or submodel["model_id"] != model_id:
             raise HTTPException(404, "Submodel not found")
         return submodel
 
-    async def update(self, user: User, model_id: int, submodel_id: int, data):
-        submodel = await self.repo.get_submodel_by_id(submodel_id)
-        if not submodel or submodel.model_id != model_id:
+    async def update(self, user: Principal, model_id: int, submodel_id: int, data):
+        owner_id = owner_scope(user, "cars:write", "cars:update_own")
+        update_data = data.model_dump(exclude_unset=True)
+        with conflict_on_duplicate(_DUPLICATE):
+            result = await self.repo.update_submodel(submodel_id, model_id, owner_id, **update_data)
+        if not result.found:
             raise HTTPException(404, "Submodel not found")
-
-        if has_permission(user, "cars:write"):
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return submodel
-            return await self.repo.update_submodel(submodel, **update_data)
-
-        if has_permission(user, "cars:update_own"):
-            if submodel.created_by != user.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only update submodels you created"
-                )
-            update_data = data.model_dump(exclude_unset=True)
-            if not update_data:
-                return submodel
-            return await self.repo.update_submodel(submodel, **update_data)
-
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if result.row is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only update submodels you created"
+            )
+        if update_data:
+            after_commit(self.db, catalog_read_cache.updated, "submodels", submodel_id, model_id)
+        return result.row
 
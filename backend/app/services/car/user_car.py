@@ -1,8 +1,10 @@
+from typing import List
+
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import has_permission
-from app.models.rbac import User
+from app.core.principal import Principal
 from app.repositories.car import CarRepository
 
 
@@ -11,30 +13,41 @@ class UserCarService:
         self.repo = CarRepository(db)
 
     @staticmethod
-    def _ensure_garage_permission(user: User):
+    def _ensure_garage_permission(user: Principal):
         if not has_permission(user, "my_cars"):
             raise HTTPException(status.HTTP_403_FORBIDDEN, "No permission to manage garage")
 
-    async def add(self, user: User, car_spec_id: int):
+    async def add(self, user: Principal, car_spec_id: int):
         self._ensure_garage_permission(user)
-        car_spec = await self.repo.get_car_spec_by_id(car_spec_id)
-        if not car_spec:
+        record = await self.repo.add_car_to_user_list(user.id, car_spec_id)
+        if record is None:
             raise HTTPException(404, "Car spec does not exist")
+        return record
 
-        return await self.repo.add_car_to_user_list(user.id, car_spec_id)
-
-    async def remove(self, user: User, car_spec_id: int):
+    async def change(self, user: Principal, add: List[int], remove: List[int]):
+        self._ensure_garage_permission(user)
+        if set(add) & set(remove):
+            raise HTTPException(400, "A car spec cannot be both added and removed")
+        result = await self.repo.change_user_cars(user.id, add, remove)
+        if result is None:
+            raise HTTPException(409, "Car specs changed concurrently, retry")
+        return result
+
+    async def remove(self, user: Principal, car_spec_id: int):
         self._ensure_garage_permission(user)
         await self.repo.remove_car_from_user_list(user.id, car_spec_id)
         return {"detail": "Car removed from user list"}
 
-    async def list_my_cars(self, user: User, page, per_page, sort_by, filters):
+    async def list_my_cars(self, user: Principal, page, per_page, sort_by, filters, cursor=None, count=None, fields=None):
         self._ensure_garage_permission(user)
         return await self.repo.get_user_cars_paginated(
             user.id,
             page,
             per_page,
             sort_by,
-            filters
+            filters,
+            cursor,
+            count,
+            fields,
         )
 
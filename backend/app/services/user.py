@@ -1,15 +1,18 @@
-from typing import Optional, List
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.user import UserRepository
 from app.repositories.role import RoleRepository
 from app.models.rbac import User, Role
+from app.schemas.pagination import CountStrategy
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import verify_password
+from app.core.principal import Principal, load_principal
+from app.core.security import verify_password_async
 
 
 class UserService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = UserRepository(db)
         self.roles = RoleRepository(db)
 
@@ -24,39 +27,46 @@ class UserService:
         )
 
     # Authentication (username + password)
-    async def authenticate(self, username: str, password: str) -> Optional[User]:
-        user = await self.repo.get_by_username(username)
-        if not user:
+    async def get_login(self, username: str) -> Optional[Tuple[str, Principal]]:
+        """An active user's password hash and principal, for `authenticate`."""
+        credentials = await self.repo.get_credentials(username)
+        if credentials is None or not credentials.is_active:
             return None
+        principal = await load_principal(self.db, credentials.id)
+        return credentials.hashed_password, principal
 
-        if not verify_password(password, user.hashed_password):
+    @staticmethod
+    async def authenticate(login: Optional[Tuple[str, Principal]], password: str) -> Optional[Principal]:
+        """The principal of `get_login` if `password` matches; needs no session."""
+        if login is None:
             return None
-
-        return user
+        hashed_password, principal = login
+        if not await verify_password_async(password, hashed_password):
+            return None
+        return principal
 
     # CRUD
     async def get_user(self, user_id: int) -> Optional[User]:
         return await self.repo.get_by_id(user_id)
 
-    async def get_users(self, page: int, per_page: int, sort_by: Optional[str], filters: Optional[str]):
-        return await self.repo.get_users_paginated(page, per_page, sort_by, filters)
-
-    async def update_user(self, user_id: int, data: UserUpdate) -> Optional[User]:
-        user = await self.repo.get_by_id(user_id)
-        if not user:
-            return None
-
+    async def get_users(
+        self,
+        page: int,
+        per_page: int,
+        sort_by: Optional[str],
+        filters: Optional[str],
+        cursor: Optional[str] = None,
+        count: Optional[CountStrategy] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ):
+        return await self.repo.get_users_paginated(page, per_page, sort_by, filters, cursor, count, fields)
+
+    async def update_user(self, user_id: int, data: UserUpdate):
         update_data = data.model_dump(exclude_unset=True)
-
-        return await self.repo.update_user(user, **update_data)
+        return await self.repo.update_user(user_id, **update_data)
 
     async def delete_user(self, user_id: int) -> bool:
-        user = await self.repo.get_by_id(user_id)
-        if not user:
-            return False
-
-        await self.repo.delete_user(user)
-        return True
+        return await self.repo.delete_user(user_id)
 
     async def assign_role(self, user_id: int, role_name: str) -> User:
         user = await self.repo.get_by_id(user_id)
@@ -1,20 +1,28 @@
-from sqlalchemy import select
+from sqlalchemy import exists, select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
 
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, get_password_hash_async, shutdown_password_executor
 from app.models.rbac import Permission, Role, User
 from app.core.db import AsyncSessionMaker
+from app.utils.read_cache import catalog_read_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with AsyncSessionMaker() as session:
-        await session.run_sync(ensure_seed_data_sync) #async not working here
+        # Hash up front on the pool, and only when the admin is yet to be
+        # created; run_sync executes on the event loop thread.
+        admin_exists = (await session.execute(select(exists().where(User.username == "admin")))).scalar()
+        admin_password_hash = None if admin_exists else await get_password_hash_async(settings.ADMIN_PASSWORD)
+        await session.run_sync(ensure_seed_data_sync, admin_password_hash) #async not working here
     yield
+    await catalog_read_cache.close()
+    shutdown_password_executor()
 
 DEFAULT_PERMISSIONS = [
     ("users:crud", "Manage users"),
@@ -33,7 +41,7 @@ ROLE_MATRIX = {
 }
 
 
-def ensure_seed_data_sync(session: Session) -> None:
+def ensure_seed_data_sync(session: Session, admin_password_hash: Optional[str]) -> None:
     perm_lookup = {}
     for name, description in DEFAULT_PERMISSIONS:
         stmt = select(Permission).where(Permission.name == name)
@@ -58,7 +66,8 @@ def ensure_seed_data_sync(session: Session) -> None:
     if not admin:
         admin = User(
             username="admin",
-            hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
+            # None only if the admin was deleted since the lifespan looked.
+            hashed_password=admin_password_hash or get_password_hash(settings.ADMIN_PASSWORD),
             is_active=True,
         )
         role_stmt = select(Role).where(Role.name == "Admin")
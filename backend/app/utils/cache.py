@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0       # dropped to make room (LRU), not expiry
+    invalidations: int = 0   # counter bumps
+    errors: int = 0          # backend failures, served as misses
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class CacheBackend:
+    """
+    Byte values with a TTL, plus integer counters.
+
+    Values may disappear at any time (expiry, eviction). Counters are
+    used to version keys, so they must not be evicted early: a counter
+    with a TTL reads as 0 once expired, one without lives until the
+    backend reports an `incr` as failed (see MemoryCacheBackend).
+    Backends never raise; failures are counted in `stats.errors` and
+    reported through the return values.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    async def counters(self, keys: Sequence[str]) -> Optional[List[int]]:
+        """Current values of `keys` (missing or expired counters are 0), None if unavailable."""
+        raise NotImplementedError
+
+    async def incr(self, keys: Sequence[str], ttl_seconds: Optional[float] = None) -> bool:
+        """Increment every counter in `keys`, (re)setting its TTL if given; False on failure."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU with per-entry expiry.
+
+    Only touched from the event loop thread, so it needs no lock. Counters
+    live outside the LRU so capacity pressure cannot reset a version.
+
+    One counter is kept per row ever written, so they are capped at
+    `max_counters`. Past it, expired counters are swept; if that is not
+    enough, every value and counter without a TTL is dropped and the
+    `incr` reports failure, so the caller stops trusting versions it
+    read before (values are gone, but a reader in flight may still store
+    one under an old version).
+    """
+
+    def __init__(self, max_entries: int, max_counters: Optional[int] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_counters = 4 * max_entries if max_counters is None else max_counters
+        self._values: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._counters: Dict[str, Tuple[int, Optional[float]]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._values[key] = (value, time.monotonic() + ttl_seconds)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def counters(self, keys: Sequence[str]) -> Optional[List[int]]:
+        now = time.monotonic()
+        values = []
+        for key in keys:
+            value, expires_at = self._counters.get(key, (0, None))
+            values.append(0 if expires_at is not None and expires_at < now else value)
+        return values
+
+    async def incr(self, keys: Sequence[str], ttl_seconds: Optional[float] = None) -> bool:
+        now = time.monotonic()
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        current = await self.counters(keys)
+        for key, value in zip(keys, current):
+            self._counters[key] = (value + 1, expires_at)
+        if len(self._counters) <= self.max_counters:
+            return True
+
+        # Expired counters are otherwise never dropped.
+        self._counters = {
+            key: entry for key, entry in self._counters.items()
+            if entry[1] is None or entry[1] >= now
+        }
+        if len(self._counters) <= self.max_counters:
+            return True
+        self.stats.evictions += len(self._values)
+        self._values.clear()
+        self._counters = {key: entry for key, entry in self._counters.items() if entry[1] is not None}
+        return False
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._counters.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache on anything speaking the Redis protocol (Redis, Valkey,
+    KeyDB, ...) through a `redis.asyncio` client, or a compatible fake
+    such as `fakeredis.FakeAsyncRedis` in tests.
+
+    Every key is prefixed so several apps can share one database.
+    """
+
+    def __init__(self, client, prefix: str = "carapi:"):
+        super().__init__()
+        from redis.exceptions import RedisError
+
+        self.client = client
+        self.prefix = prefix
+        self._errors = (RedisError, OSError, asyncio.TimeoutError)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "carapi:") -> "RedisCacheBackend":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0), prefix)
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.stats.errors += 1
+        logger.warning("Cache %s failed: %s", operation, error)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.get(self.prefix + key)
+        except self._errors as e:
+            self._failed("get", e)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        try:
+            await self.client.set(self.prefix + key, value, px=int(ttl_seconds * 1000))
+        except self._errors as e:
+            self._failed("set", e)
+
+    async def counters(self, keys: Sequence[str]) -> Optional[List[int]]:
+        try:
+            values = await self.client.mget([self.prefix + key for key in keys])
+        except self._errors as e:
+            self._failed("mget", e)
+            return None
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def incr(self, keys: Sequence[str], ttl_seconds: Optional[float] = None) -> bool:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.incr(self.prefix + key)
+                    if ttl_seconds is not None:
+                        pipe.pexpire(self.prefix + key, int(ttl_seconds * 1000))
+                await pipe.execute()
+        except self._errors as e:
+            self._failed("incr", e)
+            return False
+        return True
+
+    async def close(self) -> None:
+        await self.client.aclose()
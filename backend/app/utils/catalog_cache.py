@@ -0,0 +1,34 @@
+from typing import Dict, Optional
+
+
+class CatalogTreeCache:
+    """
+    Serialized /catalog/tree bodies for the latest catalog version seen.
+
+    Entries are keyed by catalog version, so a write (which bumps the
+    version in the database) makes every worker rebuild on its next read;
+    older versions are dropped as soon as a newer one is stored.
+    """
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._bodies: Dict[bool, bytes] = {}
+
+    def get(self, version: int, include_specs: bool) -> Optional[bytes]:
+        if version != self._version:
+            return None
+        return self._bodies.get(include_specs)
+
+    def set(self, version: int, include_specs: bool, body: bytes) -> None:
+        if self._version is None or version > self._version:
+            self._version = version
+            self._bodies = {}
+        if version == self._version:
+            self._bodies[include_specs] = body
+
+    def clear(self) -> None:
+        self._version = None
+        self._bodies = {}
+
+
+catalog_tree_cache = CatalogTreeCache()
@@ -0,0 +1,52 @@
+import time
+from typing import Dict, FrozenSet, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+class CountCache:
+    """
+    In-process cache of total counts for paginated queries.
+
+    Entries remember which tables their query reads from, so a write to
+    any of those tables drops them via `invalidate()`.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[int, float, FrozenSet[str]]] = {}
+
+    def get(self, key: Hashable) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        count, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return count
+
+    def set(self, key: Hashable, count: int, tables: FrozenSet[str]) -> None:
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest insertion; dicts keep insertion order.
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[key] = (count, time.monotonic() + self.ttl_seconds, tables)
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop every cached count that reads from any of `tables`."""
+        stale = [
+            key for key, (_, _, entry_tables) in self._entries.items()
+            if not entry_tables.isdisjoint(tables)
+        ]
+        for key in stale:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.PAGINATION_COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.PAGINATION_COUNT_CACHE_MAX_ENTRIES,
+)
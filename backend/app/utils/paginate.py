@@ -1,9 +1,16 @@
-from sqlalchemy import func, select
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, asc, desc, false, func, or_, select, text, tuple_
+from sqlalchemy.sql.util import find_tables
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, Type
+from typing import Any, List, Optional, Tuple, Type
 
-from app.utils.query_builder import apply_filters, apply_sorting
-from app.schemas.pagination import PaginatedResponse, PageMeta
+from app.utils.query_builder import compile_projection, compile_query, order_by_keys
+from app.schemas.pagination import CountStrategy, PaginatedResponse, PageMeta
+from app.utils.count_cache import count_cache
 
 
 async def paginate(
@@ -14,32 +21,80 @@ async def paginate(
     sort_by: Optional[str],
     filters: Optional[str],
     base_query=None,
+    cursor: Optional[str] = None,
+    count: Optional[CountStrategy] = None,
+    fields: Optional[Tuple[str, ...]] = None,
 ):
     """
     Generic SQL pagination for any model.
     base_query: optional custom select() with joins
+    cursor: opt-in keyset pagination. None keeps LIMIT/OFFSET, "" requests
+            the first keyset page, any other value is a cursor returned in
+            a previous PageMeta.
+    count: how total_items is obtained, see CountStrategy. Defaults to
+           "exact", which in offset mode runs as a single windowed query.
+    fields: column names to select instead of the full entity; `data` then
+            holds plain dicts with exactly these keys and no ORM objects
+            are built.
     """
+    count = count or "exact"
 
     # Default select
     query = base_query if base_query is not None else select(model)
 
-    # Apply filtering and sorting
-    query = apply_filters(query, model, filters)
-    query = apply_sorting(query, model, sort_by)
+    # Parse/validate filters and sorting (memoized per model, filters, sort_by)
+    compiled = compile_query(model, filters, sort_by)
+
+    # Apply filtering
+    if compiled.where:
+        query = query.where(*compiled.where)
 
     # ---------------------------------------
     # Count total items
     # ---------------------------------------
-    count_query = select(func.count()).select_from(query.subquery())
-    total_items = (await session.execute(count_query)).scalar_one()
+    total_items = None
+    if count == "estimated":
+        unfiltered = base_query is None and not filters
+        total_items = await _estimated_count(session, model, query, unfiltered)
+    elif count == "cached":
+        total_items = await _cached_count(session, model, query)
+    elif count == "exact" and cursor is not None:
+        total_items = await _exact_count(session, query)
 
-    # ---------------------------------------
-    # Pagination LIMIT/OFFSET
-    # ---------------------------------------
-    paginated_query = query.limit(per_page).offset((page - 1) * per_page)
+    # Projected after counting so count queries (and the count cache) are shared.
+    if fields is not None:
+        query = query.with_only_columns(*compile_projection(model, fields))
 
-    result = await session.execute(paginated_query)
-    items = result.scalars().all()
+    if cursor is not None:
+        items, next_cursor, prev_cursor = await _fetch_keyset_page(
+            session, model, query, per_page, compiled.order, cursor, fields
+        )
+    else:
+        # ---------------------------------------
+        # Pagination LIMIT/OFFSET
+        # ---------------------------------------
+        query = order_by_keys(query, compiled.order)
+        offset = (page - 1) * per_page
+        next_cursor = prev_cursor = None
+
+        if count == "exact":
+            # count(*) OVER () returns the total alongside the page in one round-trip.
+            paginated_query = (
+                query.add_columns(func.count().over().label("total_count"))
+                .limit(per_page)
+                .offset(offset)
+            )
+            rows = (await session.execute(paginated_query)).all()
+            items = _items(rows, fields)
+            if rows:
+                total_items = rows[0].total_count
+            else:
+                # Past the last page the window has no rows to report on.
+                total_items = await _exact_count(session, query) if offset else 0
+        else:
+            paginated_query = query.limit(per_page).offset(offset)
+            result = await session.execute(paginated_query)
+            items = _items(result.all(), fields)
 
     # ---------------------------------------
     # Build response
@@ -50,6 +105,203 @@ async def paginate(
             page=page,
             per_page=per_page,
             total_items=total_items,
-            total_pages=(total_items + per_page - 1) // per_page,
+            total_pages=(
+                (total_items + per_page - 1) // per_page
+                if total_items is not None else None
+            ),
+            count_strategy=count,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
         ),
     )
+
+
+def _items(rows, fields: Optional[Tuple[str, ...]]) -> List[Any]:
+    """Entities, or dicts of the projected columns (extra trailing columns dropped)."""
+    if fields is None:
+        return [row[0] for row in rows]
+    return [dict(zip(fields, row)) for row in rows]
+
+
+# ---------------------------------------
+# Count strategies
+# ---------------------------------------
+
+async def _exact_count(session: AsyncSession, query) -> int:
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    return (await session.execute(count_query)).scalar_one()
+
+
+async def _estimated_count(session: AsyncSession, model: Type, query, unfiltered: bool) -> int:
+    """Planner row estimate; cheap but only as fresh as the last ANALYZE."""
+    if unfiltered:
+        result = await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": model.__tablename__},
+        )
+        reltuples = result.scalar_one_or_none()
+        # reltuples is -1 for tables that were never vacuumed or analyzed.
+        if reltuples is not None and reltuples >= 0:
+            return reltuples
+
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _cached_count(session: AsyncSession, model: Type, query) -> int:
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    key = (model.__tablename__, str(compiled))
+    total_items = count_cache.get(key)
+    if total_items is None:
+        total_items = await _exact_count(session, query)
+        tables = frozenset(t.name for t in find_tables(query, include_joins=True))
+        count_cache.set(key, total_items, tables)
+    return total_items
+
+
+# ---------------------------------------
+# Keyset (cursor) pagination
+# ---------------------------------------
+
+async def _fetch_keyset_page(
+    session: AsyncSession,
+    model: Type,
+    query,
+    per_page: int,
+    order: Tuple[Tuple[Any, bool], ...],
+    cursor: str,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    keys = _keyset_columns(model, order)
+    if fields is not None:
+        # Cursors are built from the sort keys, so select any that were not projected.
+        missing = [column for column, _ in keys if column.key not in fields]
+        if missing:
+            query = query.add_columns(*missing)
+
+    backwards = False
+    if cursor:
+        values, backwards = _decode_cursor(cursor, keys)
+        # Walking backwards is a forward walk over the inverted ordering.
+        walk = [(column, descending != backwards) for column, descending in keys]
+        query = query.where(_after(walk, values))
+    else:
+        walk = keys
+
+    for column, descending in walk:
+        query = query.order_by(desc(column) if descending else asc(column))
+
+    # One extra row tells us whether another page exists in walk direction.
+    result = await session.execute(query.limit(per_page + 1))
+    rows = result.all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return [], None, None
+
+    # Projected rows expose columns as attributes; otherwise read the entity.
+    first_row, last_row = (rows[0], rows[-1]) if fields is not None else (rows[0][0], rows[-1][0])
+    first = _encode_cursor(first_row, keys, backwards=True)
+    last = _encode_cursor(last_row, keys, backwards=False)
+    items = _items(rows, fields)
+
+    if backwards:
+        return items, last, first if has_more else None
+    return items, last if has_more else None, first if cursor else None
+
+
+def _keyset_columns(model: Type, order: Tuple[Tuple[Any, bool], ...]) -> List[Tuple[Any, bool]]:
+    """Sort keys from `sort_by` plus `id` as a unique tiebreaker."""
+    keys = list(order)
+    if not any(column.key == "id" for column, _ in keys):
+        keys.append((model.id, False))
+    return keys
+
+
+def _after(keys: List[Tuple[Any, bool]], values: List[Any]):
+    """WHERE clause selecting rows strictly after `values` in `keys` order.
+
+    Postgres sorts NULLs last for ASC and first for DESC, which is what the
+    comparisons below assume.
+    """
+    nullable = any(_is_nullable(column) for column, _ in keys)
+    same_direction = len({descending for _, descending in keys}) == 1
+    if not nullable and same_direction and None not in values:
+        # Row-value comparison lets Postgres seek a matching composite index.
+        lhs = tuple_(*(column for column, _ in keys))
+        rhs = tuple_(*values)
+        return lhs < rhs if keys[0][1] else lhs > rhs
+
+    clauses = []
+    for i, ((column, descending), value) in enumerate(zip(keys, values)):
+        equal_prefix = [
+            c.is_(None) if v is None else c == v
+            for (c, _), v in zip(keys[:i], values[:i])
+        ]
+        clauses.append(and_(*equal_prefix, _strictly_after(column, descending, value)))
+    return or_(*clauses)
+
+
+def _strictly_after(column, descending: bool, value: Any):
+    if value is None:
+        # NULLs are last in ASC order; in DESC they come first.
+        return column.is_not(None) if descending else false()
+    if descending:
+        return column < value
+    if _is_nullable(column):
+        return or_(column > value, column.is_(None))
+    return column > value
+
+
+def _is_nullable(column) -> bool:
+    return bool(getattr(column.expression, "nullable", True))
+
+
+def _encode_cursor(item, keys: List[Tuple[Any, bool]], backwards: bool) -> str:
+    values = [_to_json(getattr(item, column.key)) for column, _ in keys]
+    raw = json.dumps({"v": values, "b": backwards}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, keys: List[Tuple[Any, bool]]):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        backwards = bool(payload["b"])
+        if len(values) != len(keys):
+            raise ValueError("cursor does not match sort_by")
+        values = [_from_json(column, value) for (column, _), value in zip(keys, values)]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values, backwards
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if not isinstance(value, python_type):
+        raise ValueError("cursor value has the wrong type")
+    return value
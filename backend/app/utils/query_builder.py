@@ -1,82 +1,304 @@
-from sqlalchemy import asc, desc, text
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import InvalidOperation
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, Integer, SmallInteger, asc, desc, inspect
 from sqlalchemy.sql import Select
-from typing import Dict, Any, Optional
 
+from app.core.config import settings
+
+
+# ---------------------------------------
+# Parsing
+# ---------------------------------------
+
+_RULE = re.compile(r"^\s*([A-Za-z_]\w*)\s*(>=|<=|!=|~=|\^=|>|<|:|=)(.*)$", re.DOTALL)
+
+_COMPARISONS = {">": "gt", "<": "lt", ">=": "ge", "<=": "le"}
 
-def apply_sorting(query: Select, model, sort_by: Optional[str]):
+
+@dataclass(frozen=True, slots=True)
+class FilterRule:
     """
-    sort_by example: "name,-id,year"
+    One parsed `filters` rule.
+
+    op is one of: eq, ne, gt, lt, ge, le, in, not_in, range, contains,
+    prefix, is_null, not_null. `values` holds the raw strings; they are
+    coerced to the column type when the rule is compiled.
     """
-    if not sort_by:
-        return query
 
-    fields = sort_by.split(",")
+    field: str
+    op: str
+    values: Tuple[str, ...] = ()
 
-    for f in fields:
-        f = f.strip()
-        if not f:
-            continue
 
-        if f.startswith("-"):
-            column = getattr(model, f[1:], None)
-            if column is not None:
-                query = query.order_by(desc(column))
-        else:
-            column = getattr(model, f, None)
-            if column is not None:
-                query = query.order_by(asc(column))
+@dataclass(frozen=True, slots=True)
+class CompiledQuery:
+    """WHERE clauses and (column, descending) sort keys ready to apply to a select."""
 
-    return query
+    where: Tuple[Any, ...]
+    order: Tuple[Tuple[Any, bool], ...]
 
 
-def apply_filters(query: Select, model, filters: Optional[str]):
+def parse_filters(filters: Optional[str]) -> List[FilterRule]:
     """
     filters example:
         "brand_id:1,year>2010,engine~=diesel"
-    
+
     Supported:
-        =, >, <, >=, <=, !=
-        ~= (LIKE)
+        field:value / field=value     equality, "null" means IS NULL
+        field:a|b|c                   IN list
+        field:2010..2015              inclusive range, either end optional (not on text)
+        field!=value, field!=a|b      inequality / NOT IN
+        >, <, >=, <=                  comparisons
+        field~=text                   case-insensitive contains (ILIKE), text only
+        field^=text                   prefix match (LIKE 'text%'), text only
     """
-
     if not filters:
-        return query
+        return []
 
-    rules = filters.split(",")
-
-    for rule in rules:
-        rule = rule.strip()
-        if not rule:
+    rules = []
+    for raw in filters.split(","):
+        if not raw.strip():
             continue
 
-        # LIKE filter
-        if "~=" in rule:
-            key, val = rule.split("~=", 1)
-            column = getattr(model, key, None)
-            if column is not None:
-                query = query.where(column.ilike(f"%{val}%"))
+        match = _RULE.match(raw)
+        if match is None:
+            raise HTTPException(status_code=400, detail=f"Invalid filter '{raw.strip()}'")
+        field, op, value = match.group(1), match.group(2), match.group(3).strip()
+
+        if op in (":", "="):
+            if value == "null":
+                rules.append(FilterRule(field, "is_null"))
+            elif "|" in value:
+                rules.append(FilterRule(field, "in", tuple(value.split("|"))))
+            elif ".." in value:
+                low, _, high = value.partition("..")
+                rules.append(FilterRule(field, "range", (low, high)))
+            else:
+                rules.append(FilterRule(field, "eq", (value,)))
+        elif op == "!=":
+            if value == "null":
+                rules.append(FilterRule(field, "not_null"))
+            elif "|" in value:
+                rules.append(FilterRule(field, "not_in", tuple(value.split("|"))))
+            else:
+                rules.append(FilterRule(field, "ne", (value,)))
+        elif op == "~=":
+            rules.append(FilterRule(field, "contains", (value,)))
+        elif op == "^=":
+            rules.append(FilterRule(field, "prefix", (value,)))
+        else:
+            rules.append(FilterRule(field, _COMPARISONS[op], (value,)))
+
+    return rules
+
+
+# ---------------------------------------
+# Allowlists
+# ---------------------------------------
+
+def filterable_fields(model) -> FrozenSet[str]:
+    """Columns `filters` may reference: `model.__filterable__`, else every mapped column."""
+    return _allowed(model, "__filterable__")
+
+
+def sortable_fields(model) -> FrozenSet[str]:
+    """Columns `sort_by` may reference: `model.__sortable__`, else every mapped column."""
+    return _allowed(model, "__sortable__")
+
+
+def _allowed(model, attribute: str) -> FrozenSet[str]:
+    declared = getattr(model, attribute, None)
+    if declared is not None:
+        return frozenset(declared)
+    return frozenset(attr.key for attr in inspect(model).column_attrs)
+
+
+def selectable_fields(model) -> FrozenSet[str]:
+    """Columns a projection may select: `model.__selectable__`, else every non-deferred mapped column."""
+    declared = getattr(model, "__selectable__", None)
+    if declared is not None:
+        return frozenset(declared)
+    return frozenset(attr.key for attr in inspect(model).column_attrs if not attr.deferred)
+
+
+def _column(model, field: str, allowed: FrozenSet[str], kind: str):
+    if field not in allowed:
+        raise HTTPException(status_code=400, detail=f"Cannot {kind} by '{field}'")
+    return getattr(model, field)
+
+
+# ---------------------------------------
+# Compiling
+# ---------------------------------------
+
+@lru_cache(maxsize=settings.QUERY_COMPILE_CACHE_SIZE)
+def compile_query(model, filters: Optional[str], sort_by: Optional[str]) -> CompiledQuery:
+    """
+    Parse, validate and type `filters` and `sort_by` for `model`.
+
+    Results are memoized, so repeated requests skip parsing entirely; the
+    returned clauses are immutable and safe to share between statements.
+    Raises HTTPException(400) for unknown fields or values that do not fit
+    the column type (errors are not cached).
+    """
+    allowed = filterable_fields(model)
+    where = tuple(
+        _compile_rule(_column(model, rule.field, allowed, "filter"), rule)
+        for rule in parse_filters(filters)
+    )
+    return CompiledQuery(where=where, order=tuple(_compile_sorting(model, sort_by)))
+
+
+@lru_cache(maxsize=settings.QUERY_COMPILE_CACHE_SIZE)
+def compile_projection(model, fields: Tuple[str, ...]) -> Tuple[Any, ...]:
+    """
+    Column attributes for `fields`, for a Core select that skips the ORM.
+
+    Rows of such a select are keyed by the same names as `fields`.
+    Raises HTTPException(400) for fields that are not selectable columns.
+    """
+    allowed = selectable_fields(model)
+    for field in fields:
+        if field not in allowed:
+            raise HTTPException(status_code=400, detail=f"Cannot select field '{field}'")
+    return tuple(getattr(model, field) for field in fields)
+
+
+def _compile_sorting(model, sort_by: Optional[str]) -> List[Tuple[Any, bool]]:
+    if not sort_by:
+        return []
+
+    allowed = sortable_fields(model)
+    keys = []
+    for f in sort_by.split(","):
+        f = f.strip()
+        if not f:
             continue
 
-        # comparison filters
-        for op in [">=", "<=", "!=", ">", "<", ":"]:
-            if op in rule:
-                key, val = rule.split(op, 1)
-                col = getattr(model, key, None)
-                if col is None:
-                    break
-
-                if op == ":" or op == "=":
-                    query = query.where(col == val)
-                elif op == ">":
-                    query = query.where(col > val)
-                elif op == "<":
-                    query = query.where(col < val)
-                elif op == ">=":
-                    query = query.where(col >= val)
-                elif op == "<=":
-                    query = query.where(col <= val)
-                elif op == "!=":
-                    query = query.where(col != val)
-                break
+        descending = f.startswith("-")
+        column = _column(model, f[1:] if descending else f, allowed, "sort")
+        keys.append((column, descending))
+
+    return keys
+
+
+def _compile_rule(column, rule: FilterRule):
+    op = rule.op
+    if op == "is_null":
+        return column.is_(None)
+    if op == "not_null":
+        return column.is_not(None)
+
+    python_type = _python_type(column)
+    if op in ("contains", "prefix"):
+        if python_type is not str:
+            raise HTTPException(status_code=400, detail=f"Cannot match text against '{rule.field}'")
+        if op == "contains":
+            return column.ilike(f"%{_escape_like(rule.values[0])}%", escape="\\")
+        # A constant 'x%' pattern (unlike startswith()'s concatenation) lets
+        # Postgres use a text_pattern_ops / C-collation btree index.
+        return column.like(f"{_escape_like(rule.values[0])}%", escape="\\")
+
+    if op == "range":
+        if python_type is str:
+            # Ranges only make sense for ordered non-text columns.
+            raise HTTPException(status_code=400, detail=f"Cannot filter '{rule.field}' by range")
+        low, high = rule.values
+        if not low and not high:
+            raise HTTPException(status_code=400, detail=f"Invalid range for '{rule.field}'")
+        if not high:
+            return column >= _coerce(column, python_type, low)
+        if not low:
+            return column <= _coerce(column, python_type, high)
+        return column.between(
+            _coerce(column, python_type, low), _coerce(column, python_type, high)
+        )
+
+    values = [_coerce(column, python_type, value) for value in rule.values]
+    if op == "in":
+        return column.in_(values)
+    if op == "not_in":
+        return column.not_in(values)
+
+    value = values[0]
+    if op == "eq":
+        return column == value
+    if op == "ne":
+        return column != value
+    if op == "gt":
+        return column > value
+    if op == "lt":
+        return column < value
+    if op == "ge":
+        return column >= value
+    return column <= value
+
+
+def _python_type(column) -> type:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return str
+
+
+# Bits of the integer column types, checked so out-of-range values are a 400
+# rather than a driver error.
+_INTEGER_BITS = ((BigInteger, 64), (SmallInteger, 16), (Integer, 32))
+
+_TRUE = {"true", "1", "yes"}
+_FALSE = {"false", "0", "no"}
+
+
+def _coerce(column, python_type: type, value: str) -> Any:
+    """Convert a raw filter value to the column's Python type so binds are typed."""
+    try:
+        if python_type is str:
+            return value
+        if python_type is bool:
+            lowered = value.lower()
+            if lowered in _TRUE:
+                return True
+            if lowered in _FALSE:
+                return False
+            raise ValueError(value)
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        coerced = python_type(value)
+        if python_type is int:
+            _check_int_range(column, coerced)
+        return coerced
+    except (ValueError, TypeError, InvalidOperation):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid value '{value}' for '{column.key}'",
+        )
+
+
+def _check_int_range(column, value: int) -> None:
+    for type_, bits in _INTEGER_BITS:
+        if isinstance(column.type, type_):
+            if not -(2 ** (bits - 1)) <= value < 2 ** (bits - 1):
+                raise ValueError(value)
+            return
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# ---------------------------------------
+# Applying
+# ---------------------------------------
 
+def order_by_keys(query: Select, keys):
+    for column, descending in keys:
+        query = query.order_by(desc(column) if descending else asc(column))
     return query
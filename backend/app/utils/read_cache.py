@@ -0,0 +1,212 @@
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence
+
+import orjson
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.schemas.pagination import PageMeta, PaginatedResponse
+from app.utils.cache import CacheBackend, CacheStats, MemoryCacheBackend, RedisCacheBackend
+
+# Catalog tables from the top of the hierarchy down; deleting a row
+# cascades to every table after its own.
+_HIERARCHY = ("brands", "models", "submodels", "generations", "car_specs")
+
+# Spec rows carrying their parents' names; cached as their own table
+# since any write above a spec can change them.
+_SPEC_CATALOG = "spec_catalog"
+
+
+def row_dict(obj) -> Optional[Dict[str, Any]]:
+    """Loaded column values of an ORM object (deferred columns are left out)."""
+    if obj is None:
+        return None
+    mapper = inspect(obj).mapper
+    return {attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs if not attr.deferred}
+
+
+class CatalogReadCache:
+    """
+    Read-through cache for catalog rows by id and list pages by parent id
+    and query parameters.
+
+    Keys embed version counters held by the backend, read before the
+    database is queried:
+
+      table:<t>            every row of t (cascading deletes, imports)
+      row:<t>:<id>         one row (updates, deletes)
+      list:<t>:<parent>    the pages of t under one parent (any write there)
+
+    Writers bump the counters after committing, so an entry filled from a
+    query that raced the write lands under a key no later read asks for,
+    and nothing is ever deleted; superseded entries age out by TTL or LRU.
+
+    With read replicas a reader may still see pre-write rows after the
+    counters moved, so keys touched by a write are not filled again for
+    DB_REPLICA_STICKY_SECONDS. If bumping a counter fails (shared backend
+    unreachable, memory backend out of counter room) this process stops
+    using the cache until every entry stored before the failure has
+    expired.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl_seconds: float, quiet_seconds: float = 0):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.quiet_seconds = quiet_seconds
+        self._bypass_until = 0.0
+
+    @property
+    def name(self) -> str:
+        if self.backend is None:
+            return "none"
+        return "redis" if isinstance(self.backend, RedisCacheBackend) else "memory"
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats if self.backend is not None else CacheStats()
+
+    async def row(
+        self, table: str, row_id: int, load: Callable[[], Awaitable[Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Row `row_id` of `table` as a dict of column values, from `load()` on a miss."""
+        async def load_row():
+            return row_dict(await load())
+
+        return await self._read(
+            (f"table:{table}", f"row:{table}:{row_id}"),
+            f"{table}:{row_id}",
+            load_row,
+            orjson.dumps,
+            orjson.loads,
+        )
+
+    async def page(
+        self,
+        table: str,
+        parent_id: Optional[int],
+        params: Sequence[Hashable],
+        load: Callable[[], Awaitable[PaginatedResponse]],
+    ) -> PaginatedResponse:
+        """
+        A page of `table` under `parent_id` for the given query `params`.
+
+        Only projected pages (dict items) are stored; ORM pages are returned
+        as loaded.
+        """
+        digest = hashlib.blake2b(repr(tuple(params)).encode(), digest_size=12).hexdigest()
+        parent = "-" if parent_id is None else parent_id
+        return await self._read(
+            (f"table:{table}", f"list:{table}:{parent}"),
+            f"{table}:list:{parent}:{digest}",
+            load,
+            _dump_page,
+            _load_page,
+        )
+
+    async def _read(self, counter_keys, key, load, dump, restore):
+        backend = self.backend
+        if backend is None or self._bypass_until > time.monotonic():
+            return await load()
+
+        keys = list(counter_keys)
+        if self.quiet_seconds:
+            keys += [f"recent:{k}" for k in counter_keys]
+        counters = await backend.counters(keys)
+        if counters is None:
+            return await load()
+
+        versions = counters[:len(counter_keys)]
+        key = f"{key}@{'.'.join(map(str, versions))}"
+        cached = await backend.get(key)
+        if cached is not None:
+            backend.stats.hits += 1
+            return restore(cached)
+
+        backend.stats.misses += 1
+        value = await load()
+        if value is not None and not any(counters[len(counter_keys):]):
+            body = dump(value)
+            if body is not None:
+                await backend.set(key, body, self.ttl_seconds)
+                backend.stats.sets += 1
+        return value
+
+    # ------------------------------------------------------------------
+    # Invalidation; call once the write is committed.
+    # ------------------------------------------------------------------
+
+    async def created(self, table: str, parent_id: Optional[int] = None) -> None:
+        await self._bump(f"list:{table}:{'-' if parent_id is None else parent_id}")
+
+    async def updated(self, table: str, row_id: int, parent_id: Optional[int] = None) -> None:
+        await self._bump(
+            f"row:{table}:{row_id}",
+            f"list:{table}:{'-' if parent_id is None else parent_id}",
+            _spec_catalog_key(table, row_id),
+        )
+
+    async def deleted(self, table: str, row_id: int, parent_id: Optional[int] = None) -> None:
+        descendants = _HIERARCHY[_HIERARCHY.index(table) + 1:]
+        await self._bump(
+            f"row:{table}:{row_id}",
+            f"list:{table}:{'-' if parent_id is None else parent_id}",
+            *(f"table:{t}" for t in descendants),
+            _spec_catalog_key(table, row_id),
+        )
+
+    async def tables_changed(self, *tables: str) -> None:
+        if any(t in _HIERARCHY for t in tables):
+            tables += (_SPEC_CATALOG,)
+        await self._bump(*(f"table:{t}" for t in tables))
+
+    async def _bump(self, *keys: str) -> None:
+        backend = self.backend
+        if backend is None:
+            return
+        ok = await backend.incr(keys)
+        if ok and self.quiet_seconds:
+            ok = await backend.incr([f"recent:{k}" for k in keys], self.quiet_seconds)
+        if ok:
+            backend.stats.invalidations += len(keys)
+        else:
+            self._bypass_until = time.monotonic() + self.ttl_seconds
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def _spec_catalog_key(table: str, row_id: int) -> str:
+    """Counter covering the spec_catalog rows a write to `table` row `row_id` may change."""
+    if table == "car_specs":
+        return f"row:{_SPEC_CATALOG}:{row_id}"
+    return f"table:{_SPEC_CATALOG}"
+
+
+def _dump_page(page: PaginatedResponse) -> Optional[bytes]:
+    if not all(isinstance(item, dict) for item in page.data):
+        return None
+    return orjson.dumps({"data": page.data, "meta": page.meta.model_dump()})
+
+
+def _load_page(body: bytes) -> PaginatedResponse:
+    page = orjson.loads(body)
+    return PaginatedResponse.model_construct(
+        data=page["data"], meta=PageMeta.model_construct(**page["meta"])
+    )
+
+
+def _backend() -> Optional[CacheBackend]:
+    if settings.CATALOG_READ_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.CATALOG_READ_CACHE_MAX_ENTRIES)
+    if settings.CATALOG_READ_CACHE_BACKEND == "redis":
+        return RedisCacheBackend.from_url(settings.CATALOG_READ_CACHE_REDIS_URL)
+    return None
+
+
+catalog_read_cache = CatalogReadCache(
+    _backend(),
+    ttl_seconds=settings.CATALOG_READ_CACHE_TTL_SECONDS,
+    quiet_seconds=settings.DB_REPLICA_STICKY_SECONDS if settings.DB_READ_REPLICA_URLS else 0,
+)
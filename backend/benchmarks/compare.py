@@ -0,0 +1,61 @@
+"""
+Compare two load-harness reports endpoint by endpoint.
+
+    python -m benchmarks.compare baseline.json candidate.json
+
+Prints p50/p95/p99 and throughput with the relative change; latency
+increases and throughput drops above --threshold percent are marked "!".
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = (("p50_ms", False), ("p95_ms", False), ("p99_ms", False), ("throughput_rps", True))
+
+
+def _change(old, new):
+    if not old or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> str:
+    lines = [
+        f"baseline  {baseline['meta'].get('commit')}",
+        f"candidate {candidate['meta'].get('commit')}",
+        "",
+    ]
+    header = f"{'endpoint':<62}" + "".join(f"{name:>24}" for name, _ in METRICS)
+    lines += [header, "-" * len(header)]
+    for name in sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])):
+        old = baseline["endpoints"].get(name)
+        new = candidate["endpoints"].get(name)
+        if old is None or new is None:
+            lines.append(f"{name:<62}  only in {'candidate' if old is None else 'baseline'}")
+            continue
+        cells = []
+        for metric, higher_is_better in METRICS:
+            change = _change(old[metric], new[metric])
+            if change is None:
+                cells.append(f"{'-':>24}")
+                continue
+            worse = -change if higher_is_better else change
+            flag = "!" if worse > threshold else " "
+            cells.append(f"{new[metric]:>12} ({change:+6.1f}%){flag}")
+        lines.append(f"{name:<62}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change to flag")
+    args = parser.parse_args()
+    baseline = json.loads(Path(args.baseline).read_text())
+    candidate = json.loads(Path(args.candidate).read_text())
+    print(compare(baseline, candidate, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Index check: EXPLAIN every query the hot list repository methods issue
+and fail if any plan reads a whole table.
+
+The planner prefers sequential scans on small tables whatever indexes
+exist, so plans are made with enable_seqscan off. A whole-table read
+left in a plan then means no index can serve the query: a Seq Scan, or
+an index scan with no index condition (walking an index for its order
+and filtering every row). Offset and cursor pages are checked, with the
+default and a custom ordering.
+
+Seeds the database like the load harness (the name must end in
+"_bench"), then prints a JSON report; exits 1 on any whole-table read:
+
+    python -m benchmarks.explain --database cardb_bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.load import BACKEND_DIR, ensure_database, migrate
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fail on whole-table reads in hot list queries.")
+    parser.add_argument("--database", default=os.environ.get("POSTGRES_DB", "cardb_bench"),
+                        help="database to (re)create data in; must end in _bench")
+    parser.add_argument("--no-migrate", action="store_true", help="skip `alembic upgrade head`")
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed for the data")
+    return parser.parse_args(argv)
+
+
+def full_scans(plan: Dict[str, Any]) -> List[str]:
+    """Relations read whole anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    node = plan.get("Node Type")
+    whole = node == "Seq Scan" or (
+        node in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan
+    )
+    found = [plan["Relation Name"]] if whole else []
+    for child in plan.get("Plans", ()):
+        found += full_scans(child)
+    return found
+
+
+def _cases(data) -> Dict[str, Any]:
+    """Repository calls to check, by name; each takes a CarRepository."""
+    brand_id = data.brand_ids[0]
+    model_id = data.models[0][1]
+    submodel_id = data.submodels[0][1]
+    generation_id = data.generations[0][1]
+    user_id = data.user_ids[0]
+    lists = {
+        "models": (lambda repo, *page: repo.get_models_paginated(brand_id, *page), "name"),
+        "submodels": (lambda repo, *page: repo.get_submodels_paginated(model_id, *page), "name"),
+        "generations": (
+            lambda repo, *page: repo.get_generations_paginated(submodel_id, *page), "year_start"
+        ),
+        "specs": (lambda repo, *page: repo.get_specs_paginated(generation_id, *page), "-horsepower"),
+        "my-cars": (lambda repo, *page: repo.get_user_cars_paginated(user_id, *page), "-year"),
+    }
+
+    cases = {}
+    for name, (call, sort_by) in lists.items():
+        for order in (None, sort_by):
+            # (page, per_page, sort_by, filters, cursor, count)
+            cases[f"{name} page 3 sort={order}"] = (call, (3, 20, order, None, None, "exact"))
+            cases[f"{name} cursor sort={order}"] = (call, (1, 20, order, None, "", None))
+    cases.update({
+        "models by brand": (lambda repo: repo.get_models_by_brand_id(brand_id), ()),
+        "submodels by model": (lambda repo: repo.get_submodels_by_model_id(model_id), ()),
+        "generations by submodel": (
+            lambda repo: repo.get_generations_by_submodel_id(submodel_id), ()
+        ),
+        "specs by generation": (
+            lambda repo: repo.get_car_specs_by_generation_id(generation_id), ()
+        ),
+        "cars by user": (lambda repo: repo.get_cars_by_user_id(user_id), ()),
+    })
+    return cases
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    from sqlalchemy import event, text
+
+    from app.core.db import AsyncSessionMaker, engine
+    from app.repositories.car import CarRepository
+    from benchmarks.seed import CatalogShape, reset, seed
+
+    await ensure_database(args.database)
+    if not args.no_migrate:
+        migrate()
+
+    async with AsyncSessionMaker() as session:
+        await reset(session)
+        data = await seed(session, CatalogShape(), random.Random(args.seed))
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+
+    statements: List[tuple] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    report = {}
+    for name, (call, page) in _cases(data).items():
+        async with AsyncSessionMaker() as session:
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                await call(CarRepository(session), *page)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            captured, statements[:] = list(statements), []
+
+            connection = await session.connection()
+            await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            scanned = []
+            for statement, parameters in captured:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                scanned += full_scans(plan[0]["Plan"])
+            await session.rollback()
+        report[name] = {"statements": len(captured), "full_scans": sorted(set(scanned))}
+
+    await engine.dispose()
+    return report
+
+
+def cli(argv=None) -> None:
+    args = parse_args(argv)
+    if not args.database.endswith("_bench"):
+        raise SystemExit(f"refusing to wipe {args.database!r}: database name must end in _bench")
+    os.environ["POSTGRES_DB"] = args.database
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    report = asyncio.run(main(args))
+    print(json.dumps(report, indent=2, sort_keys=True))
+    failed = [name for name, result in report.items() if result["full_scans"]]
+    if failed:
+        raise SystemExit(f"whole-table reads in: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,237 @@
+"""
+Load-test harness: seeds a synthetic catalog and drives every endpoint of
+the login, user, role and car routers through httpx.AsyncClient against
+the ASGI app, reporting throughput and latency percentiles as JSON.
+
+It needs a Postgres it may wipe. The database name must end in "_bench";
+it is created and migrated if needed. For example, with the compose db:
+
+    docker compose up -d db
+    cd backend
+    pip install -r requirements-bench.txt
+    python -m benchmarks.load --database cardb_bench --requests 500 \\
+        --concurrency 16 --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.compare bench-old.json bench-new.json
+
+Connection settings come from the usual POSTGRES_* / DB_* environment
+variables (or .env); --database overrides POSTGRES_DB.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint against a seeded database.")
+    parser.add_argument("--database", default=os.environ.get("POSTGRES_DB", "cardb_bench"),
+                        help="database to (re)create data in; must end in _bench")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight requests per endpoint")
+    parser.add_argument("--only", help="regex; run only endpoints whose name matches")
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed for data and requests")
+    parser.add_argument("--no-migrate", action="store_true", help="skip `alembic upgrade head`")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+
+    shape = parser.add_argument_group("catalog shape")
+    shape.add_argument("--brands", type=int, default=20)
+    shape.add_argument("--models", type=int, default=5, help="per brand")
+    shape.add_argument("--submodels", type=int, default=3, help="per model")
+    shape.add_argument("--generations", type=int, default=3, help="per submodel")
+    shape.add_argument("--specs", type=int, default=10, help="per generation")
+    shape.add_argument("--users", type=int, default=50)
+    shape.add_argument("--garage", type=int, default=10, help="specs per user garage")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(client, ctx, scenario, requests: int, concurrency: int) -> Dict:
+    targets = await scenario.prepare(ctx, requests) if scenario.prepare else [None] * requests
+    calls = [scenario.build(ctx, i, target) for i, target in enumerate(targets)]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    queue = iter(calls)
+
+    async def worker():
+        for call in queue:
+            headers = ctx.admin_headers if call.headers is None else call.headers
+            started = time.perf_counter()
+            response = await client.request(
+                call.method, call.url, params=call.params, json=call.json, headers=headers
+            )
+            await response.aread()
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    background = asyncio.create_task(scenario.background(client, ctx)) if scenario.background else None
+    try:
+        with scenario.around() if scenario.around else contextlib.nullcontext():
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        if background is not None:
+            background.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await background
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    return {
+        "requests": len(calls),
+        "errors": sum(
+            count for status, count in statuses.items()
+            if (int(status) >= 400 if scenario.expect is None else int(status) != scenario.expect)
+        ),
+        "statuses": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(calls) / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def ensure_database(name: str) -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import settings
+
+    admin_url = str(settings.SQLALCHEMY_DATABASE_URI).rsplit("/", 1)[0] + "/postgres"
+    engine = create_async_engine(admin_url, isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as conn:
+            exists = (await conn.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name}
+            )).scalar()
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    finally:
+        await engine.dispose()
+
+
+def migrate() -> None:
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR / "app", check=True
+    )
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    import httpx
+
+    from app.core.db import AsyncSessionMaker, engine
+    from app.core.config import settings
+    from app.main import app
+    from app.startup_bootstrap import lifespan
+    from benchmarks.scenarios import Context, build_scenarios
+    from benchmarks.seed import CatalogShape, issue_token, reset, seed
+
+    await ensure_database(args.database)
+    if not args.no_migrate:
+        migrate()
+
+    rng = random.Random(args.seed)
+    shape = CatalogShape(
+        brands=args.brands,
+        models_per_brand=args.models,
+        submodels_per_model=args.submodels,
+        generations_per_submodel=args.generations,
+        specs_per_generation=args.specs,
+        users=args.users,
+        garage_size=args.garage,
+    )
+
+    async with lifespan(app):
+        async with AsyncSessionMaker() as session:
+            await reset(session)
+            data = await seed(session, shape, rng)
+            admin_token = await issue_token(session, data.admin_id)
+            user_headers = {
+                uid: {"Authorization": f"Bearer {await issue_token(session, uid)}"}
+                for uid in data.user_ids
+            }
+
+        ctx = Context(
+            data=data,
+            rng=rng,
+            admin_headers={"Authorization": f"Bearer {admin_token}"},
+            user_headers=user_headers,
+        )
+        only = re.compile(args.only) if args.only else None
+        transport = httpx.ASGITransport(app=app)
+        endpoints = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for scenario in build_scenarios():
+                if only and not only.search(scenario.name):
+                    continue
+                endpoints[scenario.name] = await run_scenario(
+                    client, ctx, scenario, args.requests, args.concurrency
+                )
+                print(f"{scenario.name}: {endpoints[scenario.name]['p50_ms']} ms p50", file=sys.stderr)
+
+    await engine.dispose()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": args.database,
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "shape": vars(shape),
+            "pool": {"size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW},
+        },
+        "endpoints": endpoints,
+    }
+
+
+def cli(argv=None) -> None:
+    args = parse_args(argv)
+    if not args.database.endswith("_bench"):
+        raise SystemExit(f"refusing to wipe {args.database!r}: database name must end in _bench")
+    # Settings are read on import, so point them at the benchmark database first.
+    os.environ["POSTGRES_DB"] = args.database
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    report = asyncio.run(main(args))
+    body = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(body + "\n")
+    else:
+        print(body)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,59 @@
+"""
+Microbenchmark: cost of turning `filters` / `sort_by` into SQL expressions.
+
+Compares a cold compile (LRU cleared before every call) with a warm
+cache hit, per request-shaped input. Run from backend/:
+
+    python -m benchmarks.query_builder [--number 20000]
+"""
+import argparse
+import json
+import timeit
+
+from app.models.car import CarSpec
+from app.models.rbac import User
+from app.utils.query_builder import compile_query
+
+CASES = [
+    (CarSpec, "year>2010", "-year"),
+    (CarSpec, "generation_id:1|2|3|4,fuel_type:diesel|petrol", "name,-id"),
+    (CarSpec, "year:2010..2015,horsepower>=150,engine~=tdi", "-horsepower,year"),
+    (CarSpec, "name^=Golf,torque<400", None),
+    (User, "is_active:true,username^=adm", "-created_at"),
+]
+
+
+def _per_call_us(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def run(number: int) -> list:
+    results = []
+    for model, filters, sort_by in CASES:
+        def cold():
+            compile_query.cache_clear()
+            compile_query(model, filters, sort_by)
+
+        def warm():
+            compile_query(model, filters, sort_by)
+
+        warm()
+        results.append({
+            "model": model.__name__,
+            "filters": filters,
+            "sort_by": sort_by,
+            "cold_us": round(_per_call_us(cold, number), 2),
+            "warm_us": round(_per_call_us(warm, number), 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    args = parser.parse_args()
+    print(json.dumps(run(args.number), indent=2))
+
+
+if __name__ == "__main__":
+    main()
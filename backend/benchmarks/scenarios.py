@@ -0,0 +1,436 @@
+"""
+One scenario per endpoint of the login, user, role and car routers.
+
+A scenario is named after the route it drives ("GET /brands/{brand_id}")
+and builds the i-th request from the seeded Dataset. Scenarios that
+consume rows (deletes, updates of throw-away users, garage adds) get
+their targets from `prepare`, which runs before timing starts.
+"""
+import asyncio
+import itertools
+import random
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, ContextManager, Dict, List, Optional
+from unittest.mock import patch
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import AsyncSessionMaker
+from app.core.principal import principal_cache
+from app.models.car import Brand, CarSpec, Generation, Model, Submodel, UserCars
+from app.models.rbac import Role
+from app.utils.paginate import _encode_cursor
+from benchmarks.seed import USER_PASSWORD, Dataset, _insert, create_users
+
+# Page size of the deep page scenarios.
+DEEP_PER_PAGE = 20
+
+# Logins in flight during the login burst scenario.
+LOGIN_BURST = 16
+
+
+@dataclass
+class Call:
+    method: str
+    url: str
+    params: Optional[Dict[str, Any]] = None
+    json: Any = None
+    headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class Context:
+    data: Dataset
+    rng: random.Random
+    admin_headers: Dict[str, str]
+    user_headers: Dict[int, Dict[str, str]] = field(default_factory=dict)
+    _counter: Any = field(default_factory=itertools.count)
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix} {next(self._counter):07d}"
+
+    def pick(self, items):
+        return self.rng.choice(items)
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Context, int, Any], Call]
+    prepare: Optional[Callable[[Context, int], Awaitable[List[Any]]]] = None
+    expect: Optional[int] = None  # status every response must have; default any below 400
+    around: Optional[Callable[[], ContextManager]] = None  # entered for the timed run
+    # (client, ctx) -> load running alongside the timed run, cancelled after it
+    background: Optional[Callable[[Any, "Context"], Awaitable[None]]] = None
+
+    @property
+    def method(self) -> str:
+        return self.name.split(" ", 1)[0]
+
+
+def _list_params(ctx: Context, sort_by: str = "name") -> Dict[str, Any]:
+    return {"page": ctx.rng.randint(1, 3), "per_page": 20, "sort_by": ctx.pick((sort_by, "-id"))}
+
+
+# ---------------------------------------
+# prepare helpers (untimed)
+# ---------------------------------------
+
+async def _in_session(fn) -> List[Any]:
+    async with AsyncSessionMaker() as session:
+        result = await fn(session)
+        await session.commit()
+        return result
+
+
+def _prepare_users(role_name: Optional[str] = None):
+    async def prepare(ctx: Context, n: int) -> List[Any]:
+        async def run(session: AsyncSession):
+            role_id = None
+            if role_name is not None:
+                role_id = (await session.execute(
+                    select(Role.id).where(Role.name == role_name)
+                )).scalar_one()
+            return await create_users(
+                session, [ctx.unique("bench_tmp").replace(" ", "_") for _ in range(n)], role_id
+            )
+        return await _in_session(run)
+    return prepare
+
+
+def _prepare_children(model, parent_key: Optional[str], parents: Callable[[Dataset], list], extra=None):
+    """Insert n throw-away rows (under random parents) and return (parent_id, id) pairs."""
+    async def prepare(ctx: Context, n: int) -> List[Any]:
+        rows, parent_ids = [], []
+        for _ in range(n):
+            parent_id = ctx.pick(parents(ctx.data))[1] if parent_key else None
+            row = {"name": ctx.unique("Tmp"), "created_by": ctx.data.admin_id}
+            if parent_key:
+                row[parent_key] = parent_id
+            row.update(extra or {})
+            rows.append(row)
+            parent_ids.append(parent_id)
+
+        async def run(session: AsyncSession):
+            return await _insert(session, model, rows)
+        ids = await _in_session(run)
+        return list(zip(parent_ids, ids))
+    return prepare
+
+
+async def _prepare_model_pairs(ctx: Context, n: int) -> List[Any]:
+    """Insert n pairs of sibling models; return (brand_id, first name, second id)."""
+    rows = []
+    for _ in range(n):
+        brand_id = ctx.pick(ctx.data.brand_ids)
+        for _ in range(2):
+            rows.append({"brand_id": brand_id, "name": ctx.unique("Taken"), "created_by": ctx.data.admin_id})
+
+    async def run(session: AsyncSession):
+        return await _insert(session, Model, rows)
+    ids = await _in_session(run)
+    return [(first["brand_id"], first["name"], ids[i + 1]) for i, first in enumerate(rows) if i % 2 == 0]
+
+
+def _prepare_garage(add: bool):
+    """(user_id, spec_id) pairs that are not in / were put in the user's garage."""
+    async def prepare(ctx: Context, n: int) -> List[Any]:
+        spec_ids = [sid for _, sid in ctx.data.specs]
+        pairs = []
+        for _ in range(n):
+            user_id = ctx.pick(ctx.data.user_ids)
+            garage = ctx.data.garages[user_id]
+            spec_id = ctx.pick(spec_ids)
+            while spec_id in garage and len(garage) < len(spec_ids):
+                spec_id = ctx.pick(spec_ids)
+            garage.add(spec_id)
+            pairs.append((user_id, spec_id))
+        if not add:
+            async def run(session: AsyncSession):
+                await session.execute(
+                    insert(UserCars).on_conflict_do_nothing(),
+                    [{"user_id": u, "car_spec_id": s} for u, s in pairs],
+                )
+            await _in_session(run)
+        return pairs
+    return prepare
+
+
+def _prepare_garage_changes(size: int):
+    """(user_id, add, remove): `size` specs not in the user's garage and up to `size` in it."""
+    async def prepare(ctx: Context, n: int) -> List[Any]:
+        spec_ids = [sid for _, sid in ctx.data.specs]
+        changes = []
+        for _ in range(n):
+            user_id = ctx.pick(ctx.data.user_ids)
+            garage = ctx.data.garages[user_id]
+            remove = ctx.rng.sample(sorted(garage), min(size, len(garage)))
+            free = [sid for sid in spec_ids if sid not in garage]
+            add = ctx.rng.sample(free, min(size, len(free)))
+            garage.difference_update(remove)
+            garage.update(add)
+            changes.append((user_id, add, remove))
+        return changes
+    return prepare
+
+
+async def _prepare_deep_pages(ctx: Context, n: int) -> List[Any]:
+    """
+    (generation_id, page, cursor) for the last full page of a generation's
+    specs by year: the cursor names the row just before it, so offset and
+    cursor requests return the same rows.
+    """
+    per_generation = len(ctx.data.specs) // len(ctx.data.generations)
+    page = max(1, per_generation // DEEP_PER_PAGE)
+    cursors: Dict[int, str] = {}
+
+    async def run(session: AsyncSession):
+        for generation_id in generation_ids:
+            if generation_id in cursors:
+                continue
+            if page == 1:
+                cursors[generation_id] = ""
+                continue
+            row = (await session.execute(
+                select(CarSpec.year, CarSpec.id)
+                .where(CarSpec.generation_id == generation_id)
+                .order_by(CarSpec.year, CarSpec.id)
+                .offset((page - 1) * DEEP_PER_PAGE - 1)
+                .limit(1)
+            )).one()
+            cursors[generation_id] = _encode_cursor(
+                row, [(CarSpec.year, False), (CarSpec.id, False)], backwards=False
+            )
+
+    generation_ids = [ctx.pick(ctx.data.generations)[1] for _ in range(n)]
+    await _in_session(run)
+    return [(generation_id, page, cursors[generation_id]) for generation_id in generation_ids]
+
+
+@contextmanager
+def _auth_mode(mode: str):
+    """
+    Authorize requests from the token claims ("stateless"), from the
+    principal cache ("cached") or by loading the principal each time
+    ("database").
+    """
+    ttl = 0 if mode == "database" else principal_cache.ttl_seconds
+    with patch.object(settings, "AUTH_STATELESS_TOKENS", mode == "stateless"), \
+            patch.object(principal_cache, "ttl_seconds", ttl):
+        principal_cache.clear()
+        yield
+
+
+async def _login_burst(client, ctx: Context) -> None:
+    """Log bench users in back to back, LOGIN_BURST at a time, until cancelled."""
+    async def login():
+        while True:
+            username = ctx.data.usernames[ctx.pick(ctx.data.user_ids)]
+            await client.post(
+                "/login/access-token", json={"username": username, "password": USER_PASSWORD}
+            )
+
+    await asyncio.gather(*(login() for _ in range(LOGIN_BURST)))
+
+
+def _catalog_item(ctx: Context) -> dict:
+    return {
+        "name": ctx.unique("Imported Brand"),
+        "models": [{
+            "name": "Model A",
+            "submodels": [{
+                "name": "Base",
+                "generations": [{
+                    "name": "Mk1",
+                    "year_start": 2015,
+                    "year_end": 2020,
+                    "specs": [
+                        {"name": f"Spec {s}", "engine": "2.0 TDI", "horsepower": 150 + s,
+                         "torque": 320, "fuel_type": "diesel", "year": 2016}
+                        for s in range(5)
+                    ],
+                }],
+            }],
+        }],
+    }
+
+
+def _spec_body(ctx: Context) -> dict:
+    return {
+        "name": ctx.unique("Spec"), "engine": "1.6 TSI", "horsepower": 120,
+        "torque": 200, "fuel_type": "petrol", "year": 2012,
+    }
+
+
+# ---------------------------------------
+# Scenarios
+# ---------------------------------------
+
+def build_scenarios() -> List[Scenario]:
+    d = lambda ctx: ctx.data  # noqa: E731
+
+    return [
+        # Login
+        Scenario("POST /login/access-token", lambda ctx, i, _: Call(
+            "POST", "/login/access-token",
+            json={"username": ctx.data.usernames[ctx.pick(ctx.data.user_ids)], "password": USER_PASSWORD},
+            headers={},
+        )),
+
+        # Users and roles
+        Scenario("GET /users", lambda ctx, i, _: Call(
+            "GET", "/users", params=_list_params(ctx, "username"))),
+        Scenario("GET /users/{user_id}", lambda ctx, i, _: Call(
+            "GET", f"/users/{ctx.pick(d(ctx).user_ids)}")),
+        Scenario("GET /users/{user_id}/roles", lambda ctx, i, _: Call(
+            "GET", f"/users/{ctx.pick(d(ctx).user_ids)}/roles")),
+        Scenario("GET /roles", lambda ctx, i, _: Call("GET", "/roles")),
+        Scenario("GET /roles/{role_id}/permissions", lambda ctx, i, _: Call(
+            "GET", f"/roles/{ctx.pick(d(ctx).role_ids)}/permissions")),
+        Scenario("POST /users", lambda ctx, i, _: Call(
+            "POST", "/users",
+            json={"username": ctx.unique("bench_new").replace(" ", "_"), "password": USER_PASSWORD})),
+        Scenario("PUT /users/{user_id}", lambda ctx, i, user_id: Call(
+            "PUT", f"/users/{user_id}",
+            json={"username": ctx.unique("bench_renamed").replace(" ", "_")}),
+            prepare=_prepare_users()),
+        Scenario("POST /users/{user_id}/role", lambda ctx, i, user_id: Call(
+            "POST", f"/users/{user_id}/role", params={"role_name": "CarSpec"}),
+            prepare=_prepare_users()),
+        Scenario("DELETE /users/{user_id}/roles/{role_name}", lambda ctx, i, user_id: Call(
+            "DELETE", f"/users/{user_id}/roles/User"),
+            prepare=_prepare_users("User")),
+        Scenario("DELETE /users/{user_id}", lambda ctx, i, user_id: Call(
+            "DELETE", f"/users/{user_id}"),
+            prepare=_prepare_users()),
+
+        # Brands
+        Scenario("GET /brands", lambda ctx, i, _: Call("GET", "/brands", params=_list_params(ctx))),
+        Scenario("GET /brands/{brand_id}", lambda ctx, i, _: Call(
+            "GET", f"/brands/{ctx.pick(d(ctx).brand_ids)}")),
+        Scenario("POST /brands", lambda ctx, i, _: Call(
+            "POST", "/brands", json={"name": ctx.unique("Brand")})),
+        Scenario("PUT /brands/{brand_id}", lambda ctx, i, _: Call(
+            "PUT", f"/brands/{ctx.pick(d(ctx).brand_ids)}", json={"name": ctx.unique("Brand")})),
+        Scenario("DELETE /brands/{brand_id}", lambda ctx, i, target: Call(
+            "DELETE", f"/brands/{target[1]}"),
+            prepare=_prepare_children(Brand, None, None)),
+
+        # Models
+        Scenario("GET /brands/{brand_id}/models", lambda ctx, i, _: Call(
+            "GET", f"/brands/{ctx.pick(d(ctx).brand_ids)}/models", params=_list_params(ctx))),
+        Scenario("GET /brands/{brand_id}/models/{model_id}", lambda ctx, i, _: Call(
+            "GET", "/brands/{}/models/{}".format(*ctx.pick(d(ctx).models)))),
+        Scenario("POST /brands/{brand_id}/models", lambda ctx, i, _: Call(
+            "POST", f"/brands/{ctx.pick(d(ctx).brand_ids)}/models", json={"name": ctx.unique("Model")})),
+        Scenario("PUT /brands/{brand_id}/models/{model_id}", lambda ctx, i, _: Call(
+            "PUT", "/brands/{}/models/{}".format(*ctx.pick(d(ctx).models)),
+            json={"name": ctx.unique("Model")})),
+        Scenario("POST /brands/{brand_id}/models (duplicate name)", lambda ctx, i, pair: Call(
+            "POST", f"/brands/{pair[0]}/models", json={"name": pair[1]}),
+            prepare=_prepare_model_pairs, expect=409),
+        Scenario("PUT /brands/{brand_id}/models/{model_id} (duplicate name)", lambda ctx, i, pair: Call(
+            "PUT", f"/brands/{pair[0]}/models/{pair[2]}", json={"name": pair[1]}),
+            prepare=_prepare_model_pairs, expect=409),
+        Scenario("DELETE /brands/{brand_id}/models/{model_id}", lambda ctx, i, target: Call(
+            "DELETE", "/brands/{}/models/{}".format(*target)),
+            prepare=_prepare_children(Model, "brand_id", lambda data: [(None, b) for b in data.brand_ids])),
+
+        # Submodels
+        Scenario("GET /models/{model_id}/submodels", lambda ctx, i, _: Call(
+            "GET", f"/models/{ctx.pick(d(ctx).models)[1]}/submodels", params=_list_params(ctx))),
+        Scenario("GET /models/{model_id}/submodels/{submodel_id}", lambda ctx, i, _: Call(
+            "GET", "/models/{}/submodels/{}".format(*ctx.pick(d(ctx).submodels)))),
+        Scenario("POST /models/{model_id}/submodels", lambda ctx, i, _: Call(
+            "POST", f"/models/{ctx.pick(d(ctx).models)[1]}/submodels",
+            json={"name": ctx.unique("Submodel")})),
+        Scenario("PUT /models/{model_id}/submodels/{submodel_id}", lambda ctx, i, _: Call(
+            "PUT", "/models/{}/submodels/{}".format(*ctx.pick(d(ctx).submodels)),
+            json={"name": ctx.unique("Submodel")})),
+        Scenario("DELETE /models/{model_id}/submodels/{submodel_id}", lambda ctx, i, target: Call(
+            "DELETE", "/models/{}/submodels/{}".format(*target)),
+            prepare=_prepare_children(Submodel, "model_id", lambda data: data.models)),
+
+        # Generations
+        Scenario("GET /submodels/{submodel_id}/generations", lambda ctx, i, _: Call(
+            "GET", f"/submodels/{ctx.pick(d(ctx).submodels)[1]}/generations", params=_list_params(ctx))),
+        Scenario("GET /submodels/{submodel_id}/generations/{generation_id}", lambda ctx, i, _: Call(
+            "GET", "/submodels/{}/generations/{}".format(*ctx.pick(d(ctx).generations)))),
+        Scenario("POST /submodels/{submodel_id}/generations", lambda ctx, i, _: Call(
+            "POST", f"/submodels/{ctx.pick(d(ctx).submodels)[1]}/generations",
+            json={"name": ctx.unique("Gen"), "year_start": 2020, "year_end": 2026})),
+        Scenario("PUT /submodels/{submodel_id}/generations/{generation_id}", lambda ctx, i, _: Call(
+            "PUT", "/submodels/{}/generations/{}".format(*ctx.pick(d(ctx).generations)),
+            json={"name": ctx.unique("Gen")})),
+        Scenario("DELETE /submodels/{submodel_id}/generations/{generation_id}", lambda ctx, i, target: Call(
+            "DELETE", "/submodels/{}/generations/{}".format(*target)),
+            prepare=_prepare_children(Generation, "submodel_id", lambda data: data.submodels,
+                                      {"year_start": 2000, "year_end": 2005})),
+
+        # Specs
+        Scenario("GET /generations/{generation_id}/specs", lambda ctx, i, _: Call(
+            "GET", f"/generations/{ctx.pick(d(ctx).generations)[1]}/specs",
+            params=_list_params(ctx, "-horsepower"))),
+        # The same deep page by offset and by cursor; seed with many specs
+        # per generation (e.g. --specs 1000000) for the comparison to mean much.
+        Scenario("GET /generations/{generation_id}/specs (deep page)", lambda ctx, i, deep: Call(
+            "GET", f"/generations/{deep[0]}/specs",
+            params={"page": deep[1], "per_page": DEEP_PER_PAGE, "sort_by": "year", "count": "cached"}),
+            prepare=_prepare_deep_pages),
+        Scenario("GET /generations/{generation_id}/specs (deep cursor)", lambda ctx, i, deep: Call(
+            "GET", f"/generations/{deep[0]}/specs",
+            params={"cursor": deep[2], "per_page": DEEP_PER_PAGE, "sort_by": "year", "count": "cached"}),
+            prepare=_prepare_deep_pages),
+        # One read endpoint under each way of authorizing the caller.
+        *(Scenario(f"GET /specs/{{spec_id}} ({mode} auth)", lambda ctx, i, _: Call(
+            "GET", f"/specs/{ctx.pick(d(ctx).specs)[1]}"),
+            around=lambda mode=mode: _auth_mode(mode))
+          for mode in ("stateless", "cached", "database")),
+        # Reads must not stall while bcrypt runs for concurrent logins.
+        Scenario("GET /specs/{spec_id} (during login burst)", lambda ctx, i, _: Call(
+            "GET", f"/specs/{ctx.pick(d(ctx).specs)[1]}"),
+            background=_login_burst),
+        Scenario("GET /specs/search", lambda ctx, i, _: Call(
+            "GET", "/specs/search", params={"q": ctx.pick(d(ctx).search_terms), "limit": 20})),
+        Scenario("GET /specs/{spec_id}", lambda ctx, i, _: Call(
+            "GET", f"/specs/{ctx.pick(d(ctx).specs)[1]}")),
+        Scenario("POST /generations/{generation_id}/specs", lambda ctx, i, _: Call(
+            "POST", f"/generations/{ctx.pick(d(ctx).generations)[1]}/specs", json=_spec_body(ctx))),
+        Scenario("PUT /generations/{generation_id}/specs/{spec_id}", lambda ctx, i, _: Call(
+            "PUT", "/generations/{}/specs/{}".format(*ctx.pick(d(ctx).specs)),
+            json={"horsepower": ctx.rng.randint(60, 600)})),
+        Scenario("DELETE /generations/{generation_id}/specs/{spec_id}", lambda ctx, i, target: Call(
+            "DELETE", "/generations/{}/specs/{}".format(*target)),
+            prepare=_prepare_children(CarSpec, "generation_id", lambda data: data.generations, {
+                "engine": "1.0", "horsepower": 70, "torque": 95, "fuel_type": "petrol", "year": 2001,
+            })),
+
+        # Garage (as regular users)
+        Scenario("GET /my-cars", lambda ctx, i, _: Call(
+            "GET", "/my-cars", params={"page": 1, "per_page": 20},
+            headers=ctx.user_headers[ctx.pick(d(ctx).user_ids)])),
+        Scenario("POST /my-cars/{car_spec_id}", lambda ctx, i, pair: Call(
+            "POST", f"/my-cars/{pair[1]}", headers=ctx.user_headers[pair[0]]),
+            prepare=_prepare_garage(add=True)),
+        Scenario("DELETE /my-cars/{car_spec_id}", lambda ctx, i, pair: Call(
+            "DELETE", f"/my-cars/{pair[1]}", headers=ctx.user_headers[pair[0]]),
+            prepare=_prepare_garage(add=False)),
+        Scenario("PATCH /my-cars", lambda ctx, i, change: Call(
+            "PATCH", "/my-cars", json={"add": change[1], "remove": change[2]},
+            headers=ctx.user_headers[change[0]]),
+            prepare=_prepare_garage_changes(20)),
+
+        # Catalog
+        Scenario("GET /catalog/tree", lambda ctx, i, _: Call("GET", "/catalog/tree")),
+        Scenario("GET /catalog/tree?include_specs", lambda ctx, i, _: Call(
+            "GET", "/catalog/tree", params={"include_specs": "true"})),
+        Scenario("GET /catalog/export/specs", lambda ctx, i, _: Call(
+            "GET", "/catalog/export/specs",
+            params={"format": "ndjson", "generation_id": ctx.pick(d(ctx).generations)[1]})),
+        Scenario("POST /catalog/import", lambda ctx, i, _: Call(
+            "POST", "/catalog/import", json=[_catalog_item(ctx)])),
+    ]
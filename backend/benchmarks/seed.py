@@ -0,0 +1,192 @@
+"""
+Synthetic data for the load harness.
+
+Wipes the catalog and any previous benchmark users, then bulk-inserts a
+brand -> model -> submodel -> generation -> spec tree of the requested
+shape plus users with populated garages. Everything is derived from a
+seeded RNG so runs with the same arguments see the same data.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Sequence
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.principal import load_principal
+from app.core.security import create_access_token, get_password_hash_async
+from app.models.car import Brand, CarSpec, Generation, Model, Submodel, UserCars
+from app.models.rbac import Role, User, user_roles_table
+from app.utils.catalog_cache import catalog_tree_cache
+from app.utils.count_cache import count_cache
+from app.utils.read_cache import catalog_read_cache
+
+USER_PREFIX = "bench_user_"
+USER_PASSWORD = "bench-password"
+FUEL_TYPES = ("petrol", "diesel", "hybrid", "electric", "lpg")
+ENGINE_WORDS = ("TSI", "TDI", "GTI", "VTEC", "EcoBoost", "Hybrid", "Turbo", "V6", "V8")
+
+
+@dataclass
+class CatalogShape:
+    brands: int = 20
+    models_per_brand: int = 5
+    submodels_per_model: int = 3
+    generations_per_submodel: int = 3
+    specs_per_generation: int = 10
+    users: int = 50
+    garage_size: int = 10
+
+
+@dataclass
+class Dataset:
+    """Ids of the seeded rows, used by scenarios to build request paths."""
+
+    admin_id: int
+    brand_ids: List[int] = field(default_factory=list)
+    models: List[tuple] = field(default_factory=list)       # (brand_id, model_id)
+    submodels: List[tuple] = field(default_factory=list)    # (model_id, submodel_id)
+    generations: List[tuple] = field(default_factory=list)  # (submodel_id, generation_id)
+    specs: List[tuple] = field(default_factory=list)        # (generation_id, spec_id)
+    user_ids: List[int] = field(default_factory=list)
+    usernames: Dict[int, str] = field(default_factory=dict)
+    garages: Dict[int, set] = field(default_factory=dict)
+    role_ids: List[int] = field(default_factory=list)
+    search_terms: List[str] = field(default_factory=list)
+
+
+async def reset(session: AsyncSession) -> None:
+    await session.execute(text(
+        "TRUNCATE user_cars, car_specs, generations, submodels, models, brands, "
+        "catalog_versions RESTART IDENTITY CASCADE"
+    ))
+    await session.execute(delete(User).where(User.username.startswith("bench_")))
+    await session.commit()
+    count_cache.clear()
+    catalog_tree_cache.clear()
+    # Ids restart with the tables; a shared cache must not serve the old rows.
+    await catalog_read_cache.tables_changed(
+        "brands", "models", "submodels", "generations", "car_specs"
+    )
+
+
+async def seed(session: AsyncSession, shape: CatalogShape, rng: random.Random) -> Dataset:
+    admin_id = (await session.execute(
+        select(User.id).where(User.username == "admin")
+    )).scalar_one()
+    data = Dataset(admin_id=admin_id)
+
+    brand_rows = [{"name": f"Brand {b:04d}", "created_by": admin_id} for b in range(shape.brands)]
+    data.brand_ids = await _insert(session, Brand, brand_rows)
+
+    model_rows = [
+        {"brand_id": brand_id, "name": f"Model {m:03d}", "created_by": admin_id}
+        for brand_id in data.brand_ids for m in range(shape.models_per_brand)
+    ]
+    model_ids = await _insert(session, Model, model_rows)
+    data.models = [(row["brand_id"], mid) for row, mid in zip(model_rows, model_ids)]
+
+    submodel_rows = [
+        {"model_id": model_id, "name": f"Submodel {s:03d}", "created_by": admin_id}
+        for _, model_id in data.models for s in range(shape.submodels_per_model)
+    ]
+    submodel_ids = await _insert(session, Submodel, submodel_rows)
+    data.submodels = [(row["model_id"], sid) for row, sid in zip(submodel_rows, submodel_ids)]
+
+    generation_rows = []
+    for _, submodel_id in data.submodels:
+        year = rng.randint(1990, 2010)
+        for g in range(shape.generations_per_submodel):
+            generation_rows.append({
+                "submodel_id": submodel_id,
+                "name": f"Mk{g + 1}",
+                "year_start": year,
+                "year_end": year + 6,
+                "created_by": admin_id,
+            })
+            year += 7
+    generation_ids = await _insert(session, Generation, generation_rows)
+    data.generations = [
+        (row["submodel_id"], gid) for row, gid in zip(generation_rows, generation_ids)
+    ]
+
+    spec_rows = []
+    for generation_row, generation_id in zip(generation_rows, generation_ids):
+        for s in range(shape.specs_per_generation):
+            word = rng.choice(ENGINE_WORDS)
+            spec_rows.append({
+                "generation_id": generation_id,
+                "name": f"{word} {s:03d}",
+                "engine": f"{rng.choice((1.0, 1.4, 1.6, 2.0, 3.0))} {word}",
+                "horsepower": rng.randint(60, 600),
+                "torque": rng.randint(90, 900),
+                "fuel_type": rng.choice(FUEL_TYPES),
+                "year": rng.randint(generation_row["year_start"], generation_row["year_end"]),
+                "created_by": admin_id,
+            })
+    spec_ids = await _insert(session, CarSpec, spec_rows)
+    data.specs = [(row["generation_id"], sid) for row, sid in zip(spec_rows, spec_ids)]
+    data.search_terms = ["brand 00", "model 001", "tdi", "gti 00", "mk2", "hybrid"]
+
+    data.role_ids = list((await session.execute(select(Role.id))).scalars())
+    user_role_id = (await session.execute(
+        select(Role.id).where(Role.name == "User")
+    )).scalar_one()
+    data.user_ids = await create_users(session, [
+        f"{USER_PREFIX}{u:05d}" for u in range(shape.users)
+    ], user_role_id)
+    data.usernames = {
+        uid: f"{USER_PREFIX}{u:05d}" for u, uid in enumerate(data.user_ids)
+    }
+
+    garage_rows = []
+    for user_id in data.user_ids:
+        picks = rng.sample(spec_ids, min(shape.garage_size, len(spec_ids)))
+        data.garages[user_id] = set(picks)
+        garage_rows.extend({"user_id": user_id, "car_spec_id": sid} for sid in picks)
+    await _insert(session, UserCars, garage_rows)
+
+    await session.commit()
+    await session.execute(text("ANALYZE"))
+    return data
+
+
+async def create_users(session: AsyncSession, usernames: Sequence[str], role_id=None) -> List[int]:
+    """Insert users sharing one password hash (bcrypt once, not per user)."""
+    if not usernames:
+        return []
+    hashed = await get_password_hash_async(USER_PASSWORD)
+    user_ids = await _insert(session, User, [
+        {"username": name, "hashed_password": hashed, "is_active": True}
+        for name in usernames
+    ])
+    if role_id is not None:
+        await session.execute(
+            insert(user_roles_table),
+            [{"user_id": uid, "role_id": role_id} for uid in user_ids],
+        )
+    return user_ids
+
+
+async def issue_token(session: AsyncSession, user_id: int) -> str:
+    """The token /login/access-token would return, without the bcrypt cost."""
+    principal = await load_principal(session, user_id)
+    return create_access_token(
+        user_id,
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        {"role": sorted(principal.roles)[0]} if principal.roles else None,
+        principal=principal,
+    )
+
+
+async def _insert(session: AsyncSession, model, rows: List[dict], batch_size: int = 5000) -> List[int]:
+    ids: List[int] = []
+    for start in range(0, len(rows), batch_size):
+        result = await session.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows[start:start + batch_size],
+        )
+        ids.extend(result.scalars())
+    return ids
@@ -0,0 +1,104 @@
+"""
+Microbenchmark: rendering a 100-row spec page.
+
+Compares the previous path (per-row model_validate, FastAPI re-validating
+against response_model, stdlib json) with serialize_paginated (one
+TypeAdapter validation, returned directly, orjson). Both endpoints run
+through a real FastAPI app with ORM instances, no database. Run from backend/:
+
+    python -m benchmarks.serialization [--rows 100] [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.controllers.utils import serialize_paginated
+from app.models.car import CarSpec
+from app.schemas.car import CarSpecRead
+from app.schemas.pagination import PageMeta, PaginatedResponse
+
+
+def _page(rows: int) -> PaginatedResponse:
+    return PaginatedResponse(
+        data=[
+            CarSpec(
+                id=i, generation_id=1, name=f"TSI {i:03d}", engine="2.0 TSI", horsepower=150 + i,
+                torque=250, fuel_type="petrol", year=2010, created_by=1,
+            )
+            for i in range(rows)
+        ],
+        meta=PageMeta(page=1, per_page=rows, total_items=rows * 10, total_pages=10),
+    )
+
+
+def _app(page: PaginatedResponse) -> FastAPI:
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/before", response_model=PaginatedResponse[CarSpecRead])
+    async def before():
+        return PaginatedResponse(
+            data=[CarSpecRead.model_validate(item) for item in page.data],
+            meta=page.meta,
+        )
+
+    @app.get("/after", response_model=PaginatedResponse[CarSpecRead])
+    async def after():
+        return serialize_paginated(page, CarSpecRead)
+
+    return app
+
+
+async def _drive(app, path: str, requests: int) -> tuple:
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("bench", 0), "server": ("bench", 80),
+    }
+    started = time.perf_counter()
+    for _ in range(requests):
+        body.clear()
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - started, bytes(body)
+
+
+async def run(rows: int, requests: int) -> dict:
+    app = _app(_page(rows))
+    _, before_body = await _drive(app, "/before", 10)
+    _, after_body = await _drive(app, "/after", 10)
+    assert json.loads(before_body) == json.loads(after_body), "responses differ"
+
+    before = min([(await _drive(app, "/before", requests))[0] for _ in range(3)])
+    after = min([(await _drive(app, "/after", requests))[0] for _ in range(3)])
+    return {
+        "rows": rows,
+        "requests": requests,
+        "before_us": round(before / requests * 1e6, 1),
+        "after_us": round(after / requests * 1e6, 1),
+        "speedup": round(before / after, 2),
+        "body_bytes": len(after_body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
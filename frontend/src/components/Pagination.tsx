@@ -9,7 +9,7 @@ interface PaginationProps {
 export function Pagination({ meta, onPageChange }: PaginationProps) {
   const { page, total_pages } = meta
 
-  if (total_pages <= 1) return null
+  if (!total_pages || total_pages <= 1) return null
 
   return (
     <div className="flex items-center justify-between pt-4 border-t border-[#2a2a3a]">
@@ -130,8 +130,11 @@ export interface UserCar {
 export interface PageMeta {
   page: number
   per_page: number
-  total_items: number
-  total_pages: number
+  total_items: number | null
+  total_pages: number | null
+  count_strategy?: 'exact' | 'estimated' | 'cached' | 'none'
+  next_cursor?: string | null
+  prev_cursor?: string | null
 }
 
 export interface PaginatedResponse<T> {
@@ -144,5 +147,7 @@ export interface PaginationParams {
   per_page?: number
   sort_by?: string
   filters?: string
+  cursor?: string
+  count?: 'exact' | 'estimated' | 'cached' | 'none'
 }
 